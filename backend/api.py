@@ -1,18 +1,35 @@
 """FastAPI application with REST endpoints."""
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
 from sqlalchemy.exc import OperationalError
-from typing import List, Optional
-from datetime import datetime, timedelta
-from database import get_db, test_connection
-from models import Story, Source
-from services import get_trending_stories, scrape_source
+from typing import Callable, Dict, List, Optional, Union
+import asyncio
+from datetime import datetime
+from db_executor import run_db, run_blocking, shutdown_executors
+from response_cache import cached_json_response, JSONPayload, encode_json
+from compression import CompressionMiddleware
+from data_versions import STORIES, SOURCES, HASHTAGS, FEEDS
+from payloads import velocity_category, story_row_to_dict, story_event_to_dict, build_insights
+from models import Story, Source, ScrapeLog
+from services import (
+    get_trending_story_rows, get_feed_facets, FEED_FACETS, get_hot_story_rows, get_story_rows_after, get_story_rows_by_ids, get_story_changes,
+    encode_feed_cursor, decode_feed_cursor, decode_changes_token
+)
+from story_stream import get_broadcaster, start_stream, stop_stream
+from story_search import search_story_rows, SEARCH_SORTS
+from precomputed_feeds import FEEDS as FEED_DEFINITIONS, feed_size, load_feed
+from scrape_jobs import (
+    submit_scrape_job, dispatch_scrape_job, job_to_dict, fail_orphaned_jobs,
+    SCRAPE_SOURCE, SCRAPE_HASHTAG, SCRAPE_FACEBOOK_TRENDS,
+)
 from pydantic import BaseModel
 from config import settings
 from background_scheduler import get_scheduler
+from health import get_health_prober, pool_status
+from database import pool_metrics
+from scoring_profiles import get_active_evaluator, save_profile, profile_to_dict, compile_profile
 from loguru import logger
 
 app = FastAPI(title="Story Intelligence Dashboard API", version="1.0.0")
@@ -24,8 +41,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-Offset", "X-Feed-Computed-At"],  # Let the dashboard read pagination/feed headers
 )
 
+# Compress large responses (outermost, so it sees the final headers); cached feeds arrive pre-compressed
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_bytes)
+
 # Return 503 with clear message when database is unreachable
 @app.exception_handler(OperationalError)
 async def db_exception_handler(request, exc: OperationalError):
@@ -47,6 +68,26 @@ async def startup_event():
         logger.info("Background scheduler started on API startup")
     except Exception as e:
         logger.error(f"Failed to start background scheduler: {e}")
+    
+    if settings.stream_enabled:
+        start_stream(story_event_to_dict)
+    
+    get_health_prober().start()
+    
+    # Scrape jobs left queued/running by the previous API process would block their targets until the timeout
+    if settings.scrape_jobs_backend != "celery":
+        try:
+            await run_db(fail_orphaned_jobs)
+        except Exception as e:
+            logger.error(f"Could not check for orphaned scrape jobs: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """End live stream clients and wait for in-flight database work before the process exits."""
+    stop_stream()
+    get_health_prober().stop()
+    shutdown_executors()
 
 
 # Pydantic models for API responses
@@ -68,25 +109,28 @@ class StoryResponse(BaseModel):
         from_attributes = True
 
 
-class ScrapeResponse(BaseModel):
-    """Response model for scrape operations."""
-    success: bool
-    posts_fetched: int
-    posts_processed: int
-    stories_created: int
-    source: Optional[str] = None
-    error: Optional[str] = None
+class StoriesWithFacetsResponse(BaseModel):
+    """Trending stories with facet counts (GET /api/stories with ``facets``)."""
+    stories: List[StoryResponse]
+    facets: Dict[str, Dict[str, int]]  # Facet name -> {value: count}, largest counts first
+
+
+class StoryBatchRequest(BaseModel):
+    """Request model for fetching several stories by ID."""
+    ids: List[int]
+
+
+class ScoringProfileRequest(BaseModel):
+    """Request model for storing a new scoring profile version."""
+    name: str
+    params: Dict[str, float] = {}  # Omitted parameters use the built-in defaults
+    activate: bool = True
 
 
 def story_to_response(story: Story) -> StoryResponse:
     """Convert Story model to API response format."""
     # Determine velocity category
-    if story.engagement_velocity >= 100:
-        velocity = "high"
-    elif story.engagement_velocity >= 50:
-        velocity = "medium"
-    else:
-        velocity = "low"
+    velocity = velocity_category(story.engagement_velocity)
     
     # Format timestamp
     timestamp = story.posted_at.strftime("%Y-%m-%d %H:%M") if story.posted_at else ""
@@ -106,6 +150,30 @@ def story_to_response(story: Story) -> StoryResponse:
     )
 
 
+def story_row_to_response(row) -> StoryResponse:
+    """Convert a projected story row to API response format (same result as story_to_response)."""
+    return StoryResponse(**story_row_to_dict(row))
+
+
+def stream_filter(
+    is_kenyan: Optional[bool],
+    platform: Optional[str],
+    min_velocity: Optional[float]
+) -> Optional[Callable[[Dict], bool]]:
+    """Build a live stream subscriber's predicate on story deltas (None when unfiltered)."""
+    if is_kenyan is None and not platform and min_velocity is None:
+        return None
+    
+    def matches(event: Dict) -> bool:
+        if is_kenyan is not None and event["is_kenyan"] != is_kenyan:
+            return False
+        if platform and event["platform"] != platform:
+            return False
+        return min_velocity is None or event["engagement_velocity"] >= min_velocity
+    
+    return matches
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -114,14 +182,33 @@ async def root():
 
 @app.get("/api/health")
 async def health_check():
-    """Health check endpoint. Includes database connectivity."""
+    """
+    Health check endpoint. Includes database connectivity.
+    
+    Database status comes from the background health prober (see health.py),
+    so probes do not touch the database; pool counters (``pool`` for request
+    handlers, ``pools`` per role) and scheduler lag are read from memory.
+    """
+    prober = get_health_prober()
+    probe = prober.snapshot()
+    if probe["stale"] and not prober.running:
+        await run_blocking(prober.probe)  # Prober not started (no startup event): probe inline
+        probe = prober.snapshot()
+    
     scheduler = get_scheduler()
-    db_ok = test_connection()
+    db_ok = probe["database_ok"]
     return {
         "status": "healthy" if db_ok else "degraded",
         "database": "connected" if db_ok else "disconnected",
         "timestamp": datetime.utcnow().isoformat(),
         "auto_scraping": scheduler.running if scheduler else False,
+        "database_latency_ms": probe["latency_ms"],
+        "database_error": probe["error"],
+        "checked_at": probe["checked_at"],
+        "pool": pool_status(),
+        "pools": pool_metrics(),
+        "scheduler": scheduler.cycle_status() if scheduler else None,
+        "last_successful_scrape": probe["last_scrape"],
     }
 
 
@@ -135,8 +222,44 @@ async def get_scheduler_status():
     }
 
 
-@app.get("/api/stories", response_model=List[StoryResponse])
+def parse_story_ids(ids: str) -> List[int]:
+    """Parse a comma-separated story ID list (400 on malformed IDs)."""
+    try:
+        return [int(story_id) for story_id in ids.split(",") if story_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of story IDs")
+
+
+async def story_batch_response(story_ids: List[int], request: Optional[Request] = None) -> Response:
+    """
+    Serve several stories by ID from one IN query, in request order.
+    
+    Duplicate IDs are returned once; unknown IDs are skipped.
+    
+    Args:
+        story_ids: Requested story IDs
+        request: Incoming request, for If-None-Match
+    
+    Returns:
+        JSON list of stories
+    """
+    story_ids = list(dict.fromkeys(story_ids))
+    if len(story_ids) > settings.story_batch_max_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.story_batch_max_ids} story IDs per request"
+        )
+    
+    def load(db: Session) -> List[Dict]:
+        return [story_row_to_dict(row) for row in get_story_rows_by_ids(db, story_ids)]
+    
+    ids_param = ",".join(str(story_id) for story_id in story_ids)
+    return await cached_json_response("stories_ids", {"ids": ids_param}, load, (STORIES,), request)
+
+
+@app.get("/api/stories", response_model=Union[List[StoryResponse], StoriesWithFacetsResponse])
 async def get_stories(
+    request: Request,
     limit: int = Query(50, ge=1, le=200),
     min_score: Optional[float] = Query(None, ge=0, le=100),
     platform: Optional[str] = Query(None),
@@ -145,11 +268,24 @@ async def get_stories(
     location: Optional[str] = Query(None),
     topic: Optional[str] = Query(None),
     min_velocity: Optional[float] = Query(None, ge=0),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
+    facets: Optional[str] = Query(None, description="Comma-separated facets to count: platform, topic, velocity"),
+    ids: Optional[str] = Query(None, description="Comma-separated story IDs to fetch (other parameters are ignored)")
 ):
     """
     Get trending stories.
     
+    Pages are keyset-paginated: when more stories may follow, the response
+    carries an X-Next-Cursor header; pass it back as ``cursor`` to get the
+    next page. Every page costs the same as the first.
+    
+    With ``facets``, the response is ``{"stories": [...], "facets": {name:
+    {value: count}}}`` instead of a plain list; counts cover every story
+    matching the filters (not just this page).
+    
+    With ``ids``, returns exactly those stories (active or not) in the
+    order given, from one query, instead of the feed.
+    
     Args:
         limit: Maximum number of stories to return
         min_score: Minimum score threshold
@@ -159,29 +295,87 @@ async def get_stories(
         location: Filter by location
         topic: Filter by topic
         min_velocity: Minimum engagement velocity (for hot/emerging stories)
-        db: Database session
-    """
-    stories = get_trending_stories(
-        db=db,
-        limit=limit,
-        min_score=min_score,
-        platform=platform,
-        hours_back=hours_back,
-        is_kenyan=is_kenyan,
-        location=location,
-        topic=topic,
-        min_velocity=min_velocity
-    )
+        cursor: Opaque cursor of the previous page
+        facets: Facets to count alongside the stories
+        ids: Story IDs to fetch instead of the feed
+    """
+    if ids is not None:
+        return await story_batch_response(parse_story_ids(ids), request)
     
-    return [story_to_response(story) for story in stories]
+    try:
+        after = decode_feed_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    facet_names = []
+    for name in (facets or "").split(","):
+        name = name.strip().lower()
+        if not name or name in facet_names:
+            continue
+        if name not in FEED_FACETS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown facet '{name}'. Available: {', '.join(FEED_FACETS)}"
+            )
+        facet_names.append(name)
+    
+    params = {
+        "limit": limit,
+        "min_score": min_score,
+        "platform": platform,
+        "hours_back": hours_back,
+        "is_kenyan": is_kenyan,
+        "location": location,
+        "topic": topic,
+        "min_velocity": min_velocity,
+        "cursor": cursor,
+        "facets": ",".join(sorted(facet_names)) or None,
+    }
+    
+    def load(db: Session) -> JSONPayload:
+        rows = get_trending_story_rows(
+            db=db,
+            limit=limit,
+            min_score=min_score,
+            platform=platform,
+            hours_back=hours_back,
+            is_kenyan=is_kenyan,
+            location=location,
+            topic=topic,
+            min_velocity=min_velocity,
+            after=after
+        )
+        
+        headers = {}
+        if len(rows) == limit and rows[-1].rank_key is not None:
+            headers["X-Next-Cursor"] = encode_feed_cursor(rows[-1].rank_key, rows[-1].id)
+        stories = [story_row_to_dict(row) for row in rows]
+        
+        if not facet_names:
+            return JSONPayload(stories, headers)
+        
+        counts = get_feed_facets(
+            db,
+            facet_names,
+            min_score=min_score,
+            platform=platform,
+            hours_back=hours_back,
+            is_kenyan=is_kenyan,
+            location=location,
+            topic=topic,
+            min_velocity=min_velocity
+        )
+        return JSONPayload({"stories": stories, "facets": counts}, headers)
+    
+    return await cached_json_response("stories", params, load, (STORIES,), request)
 
 
 @app.get("/api/stories/hot", response_model=List[StoryResponse])
 async def get_hot_stories(
+    request: Request,
     limit: int = Query(30, ge=1, le=100),
     is_kenyan: Optional[bool] = Query(None),
-    hours_back: int = Query(6, ge=1, le=24),
-    db: Session = Depends(get_db)
+    hours_back: int = Query(6, ge=1, le=24)
 ):
     """
     Get hot/emerging stories - high engagement velocity stories that are trending NOW.
@@ -191,261 +385,509 @@ async def get_hot_stories(
         limit: Maximum number of stories to return
         is_kenyan: Filter Kenyan stories only (recommended for Kenya-focused monitoring)
         hours_back: Only get stories from last N hours (default: 6 hours for recent trends)
-        db: Database session
     """
-    # For hot stories, we want high engagement velocity (trending now)
-    # Lower the time window to catch fresh trends
-    # Prioritize by engagement velocity (not just score)
-    from sqlalchemy import and_
-    from datetime import datetime, timedelta
+    def load(db: Session) -> List[Dict]:
+        rows = get_hot_story_rows(db, limit=limit, is_kenyan=is_kenyan, hours_back=hours_back)
+        return [story_row_to_dict(row) for row in rows]
+    
+    params = {"limit": limit, "is_kenyan": is_kenyan, "hours_back": hours_back}
+    return await cached_json_response("stories_hot", params, load, (STORIES,), request)
+
+
+@app.get("/api/stories/changes")
+async def get_stories_changes(
+    since: Optional[str] = Query(None, description="next_since of the previous call, or an ISO timestamp (UTC)"),
+    limit: int = Query(200, ge=1, le=500),
+    is_kenyan: Optional[bool] = Query(None),
+    platform: Optional[str] = Query(None),
+    topic: Optional[str] = Query(None)
+):
+    """
+    Get stories created, updated or deactivated since the client's last sync.
     
-    time_threshold = datetime.utcnow() - timedelta(hours=hours_back)
+    Call without ``since`` after a full feed load to get a starting token,
+    then pass each response's ``next_since`` back. Updated and new stories
+    come in ``stories`` (replace by id), deactivated ones as IDs in
+    ``removed``. While ``has_more`` is true, call again right away.
     
-    query = db.query(Story).filter(
-        Story.is_active == True,
-        Story.posted_at >= time_threshold
-    )
+    Args:
+        since: Sync token (or timestamp) to get changes after
+        limit: Maximum number of changed stories per call
+        is_kenyan: Filter Kenyan stories only
+        platform: Filter by platform
+        topic: Filter by topic
+    """
+    try:
+        position = decode_changes_token(since) if since else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def load(db: Session) -> Dict:
+        rows, next_since, has_more = get_story_changes(
+            db, position, limit=limit, is_kenyan=is_kenyan, platform=platform, topic=topic
+        )
+        return {
+            "stories": [story_row_to_dict(row) for row in rows if row.is_active],
+            "removed": [str(row.id) for row in rows if not row.is_active],
+            "next_since": next_since,
+            "has_more": has_more,
+        }
+    
+    return Response(encode_json(await run_db(load)), media_type="application/json")
+
+
+@app.get("/api/stories/search", response_model=List[StoryResponse])
+async def search_stories(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0, le=1000),
+    sort: str = Query("relevance", pattern=f"^({'|'.join(SEARCH_SORTS)})$"),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    platform: Optional[str] = Query(None),
+    hours_back: int = Query(168, ge=1, le=720),
+    is_kenyan: Optional[bool] = Query(None),
+    topic: Optional[str] = Query(None)
+):
+    """
+    Search stories by headline and content (full-text index).
     
-    # Filter Kenyan if requested
-    if is_kenyan is not None:
-        query = query.filter(Story.is_kenyan == is_kenyan)
+    Every word must match; the last word also matches as a prefix. When
+    more matches may follow, the response carries an X-Next-Offset header.
     
-    # For hot stories, prioritize by engagement velocity (catching trends early)
-    # Require minimum velocity of 20/hour for "hot" status
-    query = query.filter(Story.engagement_velocity >= 20.0)
+    Args:
+        q: Search text
+        limit: Maximum number of stories to return
+        offset: Number of matches to skip
+        sort: relevance (weighted by story score), recent or score
+        min_score: Minimum score threshold
+        platform: Filter by platform
+        hours_back: Only search stories from last N hours
+        is_kenyan: Filter Kenyan stories only
+        topic: Filter by topic
+    """
+    params = {
+        "q": q.strip().lower(),
+        "limit": limit,
+        "offset": offset,
+        "sort": sort,
+        "min_score": min_score,
+        "platform": platform,
+        "hours_back": hours_back,
+        "is_kenyan": is_kenyan,
+        "topic": topic,
+    }
     
-    # Order by engagement velocity DESC (hottest first), then by score
-    stories = query.order_by(
-        Story.engagement_velocity.desc(),  # Highest velocity first (trending NOW)
-        Story.is_kenyan.desc(),  # Kenyan content second
-        Story.score.desc(),  # Then by overall score
-        Story.posted_at.desc()  # Most recent last
-    ).limit(limit).all()
+    def load(db: Session) -> JSONPayload:
+        rows = search_story_rows(
+            db,
+            q,
+            limit=limit,
+            offset=offset,
+            sort=sort,
+            min_score=min_score,
+            platform=platform,
+            hours_back=hours_back,
+            is_kenyan=is_kenyan,
+            topic=topic
+        )
+        
+        headers = {}
+        if len(rows) == limit:
+            headers["X-Next-Offset"] = str(offset + limit)
+        return JSONPayload([story_row_to_dict(row) for row in rows], headers)
     
-    return [story_to_response(story) for story in stories]
+    return await cached_json_response("stories_search", params, load, (STORIES,), request)
+
+
+@app.post("/api/stories/batch", response_model=List[StoryResponse])
+async def get_stories_batch(batch: StoryBatchRequest):
+    """
+    Get several stories by ID (POST variant of /api/stories?ids=, for long ID lists).
+    
+    Args:
+        batch: Story IDs; stories are returned in this order, unknown IDs skipped
+    """
+    return await story_batch_response(batch.ids)
 
 
 @app.get("/api/stories/{story_id}", response_model=StoryResponse)
-async def get_story(story_id: int, db: Session = Depends(get_db)):
+async def get_story(request: Request, story_id: int):
     """Get a single story by ID."""
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
-    return story_to_response(story)
+    def load(db: Session) -> StoryResponse:
+        story = db.query(Story).filter(Story.id == story_id).first()
+        if not story:
+            raise HTTPException(status_code=404, detail="Story not found")
+        return story_to_response(story)
+    
+    return await cached_json_response("story", {"id": story_id}, load, (STORIES,), request)
+
+
+@app.get("/api/feeds")
+async def list_feeds():
+    """List the precomputed feeds served at /api/feeds/{name}."""
+    return [
+        {
+            "name": feed.name,
+            "title": feed.title,
+            "is_kenyan": feed.is_kenyan,
+            "location": feed.location,
+            "platforms": list(feed.platforms),
+            "topics": list(feed.topics),
+            "min_score": feed.min_score,
+            "min_velocity": feed.min_velocity,
+            "hours_back": feed.hours_back,
+            "size": feed_size(feed),
+        }
+        for feed in FEED_DEFINITIONS.values()
+    ]
+
+
+@app.get("/api/feeds/{name}", response_model=List[StoryResponse])
+async def get_feed(
+    request: Request,
+    name: str,
+    limit: Optional[int] = Query(None, ge=1, description="At most the feed's size (default: all)")
+):
+    """
+    Get a precomputed feed (e.g. kenya, africa, global).
+    
+    The feed's top stories are recomputed after each scoring batch, so this
+    is a single row lookup however selective the feed's filters are. The
+    X-Feed-Computed-At header tells when the stories were ranked.
+    
+    Args:
+        name: Feed name (see /api/feeds)
+        limit: Maximum number of stories to return
+    """
+    if name not in FEED_DEFINITIONS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown feed '{name}'. Available: {', '.join(FEED_DEFINITIONS)}"
+        )
+    
+    def load(db: Session) -> JSONPayload:
+        stories, computed_at = load_feed(db, name)
+        headers = {"X-Feed-Computed-At": computed_at.isoformat()} if computed_at else {}
+        return JSONPayload([story_event_to_dict(story) for story in stories[:limit]], headers)
+    
+    return await cached_json_response("feed", {"name": name, "limit": limit}, load, (FEEDS,), request)
 
 
-@app.post("/api/scrape/{source_id}", response_model=ScrapeResponse)
-async def scrape_source_endpoint(source_id: int, db: Session = Depends(get_db)):
+@app.get("/api/stream/stories")
+async def stream_stories(
+    request: Request,
+    is_kenyan: Optional[bool] = Query(None),
+    platform: Optional[str] = Query(None),
+    min_velocity: Optional[float] = Query(None, ge=0, description="20 matches the hot stories feed")
+):
     """
-    Trigger scraping for a specific source.
+    Server-Sent Events stream of new stories, pushed as soon as they are committed.
+    
+    Each ``story`` event carries a StoryResponse-shaped JSON object and the
+    story ID as event ID. A client reconnecting with Last-Event-ID first gets
+    the stories it missed (up to stream_backlog_limit). A client that falls
+    behind by more than stream_client_buffer events receives a ``dropped``
+    event and is disconnected; EventSource then reconnects and catches up.
+    
+    Args:
+        is_kenyan: Only stream Kenyan stories
+        platform: Only stream stories from this platform
+        min_velocity: Minimum engagement velocity
+    """
+    broadcaster = get_broadcaster()
+    if broadcaster is None:
+        raise HTTPException(status_code=503, detail="Live story stream is disabled")
+    
+    last_event_id = request.headers.get("last-event-id", "")
+    
+    async def events():
+        subscription = broadcaster.subscribe(stream_filter(is_kenyan, platform, min_velocity))
+        try:
+            yield "retry: 5000\n\n"
+            
+            # Subscribed before the catch-up query, so overlapping stories are skipped below
+            replayed_up_to = 0
+            if last_event_id.isdigit():
+                rows = await run_db(
+                    get_story_rows_after, int(last_event_id), settings.stream_backlog_limit,
+                    is_kenyan=is_kenyan, platform=platform, min_velocity=min_velocity
+                )
+                for row in rows:
+                    yield f"id: {row.id}\nevent: story\ndata: {encode_json(story_row_to_dict(row)).decode('utf-8')}\n\n"
+                    replayed_up_to = row.id
+            
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), settings.stream_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                if message is None:
+                    if subscription.dropped:
+                        yield "event: dropped\ndata: {}\n\n"
+                    break
+                if message.id <= replayed_up_to:
+                    continue
+                yield f"id: {message.id}\nevent: story\ndata: {message.data}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # No proxy buffering
+    )
+
+
+@app.websocket("/api/ws/stories")
+async def stream_stories_ws(
+    websocket: WebSocket,
+    is_kenyan: Optional[bool] = None,
+    platform: Optional[str] = None,
+    min_velocity: Optional[float] = None
+):
+    """
+    WebSocket variant of /api/stream/stories: one JSON story object per text message.
+    
+    Slow consumers are closed with code 1013 (try again later).
+    """
+    broadcaster = get_broadcaster()
+    if broadcaster is None:
+        await websocket.close(code=1013)
+        return
+    
+    await websocket.accept()
+    subscription = broadcaster.subscribe(stream_filter(is_kenyan, platform, min_velocity))
+    
+    # Keep reading so a client that goes away is noticed while it is idle
+    disconnected = asyncio.ensure_future(websocket.receive())
+    try:
+        while True:
+            next_message = asyncio.ensure_future(subscription.queue.get())
+            await asyncio.wait({next_message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            
+            if not next_message.done():
+                next_message.cancel()
+                if disconnected.result()["type"] == "websocket.disconnect":
+                    break
+                disconnected = asyncio.ensure_future(websocket.receive())  # Ignore client messages
+                continue
+            
+            message = next_message.result()
+            if message is None:
+                await websocket.close(code=1013 if subscription.dropped else 1001)
+                break
+            await websocket.send_text(message.data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        broadcaster.unsubscribe(subscription)
+
+
+async def submit_scrape(
+    scrape_type: str,
+    source_id: Optional[int] = None,
+    hashtag_id: Optional[int] = None,
+    params: Optional[Dict] = None
+) -> JSONResponse:
+    """
+    Queue a scrape job (or join the active one for the same target) and answer 202 Accepted.
+    
+    Args:
+        scrape_type: SCRAPE_SOURCE, SCRAPE_HASHTAG or SCRAPE_FACEBOOK_TRENDS
+        source_id: Source to scrape
+        hashtag_id: Hashtag to scrape
+        params: Extra scrape parameters
+    
+    Returns:
+        Job status with status_url and coalesced flag, plus a Location header
+    """
+    def submit(db: Session) -> Dict:
+        job, created = submit_scrape_job(db, scrape_type, source_id=source_id, hashtag_id=hashtag_id)
+        if created:
+            dispatch_scrape_job(db, job, params)
+        return {**job_to_dict(job), "coalesced": not created}
+    
+    try:
+        job = await run_db(submit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    status_url = f"/api/jobs/{job['job_id']}"
+    return JSONResponse(
+        status_code=202,
+        content={**job, "status_url": status_url},
+        headers={"Location": status_url}
+    )
+
+
+@app.post("/api/scrape/{source_id:int}", status_code=202)
+async def scrape_source_endpoint(source_id: int):
+    """
+    Queue scraping for a specific source.
+    
+    Returns immediately with a job ID; poll /api/jobs/{job_id} for progress.
+    A source that is already being scraped returns the running job.
     
     Args:
         source_id: ID of the source to scrape
-        db: Database session
     """
-    result = scrape_source(db, source_id)
+    return await submit_scrape(SCRAPE_SOURCE, source_id=source_id)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_scrape_job(job_id: int):
+    """
+    Get status and counts of a scrape job.
+    
+    Args:
+        job_id: Job ID returned by a scrape endpoint
+    """
+    def load(db: Session) -> Optional[Dict]:
+        job = db.get(ScrapeLog, job_id)
+        return job_to_dict(job) if job else None
     
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
+    job = await run_db(load)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    return ScrapeResponse(**result)
+    return job
 
 
 @app.get("/api/sources")
 async def get_sources(
-    is_kenyan: Optional[bool] = Query(None),
-    db: Session = Depends(get_db)
+    request: Request,
+    is_kenyan: Optional[bool] = Query(None)
 ):
     """Get all active sources."""
-    query = db.query(Source).filter(Source.is_active == True)
-    
-    if is_kenyan is not None:
-        query = query.filter(Source.is_kenyan == is_kenyan)
+    def load(db: Session) -> List[Dict]:
+        query = db.query(Source).filter(Source.is_active == True)
+        
+        if is_kenyan is not None:
+            query = query.filter(Source.is_kenyan == is_kenyan)
+        
+        sources = query.all()
+        return [
+            {
+                "id": source.id,
+                "platform": source.platform,
+                "account_handle": source.account_handle,
+                "account_name": source.account_name,
+                "is_trusted": source.is_trusted,
+                "is_kenyan": source.is_kenyan,
+                "location": source.location,
+                "last_checked_at": source.last_checked_at.isoformat() if source.last_checked_at else None
+            }
+            for source in sources
+        ]
     
-    sources = query.all()
-    return [
-        {
-            "id": source.id,
-            "platform": source.platform,
-            "account_handle": source.account_handle,
-            "account_name": source.account_name,
-            "is_trusted": source.is_trusted,
-            "is_kenyan": source.is_kenyan,
-            "location": source.location,
-            "last_checked_at": source.last_checked_at.isoformat() if source.last_checked_at else None
-        }
-        for source in sources
-    ]
+    return await cached_json_response("sources", {"is_kenyan": is_kenyan}, load, (SOURCES,), request)
 
 
-@app.post("/api/scrape/facebook-trends")
+@app.post("/api/scrape/facebook-trends", status_code=202)
 async def scrape_facebook_trends_endpoint(
     posts_per_page: int = Query(10, ge=1, le=50),
     top_n: int = Query(50, ge=1, le=200),
-    min_trend_score: float = Query(10.0, ge=0),
-    db: Session = Depends(get_db)
+    min_trend_score: float = Query(10.0, ge=0)
 ):
     """
-    Aggregate Facebook trends from multiple Pages.
+    Queue Facebook trend aggregation across multiple Pages.
     
-    This endpoint:
+    The job:
     1. Fetches posts from all active Facebook Pages
     2. Computes trend_score = (likes + comments + shares) / minutes_since_posted
     3. Ranks by trend_score DESC
     4. Stores top N trending posts in raw_posts
     
+    Returns immediately with a job ID; poll /api/jobs/{job_id} for progress.
+    
     Args:
         posts_per_page: Number of posts to fetch per page
         top_n: Number of top trending posts to keep
         min_trend_score: Minimum trend score threshold
-        db: Database session
     """
-    from models import Source
-    from trend_aggregator import scrape_and_store_trends
-    
-    # Get all active Facebook Pages
-    facebook_pages = db.query(Source).filter(
-        Source.platform == "Facebook",
-        Source.is_active == True,
-        Source.account_id.isnot(None)  # Must have Page ID
-    ).all()
-    
-    if not facebook_pages:
-        raise HTTPException(
-            status_code=400,
-            detail="No active Facebook Pages found. Add Pages using add_facebook_pages.py"
-        )
-    
-    # Aggregate trends
-    result = scrape_and_store_trends(
-        db=db,
-        page_sources=facebook_pages,
-        posts_per_page=posts_per_page,
-        top_n=top_n,
-        min_trend_score=min_trend_score
+    return await submit_scrape(
+        SCRAPE_FACEBOOK_TRENDS,
+        params={"posts_per_page": posts_per_page, "top_n": top_n, "min_trend_score": min_trend_score}
     )
-    
-    return result
 
 
 @app.get("/api/hashtags")
 async def get_hashtags(
-    is_kenyan: Optional[bool] = Query(None),
-    db: Session = Depends(get_db)
+    request: Request,
+    is_kenyan: Optional[bool] = Query(None)
 ):
     """Get all active hashtags."""
     from models import Hashtag
     
-    query = db.query(Hashtag).filter(Hashtag.is_active == True)
-    
-    if is_kenyan is not None:
-        query = query.filter(Hashtag.is_kenyan == is_kenyan)
+    def load(db: Session) -> List[Dict]:
+        query = db.query(Hashtag).filter(Hashtag.is_active == True)
+        
+        if is_kenyan is not None:
+            query = query.filter(Hashtag.is_kenyan == is_kenyan)
+        
+        hashtags = query.all()
+        return [
+            {
+                "id": hashtag.id,
+                "hashtag": hashtag.hashtag,
+                "platform": hashtag.platform,
+                "is_kenyan": hashtag.is_kenyan,
+                "last_scraped_at": hashtag.last_scraped_at.isoformat() if hashtag.last_scraped_at else None
+            }
+            for hashtag in hashtags
+        ]
     
-    hashtags = query.all()
-    return [
-        {
-            "id": hashtag.id,
-            "hashtag": hashtag.hashtag,
-            "platform": hashtag.platform,
-            "is_kenyan": hashtag.is_kenyan,
-            "last_scraped_at": hashtag.last_scraped_at.isoformat() if hashtag.last_scraped_at else None
-        }
-        for hashtag in hashtags
-    ]
+    return await cached_json_response("hashtags", {"is_kenyan": is_kenyan}, load, (HASHTAGS,), request)
 
 
-@app.post("/api/scrape/hashtag/{hashtag_id}")
-async def scrape_hashtag_endpoint(hashtag_id: int, db: Session = Depends(get_db)):
-    """Trigger scraping for a specific hashtag."""
-    from hashtag_scraper import scrape_hashtag
-    
-    result = scrape_hashtag(db, hashtag_id)
+@app.post("/api/scrape/hashtag/{hashtag_id}", status_code=202)
+async def scrape_hashtag_endpoint(hashtag_id: int):
+    """Queue scraping for a specific hashtag (poll /api/jobs/{job_id} for progress)."""
+    return await submit_scrape(SCRAPE_HASHTAG, hashtag_id=hashtag_id)
+
+
+@app.get("/api/scoring/profile")
+async def get_scoring_profile():
+    """Get the scoring profile currently used for new and rescored stories."""
+    evaluator = await run_db(get_active_evaluator)
+    return profile_to_dict(evaluator)
+
+
+@app.post("/api/scoring/profiles")
+async def create_scoring_profile(request: ScoringProfileRequest):
+    """
+    Store a new version of a named scoring profile.
     
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
+    Active profiles are picked up by the API, scheduler and Celery workers
+    without a restart (see scoring_profile_refresh_seconds).
+    """
+    def store(db: Session) -> Dict:
+        profile = save_profile(db, request.name, request.params, activate=request.activate)
+        return profile_to_dict(compile_profile(profile))
     
-    return result
+    try:
+        return await run_db(store)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/api/insights")
 async def get_insights(
-    hours_back: int = Query(24, ge=1, le=168),
-    db: Session = Depends(get_db)
+    request: Request,
+    hours_back: int = Query(24, ge=1, le=168)
 ):
     """
     Get insights and analytics data.
     
     Args:
         hours_back: Time range for insights
-        db: Database session
-    """
-    time_threshold = datetime.utcnow() - timedelta(hours=hours_back)
-    
-    # Get stories in time range
-    stories = db.query(Story).filter(
-        Story.is_active == True,
-        Story.posted_at >= time_threshold
-    ).all()
-    
-    # Calculate topic clusters
-    topic_counts = {}
-    for story in stories:
-        topic = story.topic or "General"
-        topic_counts[topic] = topic_counts.get(topic, 0) + 1
-    
-    # Get trending topics (top 5)
-    trending_topics = sorted(
-        topic_counts.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:5]
-    
-    # Calculate platform distribution
-    platform_counts = {}
-    for story in stories:
-        platform = story.platform
-        platform_counts[platform] = platform_counts.get(platform, 0) + 1
-    
-    # Calculate velocity distribution
-    high_velocity = sum(1 for s in stories if s.engagement_velocity >= 100)
-    medium_velocity = sum(1 for s in stories if 50 <= s.engagement_velocity < 100)
-    low_velocity = sum(1 for s in stories if s.engagement_velocity < 50)
-    
-    # Get top keywords from story headlines
-    keywords = {}
-    for story in stories:
-        if story.headline:
-            words = story.headline.lower().split()
-            for word in words:
-                if len(word) > 4:  # Only meaningful words
-                    keywords[word] = keywords.get(word, 0) + 1
-    
-    top_keywords = sorted(keywords.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    active_sources = db.query(Source).filter(Source.is_active == True).count()
+    """
+    def load(db: Session) -> Dict:
+        return build_insights(db, hours_back)
     
-    return {
-        "total_stories": len(stories),
-        "high_velocity": high_velocity,
-        "medium_velocity": medium_velocity,
-        "low_velocity": low_velocity,
-        "active_sources": active_sources,
-        "trending_topics": [
-            {"name": topic, "count": count}
-            for topic, count in trending_topics
-        ],
-        "platform_distribution": platform_counts,
-        "top_keywords": [
-            {"keyword": word, "mentions": count}
-            for word, count in top_keywords
-        ],
-        "topic_clusters": [
-            {
-                "topic": topic,
-                "count": count,
-                "velocity": "rising" if count > len(stories) / len(topic_counts) else "stable",
-                "keywords": [word for word, _ in top_keywords[:3]]
-            }
-            for topic, count in trending_topics
-        ]
-    }
+    # Rollups and keyword sketches change in the same transactions as stories
+    return await cached_json_response("insights", {"hours_back": hours_back}, load, (STORIES, SOURCES), request)
@@ -2,11 +2,20 @@
 import threading
 import time
 from datetime import datetime, timedelta
+from typing import Dict, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from database import SessionLocal
+from database import SessionLocal, ROLE_SCHEDULER, set_thread_role
 from services import scrape_source
+from snapshots import prune_snapshots
+from expiry import expire_stories
+from rollups import prune_rollups
+from keyword_sketches import prune_sketches
+from hot_stories import prune_hot_stories
+from precomputed_feeds import refresh_feeds
+from snapshot_export import export_snapshots
 from models import Source
+from config import settings
 from loguru import logger
 
 
@@ -24,6 +33,9 @@ class BackgroundScheduler:
         self.running = False
         self.thread = None
         self.last_check = {}
+        self.last_maintenance = {}
+        self.last_cycle_started_at = None
+        self.last_cycle_completed_at = None
     
     def _should_scrape(self, db: Session, source: Source) -> bool:
         """
@@ -85,19 +97,89 @@ class BackgroundScheduler:
         finally:
             db.close()
     
+    def _run_if_due(self, name: str, interval_minutes: int, job):
+        """
+        Run a housekeeping job in its own session if its interval has elapsed.
+        
+        Args:
+            name: Job name (used to track the last run)
+            interval_minutes: Minimum minutes between runs
+            job: Callable taking (db, current_time)
+        """
+        now = datetime.utcnow()
+        last_run = self.last_maintenance.get(name)
+        if last_run and now - last_run < timedelta(minutes=interval_minutes):
+            return
+        
+        db = SessionLocal()
+        try:
+            job(db, now)
+            self.last_maintenance[name] = now
+        except Exception as e:
+            logger.error(f"Error running {name}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+    
+    def _run_maintenance(self):
+        """Run periodic housekeeping (snapshot retention, story expiry, insights pruning) when it is due."""
+        self._run_if_due("snapshot_prune", settings.snapshot_prune_interval_minutes, prune_snapshots)
+        self._run_if_due("story_expiry", settings.story_expiry_interval_minutes, expire_stories)
+        self._run_if_due("hot_story_prune", settings.story_expiry_interval_minutes, prune_hot_stories)
+        self._run_if_due("rollup_prune", settings.rollup_prune_interval_minutes, prune_rollups)
+        self._run_if_due("keyword_sketch_prune", settings.rollup_prune_interval_minutes, prune_sketches)
+    
     def _run(self):
         """Main scheduler loop."""
+        set_thread_role(ROLE_SCHEDULER)  # Scrapes and maintenance use their own connection pool
         logger.info(f"Background scheduler started (checking every {self.check_interval_minutes} minute(s))")
         
         while self.running:
+            self.last_cycle_started_at = datetime.utcnow()
             try:
                 self._scrape_sources()
+                self._run_maintenance()
+                # Recompute dashboard feeds changed by this cycle's scoring batch and expiry
+                self._run_if_due("feed_refresh", 0, refresh_feeds)
+                if settings.snapshot_export_dir:
+                    self._run_if_due("snapshot_export", 0, export_snapshots)
             except Exception as e:
                 logger.error(f"Error in scheduler loop: {e}")
+            self.last_cycle_completed_at = datetime.utcnow()
             
             # Sleep for check interval
             time.sleep(self.check_interval_minutes * 60)
     
+    def cycle_status(self, current_time: Optional[datetime] = None) -> Dict:
+        """
+        Describe the latest scrape/maintenance cycle.
+        
+        Lag is how far the next cycle is overdue: time since the last cycle
+        finished beyond the check interval, or, while a cycle runs, the time
+        it has been running beyond one interval.
+        
+        Args:
+            current_time: Reference time (defaults to now, UTC)
+        
+        Returns:
+            Dictionary with last cycle timestamps and lag_seconds (None before the first cycle)
+        """
+        now = current_time or datetime.utcnow()
+        interval = self.check_interval_minutes * 60
+        started, completed = self.last_cycle_started_at, self.last_cycle_completed_at
+        
+        lag = None
+        if started and (not completed or completed < started):
+            lag = max(0.0, (now - started).total_seconds() - interval)  # Cycle in progress
+        elif completed:
+            lag = max(0.0, (now - completed).total_seconds() - interval)
+        
+        return {
+            "last_cycle_started_at": started.isoformat() if started else None,
+            "last_cycle_completed_at": completed.isoformat() if completed else None,
+            "lag_seconds": round(lag, 1) if lag is not None else None,
+        }
+    
     def start(self):
         """Start the background scheduler."""
         if self.running:
@@ -1,12 +1,21 @@
 """Celery configuration and tasks for scheduled scraping."""
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init, worker_process_init
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from database import SessionLocal
+from database import SessionLocal, ROLE_WORKER, set_process_role, dispose_engines
 from services import scrape_source
 from hashtag_scraper import scrape_hashtag
 from trend_aggregator import scrape_and_store_trends
+from snapshots import prune_snapshots
+from expiry import expire_stories
+from rollups import prune_rollups
+from keyword_sketches import prune_sketches
+from hot_stories import prune_hot_stories
+from precomputed_feeds import refresh_feeds
+from snapshot_export import export_snapshots
+from scrape_jobs import run_scrape_job
 from models import Source, Hashtag
 from config import settings
 from loguru import logger
@@ -27,6 +36,14 @@ celery_app.conf.update(
 )
 
 
+@worker_init.connect
+@worker_process_init.connect
+def use_worker_pool(**kwargs):
+    """Run worker tasks on the worker role's connection pool, without connections inherited from the parent."""
+    set_process_role(ROLE_WORKER)
+    dispose_engines()
+
+
 @celery_app.task(name="scrape_source_task")
 def scrape_source_task(source_id: int):
     """
@@ -48,6 +65,19 @@ def scrape_source_task(source_id: int):
         db.close()
 
 
+@celery_app.task(name="run_scrape_job_task")
+def run_scrape_job_task(job_id: int, params: dict = None):
+    """
+    Celery task to run a scrape job submitted through the API.
+    
+    Args:
+        job_id: ScrapeLog ID of the queued job
+        params: Extra scrape parameters
+    """
+    logger.info(f"Starting scrape job {job_id}")
+    return run_scrape_job(job_id, params)
+
+
 @celery_app.task(name="scrape_all_active_sources")
 def scrape_all_active_sources():
     """
@@ -103,11 +133,16 @@ def scrape_all_active_sources():
             other_results.append(result)
         
         logger.info(f"Scrape all task completed: {len(other_results)} other sources processed")
+        
+        # Recompute dashboard feeds from this scoring batch
+        feeds_refreshed = refresh_feeds(db)
+        
         return {
             "facebook_pages_scraped": len(facebook_pages),
             "facebook_result": facebook_result,
             "other_sources_processed": len(other_results),
-            "other_results": other_results
+            "other_results": other_results,
+            "feeds_refreshed": feeds_refreshed
         }
     except Exception as e:
         logger.error(f"Error in scrape all task: {e}")
@@ -152,6 +187,72 @@ def scrape_all_active_hashtags():
         db.close()
 
 
+@celery_app.task(name="prune_engagement_snapshots")
+def prune_engagement_snapshots():
+    """
+    Celery task to apply the engagement snapshot retention policy.
+    """
+    db = SessionLocal()
+    try:
+        return prune_snapshots(db)
+    except Exception as e:
+        logger.error(f"Error pruning engagement snapshots: {e}")
+        db.rollback()
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="expire_old_stories")
+def expire_old_stories():
+    """
+    Celery task to deactivate stories that aged out or decayed below the score floor
+    and drop stories that aged out of the hot set.
+    """
+    db = SessionLocal()
+    try:
+        return {"stories_expired": expire_stories(db), "hot_stories_pruned": prune_hot_stories(db)}
+    except Exception as e:
+        logger.error(f"Error expiring stories: {e}")
+        db.rollback()
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="prune_story_rollups")
+def prune_story_rollups():
+    """
+    Celery task to delete empty and out-of-window insights rollup rows and keyword sketches.
+    """
+    db = SessionLocal()
+    try:
+        return {"rows_deleted": prune_rollups(db), "sketches_deleted": prune_sketches(db)}
+    except Exception as e:
+        logger.error(f"Error pruning story rollups: {e}")
+        db.rollback()
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="refresh_precomputed_feeds")
+def refresh_precomputed_feeds():
+    """
+    Celery task to recompute dashboard feeds changed since the last refresh (hashtag scrapes, jobs, expiry)
+    and write the static snapshots when snapshot_export_dir is set.
+    """
+    db = SessionLocal()
+    try:
+        return {"feeds_refreshed": refresh_feeds(db), "snapshots_written": export_snapshots(db)}
+    except Exception as e:
+        logger.error(f"Error refreshing precomputed feeds: {e}")
+        db.rollback()
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+
 # Configure periodic tasks
 celery_app.conf.beat_schedule = {
     'scrape-all-sources-every-15-minutes': {
@@ -162,6 +263,22 @@ celery_app.conf.beat_schedule = {
         'task': 'scrape_all_active_hashtags',
         'schedule': crontab(minute='*/30'),  # Every 30 minutes
     },
+    'prune-engagement-snapshots-hourly': {
+        'task': 'prune_engagement_snapshots',
+        'schedule': crontab(minute=5),  # Every hour
+    },
+    'expire-old-stories-every-15-minutes': {
+        'task': 'expire_old_stories',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+    },
+    'prune-story-rollups-hourly': {
+        'task': 'prune_story_rollups',
+        'schedule': crontab(minute=20),  # Every hour
+    },
+    'refresh-precomputed-feeds-every-5-minutes': {
+        'task': 'refresh_precomputed_feeds',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+    },
 }
 
 # You can also add per-source schedules dynamically
@@ -0,0 +1,212 @@
+"""Response compression (Brotli / zstd / gzip) negotiated from Accept-Encoding.
+
+Story lists are mostly repeated headline and reason text, so they shrink
+several times over when compressed. Two paths share the codecs here:
+
+- Cached JSON responses (response_cache) keep each compressed variant next
+  to the cached body, so a hot feed is compressed once per encoding at a
+  high level (on the DB thread pool, off the event loop) and every later
+  poll sends the stored bytes.
+- CompressionMiddleware compresses all other large text responses on the
+  fly at a faster level. Responses that already carry Content-Encoding and
+  streams (Server-Sent Events) pass through untouched.
+
+Brotli (``brotli``) and zstd (``zstandard``) are optional; without them
+clients get gzip.
+"""
+import gzip
+from typing import Dict, List, Optional, Tuple
+from config import settings
+
+try:
+    import brotli  # Optional: smallest output for text
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard  # Optional: fast with good ratios
+except ImportError:
+    zstandard = None
+
+GZIP = "gzip"
+BROTLI = "br"
+ZSTD = "zstd"
+
+# Preferred first when the client accepts several with equal q (bandwidth is the bottleneck)
+PREFERENCE = (BROTLI, ZSTD, GZIP)
+
+# Compression levels: (compressed once and cached, compressed per response)
+LEVELS = {
+    BROTLI: (9, 4),
+    ZSTD: (12, 3),
+    GZIP: (9, 6),
+}
+
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodings this process can produce, in preference order."""
+    installed = {BROTLI: brotli is not None, ZSTD: zstandard is not None, GZIP: True}
+    return tuple(encoding for encoding in PREFERENCE if installed[encoding])
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the best encoding the client accepts (q-values honored, q=0 refuses).
+    
+    Args:
+        accept_encoding: Accept-Encoding header value
+    
+    Returns:
+        "br", "zstd" or "gzip", or None to send the body uncompressed
+    """
+    if not settings.compression_enabled or not accept_encoding:
+        return None
+    
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+    
+    wildcard = weights.get("*", 0.0)
+    candidates: List[Tuple[float, int, str]] = []
+    for rank, encoding in enumerate(available_encodings()):
+        weight = weights.get(encoding, wildcard)
+        if weight > 0:
+            candidates.append((weight, -rank, encoding))
+    
+    return max(candidates)[2] if candidates else None
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """
+    Compress a response body.
+    
+    Args:
+        body: Uncompressed bytes
+        encoding: "br", "zstd" or "gzip" (from negotiate_encoding)
+        cached: Use the slower, denser level for bodies that are compressed once and reused
+    
+    Returns:
+        Compressed bytes
+    """
+    level = LEVELS[encoding][0 if cached else 1]
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=level)
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """Whether a Content-Type is worth compressing (text-like, not an event stream)."""
+    if not content_type:
+        return False
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type in COMPRESSIBLE_TYPES
+
+
+def _vary_with_accept_encoding(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Add Accept-Encoding to the Vary header (the body depends on it)."""
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large text responses for clients that accept it."""
+    
+    def __init__(self, app, minimum_size: int):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: ASGI application
+            minimum_size: Bodies smaller than this many bytes are sent as-is
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        
+        accept_encoding = None
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        await self.app(scope, receive, _CompressingSender(send, encoding, self.minimum_size))
+
+
+class _CompressingSender:
+    """Wraps ASGI send: buffers a compressible response and sends it compressed."""
+    
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self._send = send
+        self._encoding = encoding
+        self._minimum_size = minimum_size
+        self._start = None
+        self._chunks: List[bytes] = []
+        self._passthrough = False
+    
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = message.get("headers", [])
+            content_type = content_encoding = None
+            for name, value in headers:
+                name = name.lower()
+                if name == b"content-type":
+                    content_type = value.decode("latin-1")
+                elif name == b"content-encoding":
+                    content_encoding = value
+            
+            status = message["status"]
+            if content_encoding is not None or status < 200 or status in (204, 304) or not is_compressible(content_type):
+                self._passthrough = True
+                await self._send(message)
+            else:
+                self._start = message
+            return
+        
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+        
+        self._chunks.append(message.get("body", b""))
+        if message.get("more_body", False):
+            return
+        
+        body = b"".join(self._chunks)
+        headers = [
+            (name, value) for name, value in self._start.get("headers", [])
+            if name.lower() != b"content-length"
+        ]
+        headers = _vary_with_accept_encoding(headers)
+        
+        if len(body) >= self._minimum_size:
+            body = compress(body, self._encoding)
+            headers.append((b"content-encoding", self._encoding.encode("latin-1")))
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        
+        await self._send({**self._start, "headers": headers})
+        await self._send({"type": "http.response.body", "body": body})
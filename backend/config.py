@@ -1,6 +1,6 @@
 """Configuration settings for the Story Intelligence Dashboard backend."""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -16,6 +16,23 @@ class Settings(BaseSettings):
     # Database URL (constructed from above, or can be set directly)
     database_url: str = ""
     
+    # Connection pools per process role (see database.py). An API process opens at most
+    # api + scheduler pool_size + max_overflow connections; a Celery worker process the worker's.
+    db_role: str = "api"  # Role of this process's default engine (Celery worker processes switch to "worker")
+    db_pool_recycle_seconds: int = 3600  # Recycle connections after this many seconds
+    db_api_pool_size: int = 10  # Request handlers, health probe, cache version reads
+    db_api_max_overflow: int = 2
+    db_api_pool_timeout: float = 10.0  # Seconds to wait for a free connection before failing the request
+    db_api_statement_timeout_ms: int = 15000  # MySQL max_execution_time for SELECTs (0: no limit)
+    db_scheduler_pool_size: int = 3  # Background scheduler thread and API-triggered scrape jobs
+    db_scheduler_max_overflow: int = 2
+    db_scheduler_pool_timeout: float = 30.0
+    db_scheduler_statement_timeout_ms: int = 120000
+    db_worker_pool_size: int = 2  # Per Celery worker process (one task at a time)
+    db_worker_max_overflow: int = 1
+    db_worker_pool_timeout: float = 30.0
+    db_worker_statement_timeout_ms: int = 120000
+    
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     
@@ -45,10 +62,74 @@ class Settings(BaseSettings):
     # Scoring thresholds
     min_engagement_score: int = 30  # Lowered to catch more trending content
     min_engagement_velocity: float = 5.0  # Lowered to catch more trending content (likes/hour)
+    scoring_profile_refresh_seconds: float = 30.0  # How often workers check for a newly activated scoring profile
+    
+    # Engagement snapshots (time series used for delta-based velocity)
+    snapshot_velocity_window_hours: float = 6.0  # Only snapshots this recent feed velocity/acceleration
+    snapshot_full_resolution_hours: int = 24  # Keep every snapshot this long
+    snapshot_retention_days: int = 7  # Keep one snapshot per post per hour until this age, then delete
+    snapshot_prune_interval_minutes: int = 60  # How often the scheduler applies the retention policy
+    
+    # Story expiry (keeps the active set bounded)
+    story_max_age_hours: int = 168  # Largest query window; older stories are deactivated
+    story_score_floor: float = 5.0  # Deactivate stories whose decayed score falls below this
+    story_score_half_life_hours: float = 24.0  # Score halves every N hours for expiry purposes
+    story_expiry_batch_size: int = 500  # Stories updated per transaction
+    story_expiry_max_batches: int = 50  # Upper bound on work per expiry run
+    story_expiry_interval_minutes: int = 15  # How often the scheduler runs expiry
+    
+    # Insights rollups and keyword sketches (/api/insights)
+    rollup_prune_interval_minutes: int = 60  # How often empty/out-of-window insights rollups and keyword sketches are deleted
+    keyword_sketch_capacity: int = 200  # Keywords tracked per hourly sketch (bounds storage per hour)
+    
+    # Hot stories (materialized hot set behind /api/stories/hot)
+    hot_min_velocity: float = 20.0  # Engagement velocity a story needs to count as hot
+    hot_max_hours: int = 24  # Largest /api/stories/hot window; hot_stories rows older than this are pruned
+    
+    # Precomputed feeds (/api/feeds/{name})
+    precomputed_feed_size: int = 100  # Stories kept per precomputed feed
+    precomputed_feed_max_age_minutes: int = 10  # Recompute feeds at least this often, even without story changes
+    
+    # Static snapshot export (feeds/insights as files for nginx)
+    snapshot_export_dir: Optional[str] = None  # Write static JSON snapshots here after each cycle (unset: off)
+    
+    # Story change feed (/api/stories/changes)
+    story_changes_settle_seconds: int = 30  # Only serve changes this old (covers stamp-to-commit time and clock skew; see story_changes.py)
+    
+    # Story batch fetch (/api/stories?ids=, /api/stories/batch)
+    story_batch_max_ids: int = 500  # Most stories one request may ask for
+    
+    # Response compression (br / zstd when installed, else gzip)
+    compression_enabled: bool = True
+    compression_min_bytes: int = 1024  # Smaller bodies are sent uncompressed (not worth the CPU or the header)
+    
+    # API response cache (story feeds)
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: float = 60.0  # Upper bound on staleness of time-windowed feeds
+    response_cache_max_entries: int = 256  # In-process LRU size
+    response_cache_redis: bool = False  # Also share entries across API workers via redis_url
+    data_version_poll_seconds: float = 1.0  # How often a process re-reads change counters from the database
+    
+    # Live story stream (/api/stream/stories, /api/ws/stories)
+    stream_enabled: bool = True
+    stream_client_buffer: int = 100  # Events queued per subscriber; a subscriber that falls further behind is dropped
+    stream_keepalive_seconds: float = 15.0  # Idle SSE clients get a comment line this often (keeps proxies from closing them)
+    stream_backlog_limit: int = 100  # Most missed stories replayed to a client reconnecting with Last-Event-ID
+    stream_redis: bool = False  # Fan out via Redis pub/sub so stories committed by any process reach every API worker
+    
+    # Health probe (/api/health serves the cached result)
+    health_probe_interval_seconds: float = 5.0  # How often the background prober pings the database
+    health_scrape_summary_seconds: float = 60.0  # How often last successful scrape per platform is re-read
+    
+    # Scrape jobs (POST /api/scrape/* returns 202, GET /api/jobs/{id} reports progress)
+    scrape_jobs_backend: str = "thread"  # "thread" (API scrape pool) or "celery" (needs a running worker)
+    scrape_job_timeout_minutes: int = 30  # Jobs still queued/running after this are marked failed (API-pool jobs of an exited API process are failed when the API restarts)
     
     # Server
     api_host: str = "0.0.0.0"
     api_port: int = 8000  # Must match frontend VITE_API_URL (default http://localhost:8000)
+    api_db_threads: int = 10  # Threads for API database reads (keep <= db_api_pool_size)
+    api_scrape_threads: int = 2  # Threads for scrapes triggered through the API
     
     # Trusted sources (high credibility accounts)
     trusted_sources: List[str] = [
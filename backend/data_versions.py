@@ -0,0 +1,160 @@
+"""Per-table change counters used to invalidate cached API responses.
+
+Any committed session that inserted, updated or deleted rows of a tracked
+table bumps that table's counter in ``data_versions``. Because the counter
+lives in the database, changes committed by the background scheduler or a
+Celery worker invalidate caches in every API process.
+
+Readers use a process-local copy of each counter that is refreshed from
+the database at most once per ``data_version_poll_seconds``.
+"""
+import threading
+import time
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from sqlalchemy import event, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from database import get_engine, upsert_increment
+from db_executor import run_blocking
+from models import DataVersion
+from config import settings
+from loguru import logger
+
+STORIES = "stories"
+SOURCES = "sources"
+HASHTAGS = "hashtags"
+FEEDS = "precomputed_feeds"
+
+# Tables whose changes are counted
+TRACKED_TABLES = frozenset({STORIES, SOURCES, HASHTAGS, FEEDS})
+
+_CHANGED_KEY = "changed_tables"
+
+_lock = threading.Lock()
+_versions: Dict[str, int] = {}
+_checked_at: Dict[str, float] = {}
+
+
+def _mark_changed(session: Session, tables: Iterable[str]) -> None:
+    """Remember tracked tables changed in the session's current transaction."""
+    changed = TRACKED_TABLES.intersection(tables)
+    if changed:
+        session.info.setdefault(_CHANGED_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    """Collect tables of flushed objects (new/dirty/deleted still show pre-flush state here)."""
+    tables = set()
+    for obj in chain(session.new, session.deleted):
+        tables.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            tables.add(obj.__table__.name)
+    _mark_changed(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk(orm_execute_state) -> None:
+    """Collect tables touched by bulk query.update()/query.delete()."""
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper is not None:
+        _mark_changed(orm_execute_state.session, [orm_execute_state.bind_mapper.local_table.name])
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    """Bump counters for tables changed by the committed transaction."""
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        bump_versions(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    """Rolled-back changes never became visible; nothing to invalidate."""
+    session.info.pop(_CHANGED_KEY, None)
+
+
+def bump_versions(names: Iterable[str]) -> None:
+    """
+    Increment the change counters of the given tables.
+    
+    Runs on its own connection (the session's transaction has already
+    committed). Failures are logged; cached responses then expire by TTL.
+    
+    Args:
+        names: Table names to bump
+    """
+    table = DataVersion.__table__
+    try:
+        with get_engine().begin() as conn:
+            for name in sorted(names):
+                upsert_increment(conn, table, {"name": name}, {"version": 1}, {"updated_at": datetime.utcnow()})
+                version = conn.execute(select(table.c.version).where(table.c.name == name)).scalar()
+                with _lock:
+                    _versions[name] = version
+                    _checked_at[name] = time.monotonic()
+    except SQLAlchemyError as e:
+        logger.error(f"Error bumping data versions {sorted(names)}: {e}")
+
+
+def cached_version(name: str) -> Optional[int]:
+    """Return the local copy of a counter if it is fresh, otherwise None (no database access)."""
+    with _lock:
+        if name in _versions and time.monotonic() - _checked_at.get(name, 0.0) < settings.data_version_poll_seconds:
+            return _versions[name]
+    return None
+
+
+def get_version(name: str) -> int:
+    """
+    Get a table's change counter, reading the database if the local copy is stale.
+    
+    Args:
+        name: Table name (e.g. STORIES)
+    
+    Returns:
+        Current version (0 if the table was never changed)
+    """
+    version = cached_version(name)
+    if version is not None:
+        return version
+    
+    try:
+        with get_engine().connect() as conn:
+            version = conn.execute(
+                select(DataVersion.version).where(DataVersion.name == name)
+            ).scalar() or 0
+    except SQLAlchemyError as e:
+        logger.error(f"Error reading data version '{name}': {e}")
+        with _lock:
+            return _versions.get(name, 0)
+    
+    with _lock:
+        _versions[name] = version
+        _checked_at[name] = time.monotonic()
+    return version
+
+
+async def current_versions(names: Sequence[str]) -> Tuple[int, ...]:
+    """
+    Get several change counters from an async handler.
+    
+    Fresh local copies are returned without leaving the event loop; stale
+    ones are read on a worker thread.
+    
+    Args:
+        names: Table names
+    
+    Returns:
+        Versions in the order of names
+    """
+    versions = []
+    for name in names:
+        version = cached_version(name)
+        if version is None:
+            version = await run_blocking(get_version, name)
+        versions.append(version)
+    return tuple(versions)
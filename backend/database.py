@@ -1,27 +1,219 @@
-"""Database connection and session management."""
-from sqlalchemy import create_engine, text
+"""Database connection and session management.
+
+Engines are created per process role, each with its own connection pool,
+pool timeout and statement timeout (``db_<role>_*`` settings):
+
+- ``api``: request handlers (db_executor read pool), the health prober and
+  cache version reads
+- ``scheduler``: the background scheduler thread and API-triggered scrape
+  jobs, so scrape bursts queue on their own pool instead of starving requests
+- ``worker``: Celery worker processes
+
+SessionLocal() opens a session on the engine of the calling thread's role:
+threads that do background work call set_thread_role(), Celery worker
+processes call set_process_role(); everything else uses ``db_role``. Total
+connections are bounded by the sum of the pools a process uses (see config).
+It also registers the derived-table listeners (register_listeners()).
+"""
+import threading
+from sqlalchemy import create_engine, event, text, update, insert
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
+from typing import Any, Dict, Optional
 from config import settings
 from loguru import logger
 
+ROLE_API = "api"
+ROLE_SCHEDULER = "scheduler"
+ROLE_WORKER = "worker"
+ROLES = (ROLE_API, ROLE_SCHEDULER, ROLE_WORKER)
+
 # Get MySQL connection URL
 database_url = settings.get_database_url()
 
-# Create engine with MySQL-specific settings
-# For empty passwords, we need to ensure pymysql gets empty string
-# SQLAlchemy URL format handles this, but we verify it works
-engine = create_engine(
-    database_url,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_recycle=3600,    # Recycle connections after 1 hour
-    pool_size=10,         # Connection pool size
-    max_overflow=20,       # Max overflow connections
-    echo=False            # Set to True for SQL query logging
-)
+_engines: Dict[str, Engine] = {}
+_session_factories: Dict[str, sessionmaker] = {}
+_listeners_registered = False
+_pool_counters: Dict[str, Dict[str, int]] = {}
+_engines_lock = threading.Lock()
+_process_role = settings.db_role
+_thread_role = threading.local()
+
+
+def _check_role(role: str) -> str:
+    """Validate a role name."""
+    if role not in ROLES:
+        raise ValueError(f"Unknown database role '{role}'. Available: {', '.join(ROLES)}")
+    return role
+
+
+def set_process_role(role: str) -> None:
+    """
+    Set the role used by threads that have not set their own (e.g. in a Celery worker process).
+    
+    Args:
+        role: ROLE_API, ROLE_SCHEDULER or ROLE_WORKER
+    """
+    global _process_role
+    _process_role = _check_role(role)
+
+
+def set_thread_role(role: str) -> None:
+    """
+    Set the role of the calling thread (e.g. the scheduler thread, scrape pool threads).
+    
+    Args:
+        role: ROLE_API, ROLE_SCHEDULER or ROLE_WORKER
+    """
+    _thread_role.role = _check_role(role)
+
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def current_role() -> str:
+    """Role of the calling thread (its own, else the process role)."""
+    return getattr(_thread_role, "role", None) or _process_role
+
+
+def _track_pool(role: str, engine: Engine) -> None:
+    """Count pool activity for pool_metrics()."""
+    counters = _pool_counters.setdefault(role, {"connects": 0, "checkouts": 0, "invalidations": 0, "max_checked_out": 0})
+    
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        counters["connects"] += 1
+    
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        counters["checkouts"] += 1
+        checked_out = engine.pool.checkedout() if hasattr(engine.pool, "checkedout") else 0
+        if checked_out > counters["max_checked_out"]:
+            counters["max_checked_out"] = checked_out
+    
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        counters["invalidations"] += 1
+
+
+def create_role_engine(role: str) -> Engine:
+    """
+    Create an engine with the pool and timeouts configured for a role.
+    
+    Args:
+        role: ROLE_API, ROLE_SCHEDULER or ROLE_WORKER
+    
+    Returns:
+        New Engine (no connections are opened until first use)
+    """
+    _check_role(role)
+    engine = create_engine(
+        database_url,
+        pool_pre_ping=True,  # Verify connections before using
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_size=getattr(settings, f"db_{role}_pool_size"),
+        max_overflow=getattr(settings, f"db_{role}_max_overflow"),
+        pool_timeout=getattr(settings, f"db_{role}_pool_timeout"),  # Fail instead of queueing forever
+        echo=False  # Set to True for SQL query logging
+    )
+    
+    statement_timeout_ms = getattr(settings, f"db_{role}_statement_timeout_ms")
+    if statement_timeout_ms and engine.dialect.name == "mysql":
+        @event.listens_for(engine, "connect")
+        def _set_statement_timeout(dbapi_connection, connection_record):
+            # Aborts SELECTs running longer than this (MySQL 5.7.8+); writes are not affected
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"SET SESSION max_execution_time = {int(statement_timeout_ms)}")
+            cursor.close()
+    
+    _track_pool(role, engine)
+    return engine
+
+
+def get_engine(role: Optional[str] = None) -> Engine:
+    """
+    Get the engine of a role, creating it on first use.
+    
+    Args:
+        role: ROLE_API, ROLE_SCHEDULER or ROLE_WORKER (default: the calling thread's role)
+    
+    Returns:
+        Engine shared by every caller of that role in this process
+    """
+    role = role or current_role()
+    engine = _engines.get(role)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(role)
+            if engine is None:
+                engine = _engines[role] = create_role_engine(role)
+                _session_factories[role] = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return engine
+
+
+def register_listeners() -> None:
+    """
+    Register the session listeners that maintain derived tables (see derived_tables.py).
+    
+    Called by SessionLocal() before the first session opens, so ORM writes
+    from any entry point keep rollups, the hot set, keyword sketches, cache
+    versions and the live stream up to date. Imported lazily because those
+    modules import models, which imports this module.
+    """
+    global _listeners_registered
+    if not _listeners_registered:
+        import derived_tables  # Registers the listeners on import
+        _listeners_registered = True
+
+
+def SessionLocal(**kwargs) -> Session:
+    """Open a session on the engine of the calling thread's role."""
+    register_listeners()
+    role = current_role()
+    get_engine(role)
+    return _session_factories[role](**kwargs)
+
+
+def dispose_engines() -> None:
+    """
+    Drop pooled connections inherited from a parent process (call after fork, e.g. Celery worker init).
+    
+    The parent's connections are left open for the parent; this process opens its own.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose(close=False)
+
+
+def pool_metrics() -> Dict[str, Dict[str, Optional[int]]]:
+    """
+    Connection pool counters per role created in this process (no database access).
+    
+    Returns:
+        Dictionary of role -> size, checked_in, checked_out, overflow, max_overflow,
+        connects, checkouts, invalidations and max_checked_out
+    """
+    metrics = {}
+    for role, engine in list(_engines.items()):
+        pool = engine.pool
+        
+        def counter(name: str) -> Optional[int]:
+            method = getattr(pool, name, None)
+            return method() if callable(method) else None
+        
+        overflow = counter("overflow")
+        metrics[role] = {
+            "size": counter("size"),
+            "checked_in": counter("checkedin"),
+            "checked_out": counter("checkedout"),
+            "overflow": max(overflow, 0) if overflow is not None else None,  # QueuePool reports unopened slots as negative
+            "max_overflow": getattr(pool, "_max_overflow", None),
+            **_pool_counters.get(role, {}),
+        }
+    return metrics
+
+
+# Default engine of this process (scripts, schema tools)
+engine = get_engine(_process_role)
 
 Base = declarative_base()
 
@@ -34,7 +226,7 @@ def test_connection() -> bool:
         True if connection successful, False otherwise
     """
     try:
-        with engine.connect() as connection:
+        with get_engine().connect() as connection:
             # Execute a simple query to test connection
             result = connection.execute(text("SELECT 1"))
             result.fetchone()
@@ -55,3 +247,48 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def upsert_increment(
+    connection,
+    table,
+    keys: Dict[str, Any],
+    increments: Dict[str, Any],
+    values: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Insert a row, or add to its counter columns if the key already exists.
+    
+    Uses the dialect's native upsert (MySQL ON DUPLICATE KEY UPDATE, SQLite /
+    PostgreSQL ON CONFLICT) so concurrent writers never race on the insert.
+    
+    Args:
+        connection: Connection (or Session) to execute on
+        table: Table whose primary key / unique key is the columns in keys
+        keys: Key column values identifying the row
+        increments: Counter column -> amount to add (inserted as-is for new rows)
+        values: Other columns to set on insert and update
+    """
+    values = values or {}
+    row = {**keys, **increments, **values}
+    changes = {name: table.c[name] + amount for name, amount in increments.items()}
+    changes.update(values)
+    dialect = connection.get_bind().dialect.name if isinstance(connection, Session) else connection.dialect.name
+    
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        connection.execute(mysql_insert(table).values(**row).on_duplicate_key_update(**changes))
+    elif dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        connection.execute(
+            dialect_insert(table).values(**row).on_conflict_do_update(index_elements=list(keys), set_=changes)
+        )
+    else:
+        # Generic fallback (not race-free)
+        condition = [table.c[name] == value for name, value in keys.items()]
+        result = connection.execute(update(table).where(*condition).values(**changes))
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**row))
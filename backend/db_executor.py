@@ -0,0 +1,92 @@
+"""Run blocking database work off the FastAPI event loop.
+
+API handlers are ``async def`` but SQLAlchemy (pymysql) and the scrapers are
+synchronous. Calling them directly blocks the event loop, so one slow query
+or scrape stalls every concurrent request on the worker. Handlers instead
+submit a function to a dedicated thread pool; the function gets its own
+session, opened and closed on the worker thread.
+
+Two pools keep long scrapes (network I/O) from starving fast reads:
+- reads: ``api_db_threads`` workers, at most the API role's pool size so a
+  thread never waits on a connection
+- scrapes: ``api_scrape_threads`` workers on the scheduler role's pool
+"""
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+from sqlalchemy.orm import Session
+from database import SessionLocal, ROLE_SCHEDULER, set_thread_role
+from config import settings
+
+T = TypeVar("T")
+
+_db_executor = ThreadPoolExecutor(max_workers=settings.api_db_threads, thread_name_prefix="api-db")
+# Scrapes use the scheduler role's connection pool, so bursts cannot exhaust the one requests read from
+_scrape_executor = ThreadPoolExecutor(
+    max_workers=settings.api_scrape_threads,
+    thread_name_prefix="api-scrape",
+    initializer=set_thread_role,
+    initargs=(ROLE_SCHEDULER,)
+)
+
+
+def _with_session(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call fn(db, *args, **kwargs) with a session owned by the current thread."""
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a database function on the read pool.
+    
+    Serialize ORM objects inside fn (e.g. story_to_response) so attribute
+    loads also happen on the worker thread.
+    
+    Args:
+        fn: Function taking a Session as its first argument
+        *args: Extra positional arguments for fn
+        **kwargs: Extra keyword arguments for fn
+    
+    Returns:
+        fn's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, partial(_with_session, fn, *args, **kwargs))
+
+
+async def run_scrape(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a scrape function (network I/O plus writes) on the scrape pool.
+    
+    Args:
+        fn: Function taking a Session as its first argument
+        *args: Extra positional arguments for fn
+        **kwargs: Extra keyword arguments for fn
+    
+    Returns:
+        fn's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_scrape_executor, partial(_with_session, fn, *args, **kwargs))
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any) -> T:
+    """Run a blocking call that manages its own connection (e.g. test_connection) on the read pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, partial(fn, *args))
+
+
+def submit_scrape(fn: Callable[..., T], *args: Any) -> "Future[T]":
+    """Start a function that manages its own session (e.g. a scrape job) on the scrape pool without awaiting it."""
+    return _scrape_executor.submit(fn, *args)
+
+
+def shutdown_executors() -> None:
+    """Stop accepting work and wait for running database calls to finish."""
+    _db_executor.shutdown(wait=True)
+    _scrape_executor.shutdown(wait=True)
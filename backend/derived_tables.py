@@ -0,0 +1,21 @@
+"""Session listeners that keep derived tables and caches in step with story writes.
+
+Importing this module registers, on every SQLAlchemy Session:
+
+- data_versions: change counters that invalidate cached API responses
+- rollups: incremental maintenance of the insights hourly rollups
+- hot_stories: incremental maintenance of the hot story set
+- keyword_sketches: keyword tracking for committed new stories
+- story_stream: publishing of committed new stories to live stream clients
+- story_changes: commit-time updated_at stamps for the change feed
+
+database.register_listeners() imports it before the first session is opened,
+so every writer that goes through SessionLocal() (API, scheduler, Celery,
+one-off scripts) is tracked without importing the service layer.
+"""
+import data_versions
+import rollups
+import hot_stories
+import keyword_sketches
+import story_stream
+import story_changes
@@ -0,0 +1,138 @@
+"""Story expiry - keeps the active working set small.
+
+Feed, hot-story and insights queries only look at active stories, so
+deactivating stories that can no longer appear in any query window keeps
+those index scans at a constant size as history grows.
+
+A story is expired when:
+- it is older than ``story_max_age_hours`` (the largest query window), or
+- its decayed score, ``score * 0.5 ** (age_hours / story_score_half_life_hours)``,
+  falls below ``story_score_floor``
+
+The decayed-score pass walks the active set by id and stores where it
+stopped in ``maintenance_cursors``, so a run cut short by ``max_batches``
+is continued by the next run (from any process) and every story is
+eventually checked; at the end of the table the scan wraps to the start.
+"""
+from sqlalchemy.orm import Session, load_only
+from datetime import datetime, timedelta
+from typing import List, Optional
+from models import Story, MaintenanceCursor
+from config import settings
+from loguru import logger
+
+DECAY_SCAN_CURSOR = "story_expiry_decay"  # maintenance_cursors row of the decayed-score scan
+
+
+def _get_cursor(db: Session, name: str) -> MaintenanceCursor:
+    """Load a scan's resume cursor, creating it at the start if missing."""
+    cursor = db.get(MaintenanceCursor, name)
+    if cursor is None:
+        cursor = MaintenanceCursor(name=name, position=0)
+        db.add(cursor)
+    return cursor
+
+
+def _deactivate(db: Session, story_ids: List[int]) -> int:
+    """Mark a batch of stories inactive and commit."""
+    stories = db.query(Story).options(
+        load_only(Story.id, Story.is_active)
+    ).filter(Story.id.in_(story_ids)).all()
+    
+    for story in stories:
+        story.is_active = False
+    
+    db.commit()
+    return len(stories)
+
+
+def decayed_score(score: float, posted_at: datetime, current_time: datetime) -> float:
+    """
+    Calculate a story's score after exponential time decay.
+    
+    Args:
+        score: Overall score
+        posted_at: When the post was created
+        current_time: Reference time
+    
+    Returns:
+        Decayed score
+    """
+    age_hours = max((current_time - posted_at).total_seconds() / 3600, 0.0)
+    return (score or 0.0) * 0.5 ** (age_hours / settings.story_score_half_life_hours)
+
+
+def expire_stories(
+    db: Session,
+    current_time: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None
+) -> int:
+    """
+    Deactivate stories that fell out of every query window or decayed below the floor.
+    
+    Work is done in bounded batches, each committed separately, so the job never
+    holds long locks and can be stopped early with ``max_batches``. Every
+    batch scanned counts, whether or not it deactivated anything; the
+    decayed-score scan resumes from its stored cursor on the next run.
+    
+    Args:
+        db: Database session
+        current_time: Reference time (defaults to now, UTC)
+        batch_size: Stories per batch (defaults to settings.story_expiry_batch_size)
+        max_batches: Stop after this many batches (defaults to settings.story_expiry_max_batches)
+    
+    Returns:
+        Number of stories deactivated
+    """
+    now = current_time or datetime.utcnow()
+    batch_size = batch_size or settings.story_expiry_batch_size
+    max_batches = max_batches or settings.story_expiry_max_batches
+    age_cutoff = now - timedelta(hours=settings.story_max_age_hours)
+    
+    expired = 0
+    batches = 0
+    
+    # 1. Too old for any query window (range scan on idx_story_active_posted)
+    while batches < max_batches:
+        story_ids = [
+            story_id for (story_id,) in db.query(Story.id).filter(
+                Story.is_active == True,
+                Story.posted_at < age_cutoff
+            ).limit(batch_size).all()
+        ]
+        if not story_ids:
+            break
+        
+        expired += _deactivate(db, story_ids)
+        batches += 1
+    
+    # 2. Decayed below the score floor (keyset scan over the active set, resumed
+    # where the previous run stopped; every scanned batch counts toward max_batches)
+    cursor = _get_cursor(db, DECAY_SCAN_CURSOR)
+    while batches < max_batches:
+        rows = db.query(Story.id, Story.score, Story.posted_at).filter(
+            Story.is_active == True,
+            Story.id > cursor.position
+        ).order_by(Story.id).limit(batch_size).all()
+        if not rows:
+            # End of the active set: the next run starts over
+            cursor.position = 0
+            db.commit()
+            break
+        
+        batches += 1
+        cursor.position = rows[-1][0]
+        story_ids = [
+            story_id for story_id, score, posted_at in rows
+            if decayed_score(score, posted_at, now) < settings.story_score_floor
+        ]
+        if story_ids:
+            expired += _deactivate(db, story_ids)  # Commits the cursor with the batch
+        else:
+            db.commit()
+    
+    if expired:
+        logger.info(f"Expired {expired} stories ({batches} batch(es))")
+    
+    return expired
@@ -0,0 +1,156 @@
+"""Gazetteer for normalizing free-text locations into country codes and regions.
+
+Stories store the normalized ``country_code`` (ISO 3166-1 alpha-2) and
+``region`` next to the free-text ``location`` so location filters are
+equality lookups on indexed columns instead of ``LIKE '%...%'`` scans.
+"""
+import re
+from typing import Dict, Optional, Tuple
+from kenyan_sources_config import KENYAN_LOCATIONS
+
+REGION_AFRICA = "africa"
+REGION_EUROPE = "europe"
+REGION_NORTH_AMERICA = "north_america"
+REGION_ASIA = "asia"
+
+# Countries: name/alias -> (country_code, region)
+COUNTRIES: Dict[str, Tuple[str, str]] = {
+    "kenya": ("KE", REGION_AFRICA),
+    "nigeria": ("NG", REGION_AFRICA),
+    "south africa": ("ZA", REGION_AFRICA),
+    "ghana": ("GH", REGION_AFRICA),
+    "tanzania": ("TZ", REGION_AFRICA),
+    "uganda": ("UG", REGION_AFRICA),
+    "rwanda": ("RW", REGION_AFRICA),
+    "ethiopia": ("ET", REGION_AFRICA),
+    "somalia": ("SO", REGION_AFRICA),
+    "egypt": ("EG", REGION_AFRICA),
+    "united kingdom": ("GB", REGION_EUROPE),
+    "uk": ("GB", REGION_EUROPE),
+    "england": ("GB", REGION_EUROPE),
+    "united states": ("US", REGION_NORTH_AMERICA),
+    "usa": ("US", REGION_NORTH_AMERICA),
+    "india": ("IN", REGION_ASIA),
+    "china": ("CN", REGION_ASIA),
+}
+
+# Cities: name -> country name (see COUNTRIES)
+CITIES: Dict[str, str] = {
+    # Kenyan cities (KENYAN_LOCATIONS entries are added below)
+    "nairobi": "kenya",
+    "mombasa": "kenya",
+    "kisumu": "kenya",
+    "nakuru": "kenya",
+    "eldoret": "kenya",
+    # African cities used by scoring and the "africa" feed filter
+    "lagos": "nigeria",
+    "abuja": "nigeria",
+    "johannesburg": "south africa",
+    "cape town": "south africa",
+    "cairo": "egypt",
+    "accra": "ghana",
+    "dar es salaam": "tanzania",
+    "kampala": "uganda",
+    "kigali": "rwanda",
+    "addis ababa": "ethiopia",
+    "mogadishu": "somalia",
+    "london": "united kingdom",
+    "new york": "united states",
+    "washington": "united states",
+}
+
+# Region names that carry no country
+REGIONS: Dict[str, str] = {
+    "africa": REGION_AFRICA,
+    "east africa": REGION_AFRICA,
+    "west africa": REGION_AFRICA,
+    "europe": REGION_EUROPE,
+    "asia": REGION_ASIA,
+}
+
+
+def _build_index() -> Dict[str, Tuple[Optional[str], Optional[str], bool]]:
+    """Build name -> (country_code, region, is_city) for every known place."""
+    index: Dict[str, Tuple[Optional[str], Optional[str], bool]] = {}
+    for name, region in REGIONS.items():
+        index[name] = (None, region, False)
+    for name, (code, region) in COUNTRIES.items():
+        index[name] = (code, region, False)
+    for name, country in CITIES.items():
+        code, region = COUNTRIES[country]
+        index[name] = (code, region, True)
+    # Every configured Kenyan location ("Nairobi, Kenya", ...) resolves to Kenya
+    for location in KENYAN_LOCATIONS:
+        name = location.lower()
+        if name not in index:
+            index[name] = (*COUNTRIES["kenya"], False)
+    return index
+
+
+_PLACES = _build_index()
+
+# Longest names first so "south africa" wins over "africa"
+_PLACE_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(name) for name in sorted(_PLACES, key=len, reverse=True)) + r")\b"
+)
+
+
+def normalize_location(location: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Normalize a free-text location.
+    
+    Args:
+        location: Free-text location (e.g. "Nairobi, Kenya", "Lagos", "Africa")
+    
+    Returns:
+        Tuple of (country_code, region); either may be None if unknown
+    """
+    if not location:
+        return None, None
+    
+    region_only = None
+    for match in _PLACE_PATTERN.finditer(location.lower()):
+        code, region, _ = _PLACES[match.group(1)]
+        if code:
+            return code, region
+        region_only = region_only or region
+    
+    return None, region_only
+
+
+def normalize_story_location(location: Optional[str], is_kenyan: bool = False) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Normalize a story's location; Kenyan content always belongs to the Africa region.
+    
+    Args:
+        location: Free-text location
+        is_kenyan: Kenyan content flag
+    
+    Returns:
+        Tuple of (country_code, region)
+    """
+    country_code, region = normalize_location(location)
+    if is_kenyan and region is None:
+        region = REGION_AFRICA
+    return country_code, region
+
+
+def resolve_location_filter(location: str) -> Optional[Tuple[str, str, bool]]:
+    """
+    Resolve a location filter term to an indexed column lookup.
+    
+    Args:
+        location: Filter term from the API (e.g. "africa", "kenya", "nairobi")
+    
+    Returns:
+        Tuple of (column, value, is_city) where column is "region" or
+        "country_code"; None if the term is not in the gazetteer
+    """
+    place = _PLACES.get(location.strip().lower())
+    if place is None:
+        return None
+    
+    code, region, is_city = place
+    if code:
+        return "country_code", code, is_city
+    return "region", region, False
@@ -10,6 +10,8 @@ from platforms.facebook import FacebookScraper
 from platforms.instagram import InstagramScraper
 from platforms.tiktok import TikTokScraper
 from kenyan_sources_config import KENYAN_HASHTAGS, get_hashtags_for_platform
+from snapshots import refresh_post_metrics, record_snapshot
+from services import rescore_existing_stories
 from loguru import logger
 import json
 
@@ -69,11 +71,11 @@ def scrape_hashtag_twitter(db: Session, hashtag: Hashtag) -> List[Dict]:
                 normalized_posts.append(normalized)
             
             return normalized_posts
-            
+        
         except Exception as e:
             logger.error(f"Error searching Twitter for #{hashtag.hashtag}: {e}")
             return []
-            
+    
     except Exception as e:
         logger.error(f"Error in Twitter hashtag scraping: {e}")
         return []
@@ -106,11 +108,11 @@ def scrape_hashtag_instagram(db: Session, hashtag: Hashtag) -> List[Dict]:
             # For now, return empty and log warning
             logger.warning(f"Instagram hashtag search requires Business Account setup")
             return []
-            
+        
         except Exception as e:
             logger.error(f"Error searching Instagram for #{hashtag.hashtag}: {e}")
             return []
-            
+    
     except Exception as e:
         logger.error(f"Error in Instagram hashtag scraping: {e}")
         return []
@@ -131,7 +133,7 @@ def scrape_hashtag_facebook(db: Session, hashtag: Hashtag) -> List[Dict]:
         # For now, return empty and suggest using page-based scraping
         logger.warning(f"Facebook hashtag search is limited - use page-based scraping instead")
         return []
-        
+    
     except Exception as e:
         logger.error(f"Error in Facebook hashtag scraping: {e}")
         return []
@@ -147,7 +149,7 @@ def scrape_hashtag_tiktok(db: Session, hashtag: Hashtag) -> List[Dict]:
         # For now, return empty
         logger.warning(f"TikTok hashtag search not directly supported - use trending videos")
         return []
-        
+    
     except Exception as e:
         logger.error(f"Error in TikTok hashtag scraping: {e}")
         return []
@@ -201,12 +203,13 @@ def scrape_hashtag(db: Session, hashtag_id: int) -> dict:
                 
                 all_posts.extend(posts)
                 posts_fetched += len(posts)
-                
+            
             except Exception as e:
                 logger.error(f"Error scraping {platform} for #{hashtag.hashtag}: {e}")
                 continue
         
         # Save posts to database
+        reseen_posts = []
         for post_data in all_posts:
             try:
                 # Check if post already exists
@@ -218,7 +221,10 @@ def scrape_hashtag(db: Session, hashtag_id: int) -> dict:
                 ).first()
                 
                 if existing:
-                    continue  # Skip duplicates
+                    # Re-seen post: snapshot the observation for delta-based velocity
+                    refresh_post_metrics(db, existing, post_data)
+                    reseen_posts.append(existing)
+                    continue
                 
                 # Create raw post
                 raw_post = RawPost(
@@ -240,12 +246,21 @@ def scrape_hashtag(db: Session, hashtag_id: int) -> dict:
                 )
                 
                 db.add(raw_post)
+                record_snapshot(db, raw_post)
                 posts_saved += 1
-                
+            
             except Exception as e:
                 logger.error(f"Error saving post: {e}")
                 continue
         
+        # Rescore stories of re-seen posts (growing or gone flat); a failure keeps the saved posts
+        stories_rescored = 0
+        try:
+            with db.begin_nested():
+                stories_rescored = rescore_existing_stories(db, reseen_posts)
+        except Exception as e:
+            logger.error(f"Error rescoring re-seen posts for #{hashtag.hashtag}: {e}")
+        
         # Update hashtag last_scraped_at
         hashtag.last_scraped_at = datetime.utcnow()
         db.commit()
@@ -260,9 +275,10 @@ def scrape_hashtag(db: Session, hashtag_id: int) -> dict:
             "hashtag": hashtag.hashtag,
             "posts_fetched": posts_fetched,
             "posts_saved": posts_saved,
+            "stories_rescored": stories_rescored,
             "duration_seconds": duration
         }
-        
+    
     except Exception as e:
         db.rollback()
         logger.error(f"Error scraping hashtag #{hashtag.hashtag}: {e}")
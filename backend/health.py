@@ -0,0 +1,169 @@
+"""Background health prober for /api/health.
+
+Load balancer probes hit /api/health every few seconds per worker. Instead
+of opening a pooled connection per request, one thread per process pings
+the database every ``health_probe_interval_seconds`` and refreshes the last
+successful scrape per platform every ``health_scrape_summary_seconds``.
+Requests read the cached result plus connection-pool counters, which cost
+nothing, so the probe stays fast exactly when the pool is saturated.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import func, text
+from database import ROLE_API, get_engine, pool_metrics, SessionLocal
+from models import ScrapeLog, Source
+from config import settings
+from loguru import logger
+
+
+def pool_status() -> Dict[str, Optional[int]]:
+    """
+    Connection pool counters of the API role (no database access).
+    
+    Returns:
+        Dictionary with size, checked_in, checked_out and overflow (None if the pool type lacks a counter),
+        plus activity counters (see database.pool_metrics)
+    """
+    get_engine(ROLE_API)
+    return pool_metrics()[ROLE_API]
+
+
+def last_successful_scrapes() -> Dict[str, str]:
+    """
+    Completion time of the latest successful scrape per platform.
+    
+    Returns:
+        Dictionary mapping platform to ISO timestamp
+    """
+    db = SessionLocal()
+    try:
+        rows = db.query(Source.platform, func.max(ScrapeLog.completed_at)).join(
+            ScrapeLog, ScrapeLog.source_id == Source.id
+        ).filter(ScrapeLog.status == "success").group_by(Source.platform).all()
+        return {platform: completed_at.isoformat() for platform, completed_at in rows if completed_at}
+    finally:
+        db.close()
+
+
+class HealthProber:
+    """Thread that keeps a cached database health result up to date."""
+    
+    def __init__(self, interval_seconds: float, scrape_summary_seconds: float):
+        """
+        Initialize the prober.
+        
+        Args:
+            interval_seconds: Seconds between database pings
+            scrape_summary_seconds: Seconds between refreshes of the last scrape per platform
+        """
+        self.interval_seconds = interval_seconds
+        self.scrape_summary_seconds = scrape_summary_seconds
+        self.running = False
+        self.thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._database_ok: Optional[bool] = None
+        self._latency_ms: Optional[float] = None
+        self._error: Optional[str] = None
+        self._checked_at: Optional[datetime] = None
+        self._checked_monotonic = 0.0
+        self._last_scrape: Dict[str, str] = {}
+        self._scrapes_read_monotonic = 0.0
+    
+    def probe(self) -> None:
+        """Ping the database and, when due, re-read the last scrape per platform."""
+        started = time.perf_counter()
+        try:
+            with get_engine(ROLE_API).connect() as connection:
+                connection.execute(text("SELECT 1")).fetchone()
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, str(e).splitlines()[0][:200]
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        
+        if ok != self._database_ok:
+            if ok:
+                logger.info(f"Health probe: database connected ({latency_ms} ms)")
+            else:
+                logger.error(f"Health probe: database unavailable: {error}")
+        
+        last_scrape = None
+        if ok and time.monotonic() - self._scrapes_read_monotonic >= self.scrape_summary_seconds:
+            try:
+                last_scrape = last_successful_scrapes()
+                self._scrapes_read_monotonic = time.monotonic()
+            except Exception as e:
+                logger.warning(f"Health probe: could not read scrape logs: {e}")
+        
+        with self._lock:
+            self._database_ok, self._latency_ms, self._error = ok, latency_ms, error
+            self._checked_at = datetime.utcnow()
+            self._checked_monotonic = time.monotonic()
+            if last_scrape is not None:
+                self._last_scrape = last_scrape
+    
+    def snapshot(self) -> Dict:
+        """
+        Latest cached result (no database access).
+        
+        A result older than three probe intervals (stalled or stopped
+        prober, hung connection) is reported as not ok.
+        
+        Returns:
+            Dictionary with database_ok, stale, latency_ms, error, checked_at and last_scrape
+        """
+        with self._lock:
+            age = time.monotonic() - self._checked_monotonic if self._checked_at else None
+            stale = age is None or age > 3 * self.interval_seconds
+            return {
+                "database_ok": bool(self._database_ok) and not stale,
+                "stale": stale,
+                "latency_ms": self._latency_ms,
+                "error": self._error,
+                "checked_at": self._checked_at.isoformat() if self._checked_at else None,
+                "last_scrape": dict(self._last_scrape),
+            }
+    
+    def _run(self):
+        """Probe loop."""
+        while not self._stop.is_set():
+            try:
+                self.probe()
+            except Exception as e:
+                logger.error(f"Error in health prober: {e}")
+            self._stop.wait(self.interval_seconds)
+    
+    def start(self):
+        """Start probing in a daemon thread."""
+        if self.running:
+            return
+        
+        self.running = True
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, name="health-prober", daemon=True)
+        self.thread.start()
+        logger.info(f"Health prober started (every {self.interval_seconds:g}s)")
+    
+    def stop(self):
+        """Stop the prober thread."""
+        if not self.running:
+            return
+        
+        self.running = False
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+
+# Global prober instance
+_prober = None
+
+
+def get_health_prober() -> HealthProber:
+    """Get or create the global prober instance."""
+    global _prober
+    if _prober is None:
+        _prober = HealthProber(settings.health_probe_interval_seconds, settings.health_scrape_summary_seconds)
+    return _prober
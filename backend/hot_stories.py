@@ -0,0 +1,208 @@
+"""Materialized hot-story set, maintained incrementally for /api/stories/hot.
+
+A story is hot while it is active, posted within the last
+``hot_max_hours``, has engagement velocity of at least ``hot_min_velocity``
+and is not cooling off (acceleration unknown or >= 0). Qualifying stories
+are mirrored into ``hot_stories`` with their feed sort key, so the hot
+endpoint reads a small sorted table instead of filtering the stories table.
+
+Session flush events re-evaluate every story a flush inserts, rescores,
+deactivates or deletes and insert or delete its hot row in the same
+transaction. Stories that age out of the largest window are removed by
+prune_hot_stories(); reads filter on posted_at as well, so a late prune
+never shows stale stories.
+
+Bulk ``query(Story).update()`` / ``.delete()`` bypass the flush events; run
+rebuild_hot_stories() after such maintenance.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import delete, event, inspect, insert, or_
+from sqlalchemy.orm import Session, load_only
+from models import Story, HotStory
+from config import settings
+from loguru import logger
+
+# Story attributes hot membership and the stored sort key depend on
+HOT_FIELDS = ("is_active", "posted_at", "engagement_velocity", "engagement_acceleration", "is_kenyan", "score", "rank_key")
+
+_CANDIDATES_KEY = "hot_story_candidates"
+
+
+def hot_conditions(hours_back: int):
+    """
+    SQL conditions on Story for hot membership within a window.
+    
+    This is the reference definition of the hot set: rebuild_hot_stories()
+    applies it to the stories table and is_hot() mirrors it in Python for
+    incremental maintenance.
+    
+    Args:
+        hours_back: Window in hours
+    
+    Returns:
+        Tuple of filter clauses
+    """
+    return (
+        Story.is_active == True,
+        Story.posted_at >= datetime.utcnow() - timedelta(hours=hours_back),
+        Story.engagement_velocity >= settings.hot_min_velocity,
+        # Velocity comes from recent snapshot deltas; drop stories that are cooling off
+        # (acceleration is unknown until a post has been seen three times)
+        or_(Story.engagement_acceleration.is_(None), Story.engagement_acceleration >= 0),
+    )
+
+
+def is_hot(story: Story, current_time: datetime) -> bool:
+    """Python equivalent of hot_conditions(settings.hot_max_hours) for a flushed story."""
+    if story.is_active is False or not story.posted_at or story.rank_key is None:
+        return False
+    if story.posted_at < current_time - timedelta(hours=settings.hot_max_hours):
+        return False
+    if (story.engagement_velocity or 0.0) < settings.hot_min_velocity:
+        return False
+    return story.engagement_acceleration is None or story.engagement_acceleration >= 0
+
+
+def _hot_row(story: Story) -> Dict:
+    """hot_stories row for a story."""
+    return {
+        "story_id": story.id,
+        "is_kenyan": bool(story.is_kenyan),
+        "posted_at": story.posted_at,
+        "rank_key": story.rank_key,
+    }
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_candidates(session: Session, flush_context, instances) -> None:
+    """Remember stories whose hot membership may change in this flush."""
+    new = [obj for obj in session.new if isinstance(obj, Story)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Story)]
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, Story) and session.is_modified(obj, include_collections=False)
+        and any(
+            field not in inspect(obj).unloaded and inspect(obj).attrs[field].history.has_changes()
+            for field in HOT_FIELDS
+        )
+    ]
+    if not (new or deleted or changed):
+        return
+    
+    # Deactivated stories just leave the set; others need every field to be re-evaluated
+    reevaluate = [story for story in changed if story.is_active is not False]
+    missing = [story.id for story in reevaluate if inspect(story).unloaded.intersection(HOT_FIELDS)]
+    if missing:
+        with session.no_autoflush:
+            session.query(Story).options(
+                load_only(*(getattr(Story, field) for field in HOT_FIELDS))
+            ).filter(Story.id.in_(missing)).all()
+    
+    candidates = session.info.setdefault(_CANDIDATES_KEY, {"upsert": [], "remove": []})
+    candidates["upsert"].extend(new + reevaluate)
+    candidates["remove"].extend(
+        [story.id for story in deleted] + [story.id for story in changed if story.is_active is False]
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_candidates(session: Session, flush_context) -> None:
+    """Insert or delete hot rows once IDs and rank keys are assigned."""
+    candidates = session.info.pop(_CANDIDATES_KEY, None)
+    if not candidates:
+        return
+    
+    now = datetime.utcnow()
+    remove = set(candidates["remove"])
+    rows = {}
+    for story in candidates["upsert"]:
+        if story.id in remove or inspect(story).deleted:
+            continue
+        if is_hot(story, now):
+            rows[story.id] = _hot_row(story)
+        else:
+            remove.add(story.id)
+    
+    table = HotStory.__table__
+    connection = session.connection()
+    affected = remove | set(rows)
+    if affected:
+        connection.execute(delete(table).where(table.c.story_id.in_(affected)))
+    if rows:
+        connection.execute(insert(table), list(rows.values()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_candidates(session: Session) -> None:
+    """Drop candidates of a flush that never happened."""
+    session.info.pop(_CANDIDATES_KEY, None)
+
+
+def join_hot_set(query, is_kenyan: Optional[bool] = None, hours_back: int = 6):
+    """
+    Restrict a query over stories to the hot set, in feed order (highest rank key first).
+    
+    Args:
+        query: Query selecting from stories
+        is_kenyan: Filter Kenyan stories only
+        hours_back: Only include stories from last N hours (at most hot_max_hours)
+    
+    Returns:
+        Joined, filtered and ordered query
+    """
+    query = query.join(HotStory, HotStory.story_id == Story.id).filter(
+        HotStory.posted_at >= datetime.utcnow() - timedelta(hours=hours_back)
+    )
+    if is_kenyan is not None:
+        query = query.filter(HotStory.is_kenyan == is_kenyan)
+    
+    return query.order_by(HotStory.rank_key.desc(), HotStory.story_id.desc())
+
+
+def rebuild_hot_stories(db: Session) -> int:
+    """
+    Recompute the hot set from the stories table.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Number of hot stories
+    """
+    stories = db.query(
+        Story.id, Story.is_kenyan, Story.posted_at, Story.rank_key
+    ).filter(*hot_conditions(settings.hot_max_hours), Story.rank_key.isnot(None)).all()
+    
+    db.query(HotStory).delete(synchronize_session=False)
+    if stories:
+        db.execute(insert(HotStory.__table__), [
+            {"story_id": story_id, "is_kenyan": bool(kenyan), "posted_at": posted_at, "rank_key": rank_key}
+            for story_id, kenyan, posted_at, rank_key in stories
+        ])
+    db.commit()
+    
+    logger.info(f"Rebuilt hot stories: {len(stories)} rows")
+    return len(stories)
+
+
+def prune_hot_stories(db: Session, current_time: Optional[datetime] = None) -> int:
+    """
+    Delete hot rows of stories that aged out of the largest hot window.
+    
+    Args:
+        db: Database session
+        current_time: Reference time (defaults to now, UTC)
+    
+    Returns:
+        Number of rows deleted
+    """
+    now = current_time or datetime.utcnow()
+    cutoff = now - timedelta(hours=settings.hot_max_hours)
+    
+    deleted = db.query(HotStory).filter(HotStory.posted_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    
+    if deleted:
+        logger.info(f"Pruned {deleted} aged-out hot stories")
+    return deleted
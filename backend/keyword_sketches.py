@@ -0,0 +1,306 @@
+"""Streaming heavy-hitter keyword tracking for /api/insights top keywords.
+
+Every new story's distinct headline and content tokens (stopwords removed)
+are added to a Space-Saving sketch for the hour the story was posted in once
+the transaction inserting it commits; stories deleted again before commit
+(below the keep threshold) and rolled-back inserts are never counted.
+A sketch keeps at most ``keyword_sketch_capacity`` counters, so storage per
+hour is constant however many stories arrive. Top keywords for a window
+merge the (at most 168) hourly sketches, so query cost does not depend on
+story count.
+
+Space-Saving counts are upper bounds: a keyword's true count lies between
+``count - error`` and ``count``. Keywords occurring more often than
+total / capacity are always tracked.
+"""
+import json
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from database import upsert_increment
+from models import Story, KeywordSketch
+from rollups import hour_bucket
+from config import settings
+from loguru import logger
+
+# Common English and Swahili function words plus social media noise
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just like more most my myself
+new news no nor not now of off on once only or other our ours ourselves out over own same she should so
+some such than that the their theirs them themselves then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you your yours
+yourself yourselves says said after amp http https www com via watch video today year years people
+time first last make made still back going really want well know think see get got one two three
+na ya wa kwa la za ni kuwa katika hii hiyo huo yake wao sisi nini
+""".split())
+
+_URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+_TOKEN_PATTERN = re.compile(r"[#@]?[^\W\d_][\w'-]*")
+_MIN_TOKEN_LENGTH = 4
+_MAX_TOKEN_LENGTH = 64
+
+# session.info key for keywords of stories flushed but not yet committed
+_PENDING_KEY = "keyword_sketch_pending"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Extract keyword tokens from text.
+    
+    URLs, numbers, stopwords and tokens shorter than 4 characters are
+    dropped; hashtags and mentions keep their prefix.
+    
+    Args:
+        text: Headline or content
+    
+    Returns:
+        List of lower-case tokens (with repeats)
+    """
+    if not text:
+        return []
+    text = _URL_PATTERN.sub(" ", text.lower())
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text):
+        token = token.strip("'-")
+        if len(token) < _MIN_TOKEN_LENGTH or token.lstrip("#@") in STOPWORDS:
+            continue
+        tokens.append(token[:_MAX_TOKEN_LENGTH])
+    return tokens
+
+
+class SpaceSaving:
+    """Space-Saving heavy-hitter sketch with a fixed number of counters."""
+    
+    __slots__ = ("capacity", "counters", "total")
+    
+    def __init__(self, capacity: int, counters: Optional[Dict[str, List[int]]] = None, total: int = 0):
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = counters or {}  # token -> [count, error]
+        self.total = total
+    
+    def _min_count(self) -> int:
+        """Smallest tracked count if the sketch is full (the error bound for untracked tokens), else 0."""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+    
+    def add(self, token: str, count: int = 1) -> None:
+        """Count occurrences of a token."""
+        self.total += count
+        counter = self.counters.get(token)
+        if counter is not None:
+            counter[0] += count
+            return
+        
+        if len(self.counters) < self.capacity:
+            self.counters[token] = [count, 0]
+            return
+        
+        # Replace the smallest counter; the new token inherits its count as error
+        evicted = min(self.counters, key=lambda key: self.counters[key][0])
+        min_count = self.counters.pop(evicted)[0]
+        self.counters[token] = [min_count + count, min_count]
+    
+    def update(self, tokens: Iterable[str]) -> None:
+        """Count every token in an iterable."""
+        for token in tokens:
+            self.add(token)
+    
+    def merge(self, other: "SpaceSaving") -> None:
+        """
+        Merge another sketch into this one, keeping the error guarantee.
+        
+        Tokens missing from a full sketch are assumed to have that sketch's
+        minimum count (counted as error), then the largest counters are kept.
+        """
+        self_min, other_min = self._min_count(), other._min_count()
+        merged: Dict[str, List[int]] = {}
+        for token in set(self.counters) | set(other.counters):
+            count_a, error_a = self.counters.get(token, (self_min, self_min))
+            count_b, error_b = other.counters.get(token, (other_min, other_min))
+            merged[token] = [count_a + count_b, error_a + error_b]
+        
+        top = sorted(merged.items(), key=lambda item: item[1][0], reverse=True)[:self.capacity]
+        self.counters = dict(top)
+        self.total += other.total
+    
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        """Return the n tokens with the highest counts as (token, count)."""
+        ranked = sorted(self.counters.items(), key=lambda item: (-item[1][0], item[0]))
+        return [(token, count) for token, (count, _) in ranked[:n]]
+    
+    def to_json(self) -> str:
+        """Serialize the counters for storage."""
+        return json.dumps(self.counters, separators=(",", ":"))
+    
+    @classmethod
+    def from_json(cls, data: Optional[str], capacity: int, total: int = 0) -> "SpaceSaving":
+        """Load a stored sketch."""
+        return cls(capacity, json.loads(data) if data else {}, total or 0)
+
+
+def story_tokens(headline: Optional[str], content: Optional[str]) -> List[str]:
+    """
+    Distinct tokens a story mentions in its headline or content.
+    
+    Each story counts once per keyword, so a headline repeated at the start
+    of the content is not double counted.
+    """
+    return sorted(set(tokenize(headline)) | set(tokenize(content)))
+
+
+def add_to_sketches(connection, tokens_by_hour: Dict[datetime, List[str]]) -> None:
+    """
+    Add tokens to the hourly sketches, one locked read-modify-write per hour.
+    
+    The upsert creates the hour's row if needed and takes its row lock; the
+    SELECT ... FOR UPDATE then reads the current counters under that lock.
+    
+    Args:
+        connection: Connection in an open transaction
+        tokens_by_hour: Hour bucket -> tokens to add
+    """
+    table = KeywordSketch.__table__
+    for hour, tokens in sorted(tokens_by_hour.items()):
+        if not tokens:
+            continue
+        
+        upsert_increment(connection, table, {"hour": hour}, {"total": len(tokens)}, {"updated_at": datetime.utcnow()})
+        row = connection.execute(
+            select(table.c.counters, table.c.total).where(table.c.hour == hour).with_for_update()
+        ).one()
+        
+        sketch = SpaceSaving.from_json(row.counters, settings.keyword_sketch_capacity)
+        sketch.update(tokens)
+        connection.execute(update(table).where(table.c.hour == hour).values(counters=sketch.to_json()))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_story_keywords(session: Session, flush_context) -> None:
+    """Remember keywords of stories inserted by this flush; forget stories it deleted."""
+    pending = session.info.get(_PENDING_KEY)
+    if pending:
+        # Stories below the keep threshold are deleted again before commit
+        for obj in session.deleted:
+            if isinstance(obj, Story):
+                pending.pop(obj.id, None)
+    
+    for obj in session.new:
+        if isinstance(obj, Story) and obj.posted_at:
+            session.info.setdefault(_PENDING_KEY, {})[obj.id] = (
+                hour_bucket(obj.posted_at), story_tokens(obj.headline, obj.content)
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def _track_committed_story_keywords(session: Session) -> None:
+    """Add keywords of committed stories to the hourly sketches in their own transaction."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    
+    tokens_by_hour: Dict[datetime, List[str]] = defaultdict(list)
+    for hour, tokens in pending.values():
+        tokens_by_hour[hour].extend(tokens)
+    try:
+        with session.get_bind().begin() as connection:
+            add_to_sketches(connection, tokens_by_hour)
+    except Exception as e:
+        # The sketches are estimates; losing one batch only undercounts it
+        logger.error(f"Error updating keyword sketches for {len(pending)} stories: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_story_keywords(session: Session) -> None:
+    """Rolled-back stories were never committed; nothing to count."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def top_keywords(db: Session, since: datetime, limit: int = 10) -> List[Tuple[str, int]]:
+    """
+    Top keywords for stories posted since a time, merged from hourly sketches.
+    
+    Args:
+        db: Database session
+        since: Window start (rounded down to the hour)
+        limit: Number of keywords to return
+    
+    Returns:
+        List of (keyword, estimated mentions), highest first
+    """
+    rows = db.query(KeywordSketch.counters, KeywordSketch.total).filter(
+        KeywordSketch.hour >= hour_bucket(since)
+    ).all()
+    
+    merged = SpaceSaving(settings.keyword_sketch_capacity)
+    for counters, total in rows:
+        merged.merge(SpaceSaving.from_json(counters, settings.keyword_sketch_capacity, total))
+    
+    return merged.top(limit)
+
+
+def rebuild_sketches(db: Session, current_time: Optional[datetime] = None, batch_size: int = 1000) -> int:
+    """
+    Recompute the sketches from stories posted within the largest insights window.
+    
+    Args:
+        db: Database session
+        current_time: Reference time (defaults to now, UTC)
+        batch_size: Stories read per batch
+    
+    Returns:
+        Number of hourly sketches written
+    """
+    now = current_time or datetime.utcnow()
+    since = hour_bucket(now - timedelta(hours=settings.story_max_age_hours))
+    
+    sketches: Dict[datetime, SpaceSaving] = defaultdict(lambda: SpaceSaving(settings.keyword_sketch_capacity))
+    last_id = 0
+    while True:
+        rows = db.query(Story.id, Story.posted_at, Story.headline, Story.content).filter(
+            Story.posted_at >= since,
+            Story.id > last_id
+        ).order_by(Story.id).limit(batch_size).all()
+        if not rows:
+            break
+        
+        last_id = rows[-1][0]
+        for _, posted_at, headline, content in rows:
+            sketches[hour_bucket(posted_at)].update(story_tokens(headline, content))
+    
+    db.query(KeywordSketch).delete(synchronize_session=False)
+    db.bulk_insert_mappings(KeywordSketch, [
+        {"hour": hour, "counters": sketch.to_json(), "total": sketch.total, "updated_at": now}
+        for hour, sketch in sketches.items()
+    ])
+    db.commit()
+    
+    logger.info(f"Rebuilt keyword sketches: {len(sketches)} hour(s)")
+    return len(sketches)
+
+
+def prune_sketches(db: Session, current_time: Optional[datetime] = None) -> int:
+    """
+    Delete sketches for hours older than every insights window.
+    
+    Args:
+        db: Database session
+        current_time: Reference time (defaults to now, UTC)
+    
+    Returns:
+        Number of sketches deleted
+    """
+    now = current_time or datetime.utcnow()
+    cutoff = hour_bucket(now - timedelta(hours=settings.story_max_age_hours))
+    
+    deleted = db.query(KeywordSketch).filter(KeywordSketch.hour < cutoff).delete(synchronize_session=False)
+    db.commit()
+    
+    if deleted:
+        logger.info(f"Pruned {deleted} keyword sketches")
+    return deleted
@@ -1,9 +1,11 @@
 """Database models for Story Intelligence Dashboard."""
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, Index
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime, Text, Boolean, ForeignKey, Index, UniqueConstraint, DDL, event, inspect
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from database import Base
+from gazetteer import normalize_story_location
 from datetime import datetime
+import calendar
 
 
 class Source(Base):
@@ -87,6 +89,7 @@ class RawPost(Base):
     source = relationship("Source", back_populates="raw_posts")
     hashtag = relationship("Hashtag", backref="raw_posts")
     story = relationship("Story", back_populates="raw_post", uselist=False)
+    snapshots = relationship("EngagementSnapshot", back_populates="raw_post", cascade="all, delete-orphan")
     
     __table_args__ = (
         Index('idx_raw_post_platform_id', 'platform', 'platform_post_id'),
@@ -119,12 +122,16 @@ class Story(Base):
     # Scoring
     score = Column(Float, nullable=False)  # Overall score (0-100)
     engagement_velocity = Column(Float)  # Likes/hour or similar metric
+    engagement_acceleration = Column(Float)  # Change in velocity per hour (from snapshots)
     credibility_score = Column(Float, default=0.0)  # Based on source trust
     topic_relevance_score = Column(Float, default=0.0)  # Based on trending keywords
+    scoring_profile = Column(String(120))  # Scoring profile that produced the score, e.g. "default@3"
     
     # Location and Kenyan content
     location = Column(String(255))  # Location if available
     is_kenyan = Column(Boolean, default=False)  # Kenyan content flag
+    country_code = Column(String(2))  # ISO country normalized from location (see gazetteer)
+    region = Column(String(32))  # Region normalized from location, e.g. "africa"
     
     # Frontend-compatible fields
     headline = Column(String(500))  # Extracted or generated headline
@@ -134,7 +141,11 @@ class Story(Base):
     # Status
     is_active = Column(Boolean, default=True)  # Still trending?
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=func.now())
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # UTC; change feed sync key
+    
+    # Feed ordering: (engagement_velocity, is_kenyan, score, posted_at) packed into one
+    # sortable string so feeds are an index range scan + LIMIT (see compute_rank_key)
+    rank_key = Column(String(40))
     
     # Relationships
     raw_post = relationship("RawPost", back_populates="story")
@@ -143,8 +154,194 @@ class Story(Base):
         Index('idx_story_score', 'score'),
         Index('idx_story_posted_at', 'posted_at'),
         Index('idx_story_active', 'is_active'),
+        # Active-window scans; partial on dialects that support it (MySQL keeps is_active as leading column)
+        Index('idx_story_active_posted', 'is_active', 'posted_at',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
         Index('idx_story_kenyan', 'is_kenyan'),
         Index('idx_story_location', 'location'),
+        # Feed indexes: equality prefix + rank_key serves ORDER BY rank_key DESC, id DESC
+        Index('idx_story_rank', 'is_active', 'rank_key'),
+        Index('idx_story_kenyan_rank', 'is_active', 'is_kenyan', 'rank_key'),
+        Index('idx_story_platform_rank', 'is_active', 'platform', 'rank_key'),
+        Index('idx_story_country_rank', 'is_active', 'country_code', 'rank_key'),
+        Index('idx_story_region_rank', 'is_active', 'region', 'rank_key'),
+        # Change feed: WHERE (updated_at, id) > since ORDER BY updated_at, id
+        Index('idx_story_updated', 'updated_at', 'id'),
+    )
+
+
+# Full-text search (see story_search): FULLTEXT index on MySQL; other dialects
+# get their search index (SQLite FTS5) from story_search on first use
+event.listen(
+    Story.__table__,
+    "after_create",
+    DDL("ALTER TABLE stories ADD FULLTEXT INDEX idx_story_fulltext (headline, content)").execute_if(dialect="mysql")
+)
+
+
+# Fields packed into Story.rank_key, in sort order
+RANK_KEY_FIELDS = ("engagement_velocity", "is_kenyan", "score", "posted_at")
+
+
+def compute_rank_key(
+    engagement_velocity: float,
+    is_kenyan: bool,
+    score: float,
+    posted_at: datetime
+) -> str:
+    """
+    Encode the feed sort order into a fixed-width string.
+    
+    Comparing two keys as strings gives the same result as comparing
+    (engagement_velocity, is_kenyan, score, posted_at) as tuples, so
+    ``ORDER BY rank_key DESC`` equals the old four-column ordering
+    (velocity and score at 0.001 precision, posted_at at 1 second).
+    
+    Args:
+        engagement_velocity: Engagement velocity (negative values sort as 0)
+        is_kenyan: Kenyan content flag
+        score: Overall score (negative values sort as 0)
+        posted_at: When the post was created (UTC)
+    
+    Returns:
+        34-character rank key
+    """
+    velocity = min(max(int(round((engagement_velocity or 0) * 1000)), 0), 10 ** 13 - 1)
+    score_part = min(max(int(round((score or 0) * 1000)), 0), 10 ** 10 - 1)
+    posted = max(calendar.timegm(posted_at.utctimetuple()), 0) if posted_at else 0
+    return f"{velocity:013d}{1 if is_kenyan else 0}{score_part:010d}{posted:010d}"
+
+
+@event.listens_for(Story, "before_insert")
+@event.listens_for(Story, "before_update")
+def _refresh_rank_key(mapper, connection, target: Story) -> None:
+    """Keep rank_key in sync whenever a story is written or rescored."""
+    # Partially loaded stories (e.g. expiry batches) cannot have changed rank inputs;
+    # new stories always get a key (unset inputs count as empty)
+    state = inspect(target)
+    if state.has_identity and state.unloaded.intersection(RANK_KEY_FIELDS):
+        return
+    target.rank_key = compute_rank_key(
+        target.engagement_velocity,
+        target.is_kenyan,
+        target.score,
+        target.posted_at
+    )
+
+
+@event.listens_for(Story, "before_insert")
+@event.listens_for(Story, "before_update")
+def _refresh_location_codes(mapper, connection, target: Story) -> None:
+    """Normalize free-text location into indexed country_code/region columns."""
+    state = inspect(target)
+    if state.has_identity and state.unloaded.intersection(("location", "is_kenyan")):
+        return
+    target.country_code, target.region = normalize_story_location(target.location, target.is_kenyan)
+
+
+class ScoringProfile(Base):
+    """Named, versioned scoring parameters (weights, boosts, thresholds)."""
+    __tablename__ = "scoring_profiles"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    version = Column(Integer, nullable=False)
+    params = Column(Text, nullable=False)  # JSON object of scoring parameters
+    is_active = Column(Boolean, default=False)  # Exactly one active profile is used for scoring
+    created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('name', 'version', name='uq_scoring_profile_name_version'),
+        Index('idx_scoring_profile_active', 'is_active'),
+    )
+
+
+class StoryHourlyRollup(Base):
+    """Count of active stories per posting hour and dimension value (maintained by rollups.py)."""
+    __tablename__ = "story_hourly_rollups"
+    
+    hour = Column(DateTime, primary_key=True)  # Posting hour (posted_at truncated to the hour)
+    dimension = Column(String(16), primary_key=True)  # topic, platform or velocity
+    value = Column(String(191), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index('idx_rollup_dimension_hour', 'dimension', 'hour'),
+    )
+
+
+class HotStory(Base):
+    """Active story that currently qualifies as hot, with its feed sort key (maintained by hot_stories.py)."""
+    __tablename__ = "hot_stories"
+    
+    story_id = Column(Integer, ForeignKey("stories.id", ondelete="CASCADE"), primary_key=True)
+    is_kenyan = Column(Boolean, nullable=False, default=False)
+    posted_at = Column(DateTime, nullable=False)
+    rank_key = Column(String(40), nullable=False)  # Copy of Story.rank_key
+    
+    __table_args__ = (
+        Index('idx_hot_rank', 'rank_key'),
+        Index('idx_hot_kenyan_rank', 'is_kenyan', 'rank_key'),
+    )
+
+
+class PrecomputedFeed(Base):
+    """Top stories of a named feed definition, recomputed after scoring batches (see precomputed_feeds.py)."""
+    __tablename__ = "precomputed_feeds"
+    
+    name = Column(String(64), primary_key=True)  # FeedDefinition name, e.g. "kenya"
+    stories = Column(Text(16777215))  # JSON list of feed rows in feed order (MEDIUMTEXT on MySQL)
+    story_count = Column(Integer, nullable=False, default=0)
+    stories_version = Column(BigInteger)  # data_versions counter of stories the feed was computed at
+    computed_at = Column(DateTime)
+
+
+class KeywordSketch(Base):
+    """Space-Saving heavy-hitter sketch of story keywords for one posting hour (see keyword_sketches.py)."""
+    __tablename__ = "keyword_sketches"
+    
+    hour = Column(DateTime, primary_key=True)  # Posting hour (posted_at truncated to the hour)
+    counters = Column(Text)  # JSON object: keyword -> [count, error]
+    total = Column(Integer, nullable=False, default=0)  # Tokens added to this sketch
+    updated_at = Column(DateTime)
+
+
+class DataVersion(Base):
+    """Change counter per table, bumped on commit; used to invalidate cached API responses."""
+    __tablename__ = "data_versions"
+    
+    name = Column(String(64), primary_key=True)  # Table name, e.g. "stories"
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MaintenanceCursor(Base):
+    """Resume position of an incremental maintenance scan (e.g. story expiry), kept across runs and processes."""
+    __tablename__ = "maintenance_cursors"
+    
+    name = Column(String(64), primary_key=True)  # Scan name, e.g. "story_expiry_decay"
+    position = Column(BigInteger, nullable=False, default=0)  # Last id processed; 0 starts from the beginning
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class EngagementSnapshot(Base):
+    """Point-in-time engagement metrics for a raw post, used for delta-based velocity."""
+    __tablename__ = "engagement_snapshots"
+    
+    id = Column(Integer, primary_key=True)
+    raw_post_id = Column(Integer, ForeignKey("raw_posts.id", ondelete="CASCADE"), nullable=False)
+    ts = Column(DateTime, nullable=False)  # When the metrics were observed (UTC)
+    likes = Column(Integer, default=0)
+    comments = Column(Integer, default=0)
+    shares = Column(Integer, default=0)
+    views = Column(Integer, default=0)
+    
+    # Relationships
+    raw_post = relationship("RawPost", back_populates="snapshots")
+    
+    __table_args__ = (
+        Index('idx_snapshot_post_ts', 'raw_post_id', 'ts'),
+        Index('idx_snapshot_ts', 'ts'),
     )
 
 
@@ -156,7 +353,8 @@ class ScrapeLog(Base):
     source_id = Column(Integer, ForeignKey("sources.id"), nullable=True)
     hashtag_id = Column(Integer, ForeignKey("hashtags.id"), nullable=True)
     scrape_type = Column(String(50), default="source")  # "source", "hashtag", "location"
-    status = Column(String(50), nullable=False)  # success, error, rate_limited
+    status = Column(String(50), nullable=False)  # queued, running (API scrape jobs), success, error, rate_limited
+    runner = Column(String(120))  # "host:pid:start" of the API process running a thread-backend scrape job
     posts_fetched = Column(Integer, default=0)
     posts_processed = Column(Integer, default=0)
     stories_created = Column(Integer, default=0)
@@ -0,0 +1,100 @@
+"""JSON shapes of stories and insights, shared by the API and the static snapshot export."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Source
+from rollups import query_rollups, velocity_bucket, DIMENSION_TOPIC, DIMENSION_PLATFORM, DIMENSION_VELOCITY
+from keyword_sketches import top_keywords as query_top_keywords
+
+
+def velocity_category(engagement_velocity: float) -> str:
+    """Bucket engagement velocity into the frontend's high/medium/low labels (same buckets as insights and facets)."""
+    return velocity_bucket(engagement_velocity)
+
+
+def story_row_to_dict(row) -> Dict:
+    """
+    Convert a projected story row (services.STORY_ROW_COLUMNS) to a StoryResponse-shaped dict.
+    
+    Used by the list endpoints, which encode these dicts straight to JSON bytes
+    instead of building and re-validating a StoryResponse per story.
+    """
+    timestamp = row.posted_at.strftime("%Y-%m-%d %H:%M") if row.posted_at else ""
+    
+    return {
+        "id": str(row.id),
+        "headline": row.headline or row.content_prefix if row.content_prefix else "",
+        "source": row.author,
+        "platform": row.platform,
+        "engagement": row.likes + row.comments + row.shares,
+        "velocity": velocity_category(row.engagement_velocity),
+        "reason": row.reason_flagged or "High engagement",
+        "timestamp": timestamp,
+        "credibility": int(row.credibility_score),
+        "url": row.url,
+        "topic": row.topic,
+    }
+
+
+def story_event_to_dict(event: Dict) -> Dict:
+    """Convert a live stream story delta (story_stream.story_event) or stored feed row to a StoryResponse-shaped dict."""
+    posted_at = datetime.fromisoformat(event["posted_at"]) if event.get("posted_at") else None
+    return story_row_to_dict(SimpleNamespace(**{**event, "posted_at": posted_at}))
+
+
+def build_insights(db: Session, hours_back: int) -> Dict:
+    """
+    Compute insights and analytics data from the hourly story rollups and keyword sketches.
+    
+    Cost depends on the number of rollup rows in the window, not on story volume.
+    The window starts at the beginning of the hour hours_back ago.
+    
+    Args:
+        db: Database session
+        hours_back: Time range for insights
+    """
+    time_threshold = datetime.utcnow() - timedelta(hours=hours_back)
+    
+    # Topic clusters and trending topics (top 5)
+    topic_counts = query_rollups(db, time_threshold, DIMENSION_TOPIC)
+    trending_topics = topic_counts[:5]
+    
+    # Platform distribution (every active story has exactly one platform)
+    platform_counts = dict(query_rollups(db, time_threshold, DIMENSION_PLATFORM))
+    total_stories = sum(platform_counts.values())
+    
+    # Velocity distribution
+    velocity_counts = dict(query_rollups(db, time_threshold, DIMENSION_VELOCITY))
+    
+    # Top keywords from the hourly heavy-hitter sketches
+    top_keywords = query_top_keywords(db, time_threshold, limit=10)
+    
+    active_sources = db.query(func.count(Source.id)).filter(Source.is_active == True).scalar()
+    
+    return {
+        "total_stories": total_stories,
+        "high_velocity": velocity_counts.get("high", 0),
+        "medium_velocity": velocity_counts.get("medium", 0),
+        "low_velocity": velocity_counts.get("low", 0),
+        "active_sources": active_sources,
+        "trending_topics": [
+            {"name": topic, "count": count}
+            for topic, count in trending_topics
+        ],
+        "platform_distribution": platform_counts,
+        "top_keywords": [
+            {"keyword": word, "mentions": count}
+            for word, count in top_keywords
+        ],
+        "topic_clusters": [
+            {
+                "topic": topic,
+                "count": count,
+                "velocity": "rising" if count > total_stories / len(topic_counts) else "stable",
+                "keywords": [word for word, _ in top_keywords[:3]]
+            }
+            for topic, count in trending_topics
+        ]
+    }
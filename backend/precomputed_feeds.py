@@ -0,0 +1,181 @@
+"""Named dashboard feeds whose top stories are precomputed after scoring batches.
+
+The Kenya, Africa and global dashboards each ask for the same filtered,
+ranked top N on every request. A FeedDefinition names such a feed (region,
+platforms, topics, thresholds); refresh_feeds() runs each definition's query
+once after the scheduler's scoring batch and stores the resulting rows as
+JSON in ``precomputed_feeds``. /api/feeds/{name} then serves a feed with a
+single primary-key lookup, so adding a region adds one query per batch and
+nothing per request.
+
+A feed is recomputed when stories changed since it was computed (the
+data_versions counter) or when it is older than
+``precomputed_feed_max_age_minutes`` (stories age out of the time window
+without any write).
+"""
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from models import Story, PrecomputedFeed
+from services import STORY_ROW_COLUMNS, build_trending_query
+from data_versions import STORIES, get_version
+from config import settings
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class FeedDefinition:
+    """A named, precomputed story feed."""
+    name: str
+    title: str
+    is_kenyan: Optional[bool] = None
+    location: Optional[str] = None  # Gazetteer place or region, e.g. "Africa"
+    platforms: Tuple[str, ...] = ()  # Empty: all platforms
+    topics: Tuple[str, ...] = ()  # Empty: all topics
+    min_score: Optional[float] = None
+    min_velocity: Optional[float] = None
+    hours_back: int = 24
+    size: Optional[int] = None  # Stories kept (defaults to precomputed_feed_size)
+
+
+# Registered feeds by name
+FEEDS: Dict[str, FeedDefinition] = {}
+
+
+def register_feed(feed: FeedDefinition) -> None:
+    """
+    Add (or replace) a feed definition; it is computed from the next refresh on.
+    
+    Args:
+        feed: Feed definition
+    """
+    FEEDS[feed.name] = feed
+
+
+register_feed(FeedDefinition(name="kenya", title="Kenya", is_kenyan=True))
+register_feed(FeedDefinition(name="africa", title="Africa", location="Africa"))
+register_feed(FeedDefinition(name="global", title="Global"))
+
+
+def feed_size(feed: FeedDefinition) -> int:
+    """Number of stories a feed keeps."""
+    return feed.size or settings.precomputed_feed_size
+
+
+def _row_to_dict(row) -> Dict:
+    """Stored form of a feed row (same keys as story_stream.story_event)."""
+    return {
+        "id": row.id,
+        "headline": row.headline,
+        "content_prefix": row.content_prefix,
+        "author": row.author,
+        "platform": row.platform,
+        "likes": row.likes or 0,
+        "comments": row.comments or 0,
+        "shares": row.shares or 0,
+        "engagement_velocity": row.engagement_velocity or 0.0,
+        "reason_flagged": row.reason_flagged,
+        "posted_at": row.posted_at.isoformat() if row.posted_at else None,
+        "credibility_score": row.credibility_score or 0.0,
+        "url": row.url,
+        "topic": row.topic,
+    }
+
+
+def compute_feed(db: Session, feed: FeedDefinition) -> List[Dict]:
+    """
+    Run a feed definition's query.
+    
+    Args:
+        db: Database session
+        feed: Feed definition
+    
+    Returns:
+        Up to feed_size(feed) story dicts in feed order
+    """
+    # A single platform/topic goes through the feed filters (and their rank index choice)
+    platform = feed.platforms[0] if len(feed.platforms) == 1 else None
+    topic = feed.topics[0] if len(feed.topics) == 1 else None
+    query = build_trending_query(
+        db,
+        min_score=feed.min_score,
+        platform=platform,
+        hours_back=feed.hours_back,
+        is_kenyan=feed.is_kenyan,
+        location=feed.location,
+        topic=topic,
+        min_velocity=feed.min_velocity
+    )
+    if len(feed.platforms) > 1:
+        query = query.filter(Story.platform.in_(feed.platforms))
+    if len(feed.topics) > 1:
+        query = query.filter(Story.topic.in_(feed.topics))
+    
+    rows = query.with_entities(*STORY_ROW_COLUMNS).limit(feed_size(feed)).all()
+    return [_row_to_dict(row) for row in rows]
+
+
+def refresh_feeds(db: Session, current_time: Optional[datetime] = None, force: bool = False) -> int:
+    """
+    Recompute feeds whose stories changed or that are older than the maximum age.
+    
+    Args:
+        db: Database session
+        current_time: Reference time (defaults to now, UTC)
+        force: Recompute every feed
+    
+    Returns:
+        Number of feeds recomputed
+    """
+    now = current_time or datetime.utcnow()
+    stale_before = now - timedelta(minutes=settings.precomputed_feed_max_age_minutes)
+    stories_version = get_version(STORIES)
+    stored = {feed.name: feed for feed in db.query(PrecomputedFeed).filter(PrecomputedFeed.name.in_(list(FEEDS))).all()}
+    
+    refreshed = 0
+    for name, definition in list(FEEDS.items()):
+        feed = stored.get(name)
+        if (
+            not force and feed is not None and feed.stories_version == stories_version
+            and feed.computed_at is not None and feed.computed_at >= stale_before
+        ):
+            continue
+        
+        stories = compute_feed(db, definition)
+        if feed is None:
+            feed = PrecomputedFeed(name=name)
+            db.add(feed)
+        feed.stories = json.dumps(stories, ensure_ascii=False)
+        feed.story_count = len(stories)
+        feed.stories_version = stories_version
+        feed.computed_at = now
+        refreshed += 1
+    
+    if refreshed:
+        db.commit()
+        logger.info(f"Refreshed {refreshed} precomputed feed(s)")
+    return refreshed
+
+
+def load_feed(db: Session, name: str) -> Optional[Tuple[List[Dict], Optional[datetime]]]:
+    """
+    Read a precomputed feed, computing it live if it has not been stored yet.
+    
+    Args:
+        db: Database session
+        name: Registered feed name
+    
+    Returns:
+        Tuple of (story dicts in feed order, computed_at or None if computed live),
+        or None if no such feed is registered
+    """
+    definition = FEEDS.get(name)
+    if definition is None:
+        return None
+    
+    feed = db.get(PrecomputedFeed, name)
+    if feed is None or feed.stories is None:
+        return compute_feed(db, definition), None
+    return json.loads(feed.stories), feed.computed_at
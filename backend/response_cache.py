@@ -0,0 +1,315 @@
+"""Versioned cache for JSON API responses.
+
+Entries are keyed by endpoint name plus normalized query parameters and are
+only valid for the data version they were built from (see data_versions).
+When a scrape commits new or changed stories the version moves on and every
+cached story feed misses once; between scrapes a repeated poll is a dict
+lookup plus a local version check.
+
+Storage is an in-process LRU with TTL. With ``response_cache_redis`` enabled,
+entries are also shared across API workers through Redis.
+
+Responses also carry an ETag computed from the same key and versions, so
+a dashboard poll with a still-current If-None-Match is answered with 304
+before any query runs or any body is sent. Compressed variants of a body
+(see compression) are kept with its in-process entry, so a hot response
+is compressed once per encoding rather than on every poll.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+from fastapi.encoders import jsonable_encoder
+from fastapi import Request
+from fastapi.responses import Response
+from data_versions import current_versions
+from compression import compress, negotiate_encoding
+from db_executor import run_db, run_blocking
+from config import settings
+from loguru import logger
+
+try:
+    import orjson  # Optional: several times faster than json for list responses
+except ImportError:
+    orjson = None
+
+
+class JSONPayload(NamedTuple):
+    """Response data plus extra headers (e.g. X-Next-Cursor), returned by a build function."""
+    data: Any
+    headers: Dict[str, str] = {}
+
+
+class CachedResponse:
+    """Encoded response body, the headers cached with it and its compressed variants."""
+    
+    __slots__ = ("body", "headers", "_compressed", "_lock")
+    
+    def __init__(self, body: bytes, headers: Dict[str, str]):
+        self.body = body
+        self.headers = headers
+        self._compressed: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+    
+    def stored_compressed(self, encoding: str) -> Optional[bytes]:
+        """Body compressed with an encoding if that variant was already made, else None (never compresses)."""
+        return self._compressed.get(encoding)
+    
+    def compressed(self, encoding: str) -> bytes:
+        """Body compressed with an encoding, compressed on first use and kept with the entry."""
+        body = self._compressed.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self._compressed.get(encoding)
+                if body is None:
+                    body = compress(self.body, encoding, cached=True)
+                    self._compressed[encoding] = body
+        return body
+    
+    def to_bytes(self) -> bytes:
+        """Serialize for shared (Redis) storage: header JSON line, then the body."""
+        return json.dumps(self.headers).encode("utf-8") + b"\n" + self.body
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        """Load an entry written by to_bytes."""
+        headers, _, body = data.partition(b"\n")
+        return cls(body, json.loads(headers))
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded responses, each tagged with a data version and expiry time."""
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Hashable, float, CachedResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, version: Hashable) -> Optional[CachedResponse]:
+        """Return the cached response if it was built for this version and has not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            entry_version, expires_at, response = entry
+            if entry_version != version or expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return response
+    
+    def set(self, key: str, version: Hashable, response: CachedResponse) -> None:
+        """Store a response, evicting the least recently used entries beyond max_entries."""
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl_seconds, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = ResponseCache(settings.response_cache_max_entries, settings.response_cache_ttl_seconds)
+_redis = None
+_redis_failed = False
+
+
+def _get_redis():
+    """Lazily connect to Redis if shared caching is enabled (None if disabled or unavailable)."""
+    global _redis, _redis_failed
+    if not settings.response_cache_redis or _redis_failed:
+        return None
+    if _redis is None:
+        try:
+            import redis
+            _redis = redis.Redis.from_url(settings.redis_url, socket_timeout=0.5)
+        except Exception as e:
+            logger.warning(f"Redis response cache disabled: {e}")
+            _redis_failed = True
+            return None
+    return _redis
+
+
+def _redis_get(key: str) -> Optional[CachedResponse]:
+    """Read a shared entry; errors count as a miss."""
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        data = client.get(key)
+        return CachedResponse.from_bytes(data) if data is not None else None
+    except Exception as e:
+        logger.warning(f"Redis response cache read failed: {e}")
+        return None
+
+
+def _redis_set(key: str, response: CachedResponse) -> None:
+    """Write a shared entry with the cache TTL; errors are logged and ignored."""
+    client = _get_redis()
+    if client is None:
+        return
+    try:
+        client.setex(key, max(1, int(settings.response_cache_ttl_seconds)), response.to_bytes())
+    except Exception as e:
+        logger.warning(f"Redis response cache write failed: {e}")
+
+
+def make_cache_key(name: str, params: Dict[str, Any]) -> str:
+    """
+    Build a cache key from an endpoint name and its query parameters.
+    
+    Parameters left at None are dropped and the rest are sorted, so
+    equivalent requests share an entry regardless of parameter order.
+    
+    Args:
+        name: Endpoint name
+        params: Query parameters
+    
+    Returns:
+        Cache key
+    """
+    normalized = []
+    for key, value in sorted(params.items()):
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        elif isinstance(value, str):
+            value = value.strip()
+        normalized.append((key, value))
+    return f"{name}?{urlencode(normalized)}"
+
+
+def encode_json(data: Any) -> bytes:
+    """
+    Encode a response body to JSON bytes.
+    
+    Plain dicts/lists/scalars go straight through orjson when it is installed;
+    anything else (e.g. Pydantic models) is converted with jsonable_encoder.
+    The json fallback matches FastAPI's JSONResponse output.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=jsonable_encoder)
+    return json.dumps(
+        jsonable_encoder(data),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _encode_payload(result: Any) -> CachedResponse:
+    """Encode a build function's result (plain data or JSONPayload)."""
+    if isinstance(result, JSONPayload):
+        return CachedResponse(encode_json(result.data), dict(result.headers))
+    return CachedResponse(encode_json(result), {})
+
+
+def make_etag(key: str, versions: Sequence[int]) -> str:
+    """
+    Build a weak ETag from a cache key and the data versions it depends on.
+    
+    The current TTL period is part of the tag, so responses whose content
+    depends on the clock (feeds over the last N hours) are revalidated at
+    least as often as cache entries expire.
+    
+    Args:
+        key: Cache key (endpoint name plus normalized parameters)
+        versions: Data versions of the tables the response is built from
+    
+    Returns:
+        Quoted weak entity tag, e.g. W/"3f2a..."
+    """
+    period = int(time.time() // max(1.0, settings.response_cache_ttl_seconds))
+    tag = ":".join([key, *(str(version) for version in versions), str(period)])
+    return f'W/"{hashlib.sha1(tag.encode()).hexdigest()[:20]}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    """Strip the weak indicator from an entity tag."""
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, lists and ``*`` allowed)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or _opaque_tag(etag) in {_opaque_tag(candidate) for candidate in candidates}
+
+
+async def cached_json_response(
+    name: str,
+    params: Dict[str, Any],
+    build: Callable,
+    version_names: Sequence[str],
+    request: Optional[Request] = None
+) -> Response:
+    """
+    Serve a JSON response from the cache, building it on the DB thread pool on a miss.
+    
+    Every response carries an ETag derived from the parameters and data
+    versions. A request whose If-None-Match still matches gets an empty
+    304 Not Modified without any query or cache lookup.
+    
+    Args:
+        name: Endpoint name (part of the cache key)
+        params: Query parameters (part of the cache key)
+        build: Function taking a Session and returning the response data (or a JSONPayload)
+        version_names: Data versions the response depends on (e.g. (data_versions.STORIES,))
+        request: Incoming request, for If-None-Match
+    
+    Returns:
+        JSON response with ETag and X-Cache (HIT or MISS) headers, compressed
+        when the client accepts it and the body is large enough, or a 304 response
+    """
+    key = make_cache_key(name, params)
+    versions = await current_versions(version_names)
+    etag = make_etag(key, versions)
+    conditional_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    if request is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=conditional_headers)
+    
+    if not settings.response_cache_enabled:
+        response = _encode_payload(await run_db(build))
+        return Response(response.body, media_type="application/json", headers={**response.headers, **conditional_headers})
+    
+    response = _cache.get(key, versions)
+    if response is None:
+        version_tag = ":".join(f"{version_name}={version}" for version_name, version in zip(version_names, versions))
+        shared_key = f"response-cache:{version_tag}:{hashlib.sha1(key.encode()).hexdigest()}"
+        response = _redis_get(shared_key)
+        if response is None:
+            response = _encode_payload(await run_db(build))
+            _redis_set(shared_key, response)
+        _cache.set(key, versions, response)
+        status = "MISS"
+    else:
+        status = "HIT"
+    
+    headers = {**response.headers, **conditional_headers, "X-Cache": status}
+    body = response.body
+    encoding = negotiate_encoding(request.headers.get("accept-encoding")) if request is not None else None
+    if encoding is not None and len(body) >= settings.compression_min_bytes:
+        # First request for this encoding compresses at the dense level off the event loop;
+        # later ones send the stored bytes
+        body = response.stored_compressed(encoding) or await run_blocking(response.compressed, encoding)
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+    
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def clear_response_cache() -> None:
+    """Drop all in-process entries (shared Redis entries expire by TTL)."""
+    _cache.clear()
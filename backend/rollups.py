@@ -0,0 +1,262 @@
+"""Hourly rollups of active stories, maintained incrementally for /api/insights.
+
+Each active story contributes 1 to a row per dimension for the hour it was
+posted in: its topic, its platform and its velocity bucket (keywords are
+tracked separately by keyword_sketches). Session flush events turn story inserts, updates
+(rescoring, deactivation) and deletes into count deltas that are upserted
+into ``story_hourly_rollups`` inside the same transaction, so insights for
+any window are a grouped sum over a bounded number of rows.
+
+Bulk ``query(Story).update()`` / ``.delete()`` bypass the flush events; run
+rebuild_rollups() after such maintenance.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, event, func, inspect
+from sqlalchemy.orm import Session, load_only
+from database import upsert_increment
+from models import Story, StoryHourlyRollup
+from config import settings
+from loguru import logger
+
+DIMENSION_TOPIC = "topic"
+DIMENSION_PLATFORM = "platform"
+DIMENSION_VELOCITY = "velocity"
+
+# Engagement velocity (weighted engagement/hour) at which a story is "high" / "medium";
+# shared by the insights rollups, feed facets and story badges (payloads.velocity_category)
+VELOCITY_HIGH = 100.0
+VELOCITY_MEDIUM = 50.0
+
+# Story attributes a story's rollup contribution depends on
+ROLLUP_FIELDS = ("posted_at", "is_active", "topic", "platform", "engagement_velocity")
+
+_DELTAS_KEY = "rollup_deltas"
+_MAX_VALUE_LENGTH = 191
+
+RollupKey = Tuple[datetime, str, str]
+
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    """Truncate a timestamp to the start of its hour."""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def velocity_bucket(velocity: Optional[float]) -> str:
+    """Classify engagement velocity as high, medium or low (VELOCITY_HIGH / VELOCITY_MEDIUM)."""
+    velocity = velocity or 0.0
+    if velocity >= VELOCITY_HIGH:
+        return "high"
+    if velocity >= VELOCITY_MEDIUM:
+        return "medium"
+    return "low"
+
+
+def velocity_bucket_expression(velocity_column):
+    """SQL equivalent of velocity_bucket, for grouping stories in queries."""
+    return case(
+        (velocity_column >= VELOCITY_HIGH, "high"),
+        (velocity_column >= VELOCITY_MEDIUM, "medium"),
+        else_="low"
+    )
+
+
+def story_contribution(values: Dict) -> Dict[RollupKey, int]:
+    """
+    Calculate the rollup rows a story counts towards.
+    
+    Args:
+        values: Story attribute values keyed by ROLLUP_FIELDS
+    
+    Returns:
+        Dictionary mapping (hour, dimension, value) to count
+    """
+    posted_at = values.get("posted_at")
+    if not posted_at or values.get("is_active") is False:
+        return {}
+    
+    hour = hour_bucket(posted_at)
+    contribution: Dict[RollupKey, int] = defaultdict(int)
+    contribution[(hour, DIMENSION_TOPIC, (values.get("topic") or "General")[:_MAX_VALUE_LENGTH])] += 1
+    contribution[(hour, DIMENSION_PLATFORM, values.get("platform") or "Unknown")] += 1
+    contribution[(hour, DIMENSION_VELOCITY, velocity_bucket(values.get("engagement_velocity")))] += 1
+    return contribution
+
+
+def _current_values(story: Story) -> Dict:
+    """Attribute values a story will have after the flush."""
+    return {field: getattr(story, field) for field in ROLLUP_FIELDS}
+
+
+def _previous_values(story: Story) -> Dict:
+    """Attribute values the story had in the database before the flush."""
+    state = inspect(story)
+    values = {}
+    for field in ROLLUP_FIELDS:
+        history = state.attrs[field].history
+        if history.deleted:
+            values[field] = history.deleted[0]
+        elif history.unchanged:
+            values[field] = history.unchanged[0]
+        else:
+            values[field] = None
+    return values
+
+
+def _add(deltas: Dict[RollupKey, int], contribution: Dict[RollupKey, int], sign: int) -> None:
+    """Accumulate a signed contribution into a delta map."""
+    for key, count in contribution.items():
+        deltas[key] += sign * count
+
+
+def _load_unloaded(session: Session, stories: List[Story]) -> None:
+    """Load rollup fields that were not loaded (e.g. load_only queries) in one query."""
+    missing = [story.id for story in stories if inspect(story).unloaded.intersection(ROLLUP_FIELDS)]
+    if not missing:
+        return
+    
+    with session.no_autoflush:
+        # Existing identities only receive their unloaded attributes; pending changes are kept
+        session.query(Story).options(
+            load_only(*(getattr(Story, field) for field in ROLLUP_FIELDS))
+        ).filter(Story.id.in_(missing)).all()
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_story_deltas(session: Session, flush_context, instances) -> None:
+    """Turn pending story inserts, updates and deletes into rollup count deltas."""
+    new = [obj for obj in session.new if isinstance(obj, Story)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, Story)]
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, Story) and session.is_modified(obj, include_collections=False)
+        and any(inspect(obj).attrs[field].history.has_changes() for field in ROLLUP_FIELDS)
+    ]
+    if not (new or deleted or changed):
+        return
+    
+    _load_unloaded(session, deleted + changed)
+    
+    deltas: Dict[RollupKey, int] = session.info.setdefault(_DELTAS_KEY, defaultdict(int))
+    for story in new:
+        values = _current_values(story)
+        if values["is_active"] is None:
+            values["is_active"] = True  # Column default
+        _add(deltas, story_contribution(values), 1)
+    for story in deleted:
+        _add(deltas, story_contribution(_previous_values(story)), -1)
+    for story in changed:
+        _add(deltas, story_contribution(_previous_values(story)), -1)
+        _add(deltas, story_contribution(_current_values(story)), 1)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_story_deltas(session: Session, flush_context) -> None:
+    """Upsert accumulated deltas in the flushing transaction."""
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if not deltas:
+        return
+    
+    table = StoryHourlyRollup.__table__
+    connection = session.connection()
+    for (hour, dimension, value), delta in deltas.items():
+        if delta:
+            upsert_increment(connection, table, {"hour": hour, "dimension": dimension, "value": value}, {"count": delta})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_story_deltas(session: Session) -> None:
+    """Drop deltas of a flush that never happened."""
+    session.info.pop(_DELTAS_KEY, None)
+
+
+def query_rollups(
+    db: Session,
+    since: datetime,
+    dimension: str,
+    limit: Optional[int] = None
+) -> List[Tuple[str, int]]:
+    """
+    Sum rollup counts per value for one dimension.
+    
+    Args:
+        db: Database session
+        since: Window start (rounded down to the hour)
+        dimension: One of the DIMENSION_* constants
+        limit: Only return the N largest values
+    
+    Returns:
+        List of (value, count) sorted by count descending
+    """
+    total = func.sum(StoryHourlyRollup.count)
+    query = db.query(StoryHourlyRollup.value, total).filter(
+        StoryHourlyRollup.dimension == dimension,
+        StoryHourlyRollup.hour >= hour_bucket(since)
+    ).group_by(StoryHourlyRollup.value).having(total > 0).order_by(total.desc(), StoryHourlyRollup.value)
+    
+    if limit:
+        query = query.limit(limit)
+    
+    return [(value, int(count)) for value, count in query.all()]
+
+
+def rebuild_rollups(db: Session, batch_size: int = 1000) -> int:
+    """
+    Recompute all rollups from the stories table.
+    
+    Args:
+        db: Database session
+        batch_size: Stories read per batch
+    
+    Returns:
+        Number of rollup rows written
+    """
+    totals: Dict[RollupKey, int] = defaultdict(int)
+    last_id = 0
+    while True:
+        rows = db.query(Story.id, *(getattr(Story, field) for field in ROLLUP_FIELDS)).filter(
+            Story.is_active == True,
+            Story.id > last_id
+        ).order_by(Story.id).limit(batch_size).all()
+        if not rows:
+            break
+        
+        last_id = rows[-1][0]
+        for row in rows:
+            _add(totals, story_contribution(dict(zip(ROLLUP_FIELDS, row[1:]))), 1)
+    
+    db.query(StoryHourlyRollup).delete(synchronize_session=False)
+    db.bulk_insert_mappings(StoryHourlyRollup, [
+        {"hour": hour, "dimension": dimension, "value": value, "count": count}
+        for (hour, dimension, value), count in totals.items()
+    ])
+    db.commit()
+    
+    logger.info(f"Rebuilt story rollups: {len(totals)} rows")
+    return len(totals)
+
+
+def prune_rollups(db: Session, current_time: Optional[datetime] = None, max_age_hours: Optional[int] = None) -> int:
+    """
+    Delete empty rollup rows and rows older than every insights window.
+    
+    Args:
+        db: Database session
+        current_time: Reference time (defaults to now, UTC)
+        max_age_hours: Oldest hour kept (defaults to settings.story_max_age_hours)
+    
+    Returns:
+        Number of rows deleted
+    """
+    now = current_time or datetime.utcnow()
+    cutoff = hour_bucket(now - timedelta(hours=max_age_hours or settings.story_max_age_hours))
+    
+    deleted = db.query(StoryHourlyRollup).filter(
+        (StoryHourlyRollup.hour < cutoff) | (StoryHourlyRollup.count == 0)
+    ).delete(synchronize_session=False)
+    db.commit()
+    
+    if deleted:
+        logger.info(f"Pruned {deleted} story rollup rows")
+    return deleted
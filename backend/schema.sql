@@ -93,23 +93,130 @@ CREATE TABLE IF NOT EXISTS stories (
   views INT DEFAULT 0,
   score FLOAT NOT NULL,
   engagement_velocity FLOAT,
+  engagement_acceleration FLOAT,
   credibility_score FLOAT DEFAULT 0.0,
   topic_relevance_score FLOAT DEFAULT 0.0,
+  scoring_profile VARCHAR(120),
   location VARCHAR(255),
   is_kenyan TINYINT(1) DEFAULT 0,
+  country_code CHAR(2),
+  region VARCHAR(32),
   headline VARCHAR(500),
   reason_flagged VARCHAR(255),
   topic VARCHAR(255),
   is_active TINYINT(1) DEFAULT 1,
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-  updated_at DATETIME ON UPDATE CURRENT_TIMESTAMP,
+  updated_at DATETIME,  -- UTC, set by the application on insert and update
+  rank_key VARCHAR(40),
   FOREIGN KEY (raw_post_id) REFERENCES raw_posts(id) ON DELETE CASCADE,
   INDEX idx_story_score (score),
   INDEX idx_story_posted_at (posted_at),
   INDEX idx_story_active (is_active),
+  INDEX idx_story_active_posted (is_active, posted_at),
   INDEX idx_story_kenyan (is_kenyan),
   INDEX idx_story_location (location),
-  INDEX idx_story_engagement_velocity (engagement_velocity)
+  INDEX idx_story_engagement_velocity (engagement_velocity),
+  INDEX idx_story_rank (is_active, rank_key),
+  INDEX idx_story_kenyan_rank (is_active, is_kenyan, rank_key),
+  INDEX idx_story_platform_rank (is_active, platform, rank_key),
+  INDEX idx_story_country_rank (is_active, country_code, rank_key),
+  INDEX idx_story_region_rank (is_active, region, rank_key),
+  INDEX idx_story_updated (updated_at, id),
+  FULLTEXT INDEX idx_story_fulltext (headline, content)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ---------------------------------------------------------------------------
+-- Table: scoring_profiles - Named, versioned scoring parameters
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS scoring_profiles (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  name VARCHAR(100) NOT NULL,
+  version INT NOT NULL,
+  params TEXT NOT NULL,
+  is_active TINYINT(1) DEFAULT 0,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_scoring_profile_name_version (name, version),
+  INDEX idx_scoring_profile_active (is_active)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ---------------------------------------------------------------------------
+-- Table: story_hourly_rollups - Active story counts per hour and dimension (insights)
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS story_hourly_rollups (
+  hour DATETIME NOT NULL,
+  dimension VARCHAR(16) NOT NULL,
+  value VARCHAR(191) NOT NULL,
+  count INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (hour, dimension, value),
+  INDEX idx_rollup_dimension_hour (dimension, hour)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ---------------------------------------------------------------------------
+-- Table: keyword_sketches - Hourly heavy-hitter keyword sketches (insights)
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS keyword_sketches (
+  hour DATETIME PRIMARY KEY,
+  counters TEXT,
+  total INT NOT NULL DEFAULT 0,
+  updated_at DATETIME
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ---------------------------------------------------------------------------
+-- Table: hot_stories - Materialized hot set (active, high velocity, recent) for /api/stories/hot
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS hot_stories (
+  story_id INT PRIMARY KEY,
+  is_kenyan BOOLEAN NOT NULL DEFAULT FALSE,
+  posted_at DATETIME NOT NULL,
+  rank_key VARCHAR(40) NOT NULL,
+  FOREIGN KEY (story_id) REFERENCES stories(id) ON DELETE CASCADE,
+  INDEX idx_hot_rank (rank_key),
+  INDEX idx_hot_kenyan_rank (is_kenyan, rank_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ---------------------------------------------------------------------------
+-- Table: precomputed_feeds - Top stories per named feed (/api/feeds/{name})
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS precomputed_feeds (
+  name VARCHAR(64) PRIMARY KEY,
+  stories MEDIUMTEXT,
+  story_count INT NOT NULL DEFAULT 0,
+  stories_version BIGINT,
+  computed_at DATETIME
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ---------------------------------------------------------------------------
+-- Table: data_versions - Change counters used to invalidate cached API responses
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS data_versions (
+  name VARCHAR(64) PRIMARY KEY,
+  version BIGINT NOT NULL DEFAULT 0,
+  updated_at DATETIME
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ---------------------------------------------------------------------------
+-- Table: maintenance_cursors - Resume positions of incremental maintenance scans
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS maintenance_cursors (
+  name VARCHAR(64) PRIMARY KEY,
+  position BIGINT NOT NULL DEFAULT 0,
+  updated_at DATETIME
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ---------------------------------------------------------------------------
+-- Table: engagement_snapshots - Metric time series for delta-based velocity
+-- ---------------------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS engagement_snapshots (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  raw_post_id INT NOT NULL,
+  ts DATETIME NOT NULL,
+  likes INT DEFAULT 0,
+  comments INT DEFAULT 0,
+  shares INT DEFAULT 0,
+  views INT DEFAULT 0,
+  FOREIGN KEY (raw_post_id) REFERENCES raw_posts(id) ON DELETE CASCADE,
+  INDEX idx_snapshot_post_ts (raw_post_id, ts),
+  INDEX idx_snapshot_ts (ts)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ---------------------------------------------------------------------------
@@ -121,6 +228,7 @@ CREATE TABLE IF NOT EXISTS scrape_logs (
   hashtag_id INT,
   scrape_type VARCHAR(50) DEFAULT 'source',
   status VARCHAR(50) NOT NULL,
+  runner VARCHAR(120),
   posts_fetched INT DEFAULT 0,
   posts_processed INT DEFAULT 0,
   stories_created INT DEFAULT 0,
@@ -1,10 +1,19 @@
 """Scoring system for posts based on engagement, credibility, and trending."""
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence, Tuple
 from config import settings
 from kenyan_sources_config import KENYAN_KEYWORDS, KENYAN_LOCATIONS
 
 
+def calculate_weighted_engagement(likes: int, comments: int, shares: int, views: int) -> float:
+    """
+    Weighted engagement total used by all velocity calculations.
+    
+    Views are less valuable, so we weight them lower.
+    """
+    return (likes or 0) + ((comments or 0) * 2) + ((shares or 0) * 3) + ((views or 0) * 0.1)
+
+
 def calculate_engagement_velocity(
     likes: int,
     comments: int,
@@ -35,8 +44,7 @@ def calculate_engagement_velocity(
     hours_elapsed = max(time_diff.total_seconds() / 3600, 0.1)  # At least 0.1 hours
     
     # Weighted engagement metric
-    # Views are less valuable, so we weight them lower
-    total_engagement = likes + (comments * 2) + (shares * 3) + (views * 0.1)
+    total_engagement = calculate_weighted_engagement(likes, comments, shares, views)
     
     # Engagement per hour
     velocity = total_engagement / hours_elapsed
@@ -44,6 +52,44 @@ def calculate_engagement_velocity(
     return velocity
 
 
+def calculate_snapshot_velocity(snapshots: Sequence) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Calculate engagement velocity and acceleration from a snapshot series.
+    
+    Velocity is the weighted engagement gained between the two most recent
+    snapshots, per hour. Acceleration is the change between that velocity and
+    the one before it, per hour. Old posts that have stopped growing therefore
+    get a velocity near zero regardless of their lifetime totals.
+    
+    Args:
+        snapshots: Snapshots (with ts, likes, comments, shares, views) ordered by ts ascending
+    
+    Returns:
+        Tuple of (velocity, acceleration); velocity is None with fewer than two
+        snapshots, acceleration is None with fewer than three
+    """
+    if len(snapshots) < 2:
+        return None, None
+    
+    def _rate(older, newer) -> Tuple[float, float]:
+        hours = max((newer.ts - older.ts).total_seconds() / 3600, 0.1)  # At least 0.1 hours
+        gained = (
+            calculate_weighted_engagement(newer.likes, newer.comments, newer.shares, newer.views) -
+            calculate_weighted_engagement(older.likes, older.comments, older.shares, older.views)
+        )
+        return gained / hours, hours
+    
+    velocity, last_hours = _rate(snapshots[-2], snapshots[-1])
+    if len(snapshots) < 3:
+        return velocity, None
+    
+    previous_velocity, previous_hours = _rate(snapshots[-3], snapshots[-2])
+    # Time between the midpoints of the two intervals
+    acceleration = (velocity - previous_velocity) / ((last_hours + previous_hours) / 2)
+    
+    return velocity, acceleration
+
+
 def calculate_credibility_score(
     account_handle: str,
     is_trusted_source: bool = False
@@ -129,6 +175,168 @@ def calculate_topic_relevance_score(content: str, is_kenyan: bool = False, locat
     return total_score
 
 
+# Location lists used for score boosts (lower-cased once)
+_KENYAN_LOCATIONS_LOWER = tuple(loc.lower() for loc in KENYAN_LOCATIONS)
+_AFRICAN_LOCATIONS_LOWER = ('africa', 'nairobi', 'mombasa', 'lagos', 'johannesburg', 'cairo', 'accra')
+
+
+def default_scoring_params() -> Dict[str, float]:
+    """
+    Built-in scoring parameters (used when no scoring profile is stored).
+    
+    Returns:
+        Dictionary of scoring parameters
+    """
+    return {
+        # Weighted scoring: velocity 50%, credibility 30%, topic relevance 20%
+        "velocity_weight": 0.5,
+        "credibility_weight": 0.3,
+        "topic_weight": 0.2,
+        # Velocity is divided by this to scale it to 0-100 (max reasonable velocity 1000/hour)
+        "velocity_scale": 10.0,
+        # Score boosts
+        "kenyan_boost": 15.0,
+        "kenyan_location_boost": 10.0,
+        "african_location_boost": 5.0,
+        # Keep thresholds (Kenyan content gets lower thresholds to catch early trends)
+        "min_score": float(settings.min_engagement_score),
+        "min_velocity": float(settings.min_engagement_velocity),
+        "kenyan_score_factor": 0.7,
+        "kenyan_velocity_factor": 0.5,
+        # Reason thresholds
+        "trusted_credibility": 80.0,
+        "trending_topic_relevance": 60.0,
+        "high_metric_likes": 1000.0,  # "High engagement metrics" when any of these is reached
+        "high_metric_comments": 100.0,
+        "high_metric_shares": 50.0,
+    }
+
+
+class ScoringEvaluator:
+    """
+    Scoring parameters compiled into plain attributes.
+    
+    Build once per parameter set and reuse; evaluating a post costs the same
+    as the inline arithmetic it replaces.
+    """
+    
+    __slots__ = (
+        "name", "version", "params",
+        "_velocity_weight", "_credibility_weight", "_topic_weight", "_velocity_divisor",
+        "_kenyan_boost", "_kenyan_location_boost", "_african_location_boost",
+        "_rising_velocity", "_high_velocity", "_trusted_credibility", "_trending_topic_relevance",
+        "_high_metric_likes", "_high_metric_comments", "_high_metric_shares",
+        "_min_score", "_min_velocity", "_kenyan_min_score", "_kenyan_min_velocity",
+    )
+    
+    def __init__(self, name: str, version: int, params: Dict[str, float]):
+        """
+        Compile scoring parameters.
+        
+        Args:
+            name: Profile name
+            version: Profile version
+            params: Complete, validated parameter dictionary
+        """
+        self.name = name
+        self.version = version
+        self.params = dict(params)
+        
+        self._velocity_weight = params["velocity_weight"]
+        self._credibility_weight = params["credibility_weight"]
+        self._topic_weight = params["topic_weight"]
+        self._velocity_divisor = params["velocity_scale"]
+        self._kenyan_boost = params["kenyan_boost"]
+        self._kenyan_location_boost = params["kenyan_location_boost"]
+        self._african_location_boost = params["african_location_boost"]
+        self._rising_velocity = params["min_velocity"]
+        self._high_velocity = params["min_velocity"] * 2
+        self._trusted_credibility = params["trusted_credibility"]
+        self._trending_topic_relevance = params["trending_topic_relevance"]
+        self._high_metric_likes = params["high_metric_likes"]
+        self._high_metric_comments = params["high_metric_comments"]
+        self._high_metric_shares = params["high_metric_shares"]
+        self._min_score = params["min_score"]
+        self._min_velocity = params["min_velocity"]
+        self._kenyan_min_score = params["min_score"] * params["kenyan_score_factor"]
+        self._kenyan_min_velocity = params["min_velocity"] * params["kenyan_velocity_factor"]
+    
+    @property
+    def label(self) -> str:
+        """Profile identifier recorded on scored stories (e.g. "default@3")."""
+        return f"{self.name}@{self.version}"
+    
+    def overall_score(
+        self,
+        engagement_velocity: float,
+        credibility_score: float,
+        topic_relevance_score: float,
+        likes: int,
+        comments: int,
+        shares: int,
+        views: int,
+        is_kenyan: bool = False,
+        location: str = None
+    ) -> Tuple[float, str]:
+        """Calculate overall score and reason for flagging (see calculate_overall_score)."""
+        normalized_velocity = min(engagement_velocity / self._velocity_divisor, 100.0)  # Scale to 0-100
+        
+        overall_score = (
+            normalized_velocity * self._velocity_weight +
+            credibility_score * self._credibility_weight +
+            topic_relevance_score * self._topic_weight
+        )
+        
+        # Determine reason for flagging
+        reasons = []
+        
+        if engagement_velocity >= self._high_velocity:
+            reasons.append("High engagement velocity")
+        elif engagement_velocity >= self._rising_velocity:
+            reasons.append("Rising engagement")
+        
+        if credibility_score >= self._trusted_credibility:
+            reasons.append("Trusted source")
+        
+        if topic_relevance_score >= self._trending_topic_relevance:
+            reasons.append("Trending topic")
+        
+        if is_kenyan:
+            reasons.append("Kenyan content")
+            # Boost overall score for Kenyan content
+            overall_score += self._kenyan_boost
+        
+        if location:
+            location_lower = location.lower()
+            if any(kenyan_loc in location_lower for kenyan_loc in _KENYAN_LOCATIONS_LOWER):
+                reasons.append("Kenyan location")
+                overall_score += self._kenyan_location_boost
+            elif any(african_loc in location_lower for african_loc in _AFRICAN_LOCATIONS_LOWER):
+                reasons.append("African location")
+                overall_score += self._african_location_boost
+        
+        if (
+            likes >= self._high_metric_likes or
+            comments >= self._high_metric_comments or
+            shares >= self._high_metric_shares
+        ):
+            reasons.append("High engagement metrics")
+        
+        reason_flagged = ", ".join(reasons) if reasons else "Moderate engagement"
+        
+        return overall_score, reason_flagged
+    
+    def should_keep(self, score: float, engagement_velocity: float, is_kenyan: bool = False) -> bool:
+        """Determine if a post should be kept based on thresholds (see should_keep_post)."""
+        if is_kenyan:
+            return score >= self._kenyan_min_score and engagement_velocity >= self._kenyan_min_velocity
+        return score >= self._min_score and engagement_velocity >= self._min_velocity
+
+
+# Built-in profile, compiled from config settings
+DEFAULT_EVALUATOR = ScoringEvaluator("default", 0, default_scoring_params())
+
+
 def calculate_overall_score(
     engagement_velocity: float,
     credibility_score: float,
@@ -138,7 +346,8 @@ def calculate_overall_score(
     shares: int,
     views: int,
     is_kenyan: bool = False,
-    location: str = None
+    location: str = None,
+    evaluator: Optional[ScoringEvaluator] = None
 ) -> tuple[float, str]:
     """
     Calculate overall score and reason for flagging.
@@ -151,61 +360,30 @@ def calculate_overall_score(
         comments: Number of comments
         shares: Number of shares
         views: Number of views
+        evaluator: Compiled scoring profile (defaults to the built-in profile)
     
     Returns:
         Tuple of (overall_score, reason_flagged)
     """
-    # Weighted scoring
-    # Engagement velocity: 50% weight
-    # Credibility: 30% weight
-    # Topic relevance: 20% weight
-    
-    # Normalize engagement velocity (assume max reasonable velocity is 1000/hour)
-    normalized_velocity = min(engagement_velocity / 10.0, 100.0)  # Scale to 0-100
-    
-    overall_score = (
-        normalized_velocity * 0.5 +
-        credibility_score * 0.3 +
-        topic_relevance_score * 0.2
+    return (evaluator or DEFAULT_EVALUATOR).overall_score(
+        engagement_velocity,
+        credibility_score,
+        topic_relevance_score,
+        likes,
+        comments,
+        shares,
+        views,
+        is_kenyan=is_kenyan,
+        location=location
     )
-    
-    # Determine reason for flagging
-    reasons = []
-    
-    if engagement_velocity >= settings.min_engagement_velocity * 2:
-        reasons.append("High engagement velocity")
-    elif engagement_velocity >= settings.min_engagement_velocity:
-        reasons.append("Rising engagement")
-    
-    if credibility_score >= 80:
-        reasons.append("Trusted source")
-    
-    if topic_relevance_score >= 60:
-        reasons.append("Trending topic")
-    
-    if is_kenyan:
-        reasons.append("Kenyan content")
-        # Boost overall score for Kenyan content
-        overall_score += 15.0
-    
-    if location:
-        location_lower = location.lower()
-        if any(kenyan_loc.lower() in location_lower for kenyan_loc in KENYAN_LOCATIONS):
-            reasons.append("Kenyan location")
-            overall_score += 10.0
-        elif any(african_loc in location_lower for african_loc in ['africa', 'nairobi', 'mombasa', 'lagos', 'johannesburg', 'cairo', 'accra']):
-            reasons.append("African location")
-            overall_score += 5.0
-    
-    if likes >= 1000 or comments >= 100 or shares >= 50:
-        reasons.append("High engagement metrics")
-    
-    reason_flagged = ", ".join(reasons) if reasons else "Moderate engagement"
-    
-    return overall_score, reason_flagged
 
 
-def should_keep_post(score: float, engagement_velocity: float, is_kenyan: bool = False) -> bool:
+def should_keep_post(
+    score: float,
+    engagement_velocity: float,
+    is_kenyan: bool = False,
+    evaluator: Optional[ScoringEvaluator] = None
+) -> bool:
     """
     Determine if a post should be kept based on thresholds.
     Lower thresholds for Kenyan content to catch early trends.
@@ -214,15 +392,9 @@ def should_keep_post(score: float, engagement_velocity: float, is_kenyan: bool =
         score: Overall score
         engagement_velocity: Engagement velocity
         is_kenyan: Whether this is Kenyan content (lower thresholds for early detection)
+        evaluator: Compiled scoring profile (defaults to the built-in profile)
     
     Returns:
         True if post should be kept, False otherwise
     """
-    # Lower thresholds for Kenyan content to catch stories before they blow up
-    min_score = settings.min_engagement_score * (0.7 if is_kenyan else 1.0)  # 30% lower for Kenyan
-    min_velocity = settings.min_engagement_velocity * (0.5 if is_kenyan else 1.0)  # 50% lower for Kenyan
-    
-    return (
-        score >= min_score and
-        engagement_velocity >= min_velocity
-    )
+    return (evaluator or DEFAULT_EVALUATOR).should_keep(score, engagement_velocity, is_kenyan)
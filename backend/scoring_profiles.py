@@ -0,0 +1,175 @@
+"""Named scoring profiles stored in the database and hot-reloaded by every process.
+
+A profile is a JSON object of scoring parameters (see ``scoring.default_scoring_params``).
+Saving a profile creates a new version and activates it; API workers, the
+background scheduler and Celery workers pick it up within
+``scoring_profile_refresh_seconds`` without a restart.
+"""
+import json
+import math
+import threading
+import time
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+from database import SessionLocal
+from models import ScoringProfile
+from scoring import ScoringEvaluator, DEFAULT_EVALUATOR, default_scoring_params
+from config import settings
+from loguru import logger
+
+# Parameters that must stay within 0-1
+_FRACTION_PARAMS = ("velocity_weight", "credibility_weight", "topic_weight",
+                    "kenyan_score_factor", "kenyan_velocity_factor")
+
+_lock = threading.Lock()
+_active_evaluator: ScoringEvaluator = DEFAULT_EVALUATOR
+_active_profile_id: Optional[int] = None
+_checked_at: float = 0.0
+
+
+def validate_profile_params(params: Dict) -> Dict[str, float]:
+    """
+    Validate scoring parameters and fill in defaults for omitted keys.
+    
+    Args:
+        params: Partial or complete parameter dictionary
+    
+    Returns:
+        Complete parameter dictionary with float values
+    
+    Raises:
+        ValueError: If a key is unknown or a value is out of range
+    """
+    defaults = default_scoring_params()
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown scoring parameters: {', '.join(sorted(unknown))}")
+    
+    validated = dict(defaults)
+    for key, value in params.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Scoring parameter '{key}' must be a number")
+        value = float(value)
+        if not math.isfinite(value) or value < 0:
+            raise ValueError(f"Scoring parameter '{key}' must be a non-negative number")
+        if key in _FRACTION_PARAMS and value > 1:
+            raise ValueError(f"Scoring parameter '{key}' must be between 0 and 1")
+        validated[key] = value
+    
+    if validated["velocity_scale"] <= 0:
+        raise ValueError("Scoring parameter 'velocity_scale' must be greater than 0")
+    if validated["velocity_weight"] + validated["credibility_weight"] + validated["topic_weight"] <= 0:
+        raise ValueError("At least one scoring weight must be greater than 0")
+    
+    return validated
+
+
+def compile_profile(profile: ScoringProfile) -> ScoringEvaluator:
+    """Validate a stored profile and compile it into an evaluator."""
+    params = validate_profile_params(json.loads(profile.params))
+    return ScoringEvaluator(profile.name, profile.version, params)
+
+
+def get_active_evaluator(db: Optional[Session] = None) -> ScoringEvaluator:
+    """
+    Get the compiled evaluator for the active scoring profile.
+    
+    The database is consulted at most once per ``scoring_profile_refresh_seconds``;
+    a profile is only recompiled when the active profile changes.
+    
+    Args:
+        db: Database session (a short-lived one is opened if omitted)
+    
+    Returns:
+        Compiled ScoringEvaluator (the built-in default if no profile is active)
+    """
+    global _active_evaluator, _active_profile_id, _checked_at
+    
+    if time.monotonic() - _checked_at < settings.scoring_profile_refresh_seconds:
+        return _active_evaluator
+    
+    with _lock:
+        if time.monotonic() - _checked_at < settings.scoring_profile_refresh_seconds:
+            return _active_evaluator
+        
+        session = db or SessionLocal()
+        try:
+            profile_id = session.query(ScoringProfile.id).filter(
+                ScoringProfile.is_active == True
+            ).order_by(ScoringProfile.id.desc()).limit(1).scalar()
+            
+            if profile_id is None:
+                _active_evaluator, _active_profile_id = DEFAULT_EVALUATOR, None
+            elif profile_id != _active_profile_id:
+                profile = session.query(ScoringProfile).filter(ScoringProfile.id == profile_id).first()
+                _active_evaluator = compile_profile(profile)
+                _active_profile_id = profile_id
+                logger.info(f"Loaded scoring profile {_active_evaluator.label}")
+        except Exception as e:
+            # Keep scoring with the last good evaluator
+            logger.error(f"Error loading scoring profile: {e}")
+        finally:
+            if db is None:
+                session.close()
+        
+        _checked_at = time.monotonic()
+        return _active_evaluator
+
+
+def reload_active_evaluator() -> None:
+    """Force the next get_active_evaluator() call to check the database."""
+    global _checked_at
+    _checked_at = 0.0
+
+
+def save_profile(db: Session, name: str, params: Dict, activate: bool = True) -> ScoringProfile:
+    """
+    Store a new version of a named scoring profile.
+    
+    Args:
+        db: Database session
+        name: Profile name
+        params: Scoring parameters (omitted keys use the built-in defaults)
+        activate: Make this version the active profile
+    
+    Returns:
+        The stored ScoringProfile
+    
+    Raises:
+        ValueError: If the parameters are invalid
+    """
+    validated = validate_profile_params(params)
+    
+    latest_version = db.query(func.max(ScoringProfile.version)).filter(
+        ScoringProfile.name == name
+    ).scalar()
+    
+    profile = ScoringProfile(
+        name=name,
+        version=(latest_version or 0) + 1,
+        params=json.dumps(validated, sort_keys=True),
+        is_active=activate
+    )
+    
+    if activate:
+        db.query(ScoringProfile).filter(ScoringProfile.is_active == True).update(
+            {ScoringProfile.is_active: False}, synchronize_session=False
+        )
+    
+    db.add(profile)
+    db.commit()
+    reload_active_evaluator()
+    
+    logger.info(f"Saved scoring profile {name}@{profile.version} (active: {activate})")
+    return profile
+
+
+def profile_to_dict(evaluator: ScoringEvaluator) -> Dict:
+    """Serialize an evaluator's profile for API responses."""
+    return {
+        "name": evaluator.name,
+        "version": evaluator.version,
+        "label": evaluator.label,
+        "params": evaluator.params,
+    }
@@ -0,0 +1,360 @@
+"""Asynchronous scrape jobs, tracked as rows in scrape_logs.
+
+Submitting a scrape creates a ScrapeLog in status ``queued`` and returns its
+ID as the job ID right away; the scrape itself runs on the API scrape
+thread pool or, with ``scrape_jobs_backend = "celery"``, on a Celery worker.
+The worker claims the job (queued -> running), runs the scrape and records
+the outcome and counts in the same row (success / error), so job status is
+a single-row lookup from any process.
+
+A submission for a source (or hashtag, or Facebook trends aggregation) that
+already has a queued or running job returns that job instead of starting
+another scrape. Jobs still active after ``scrape_job_timeout_minutes``
+(e.g. the worker process died) are marked as errors and no longer coalesce.
+
+Jobs on the API scrape pool record the process running them (``runner``:
+host, pid and process start time). When an API process starts, it fails
+the active jobs of earlier processes on the same host that are gone, so a
+restart does not block new scrapes of those targets until the timeout.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+import os
+import socket
+import threading
+import time
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import ScrapeLog, Source, Hashtag
+from services import scrape_source
+from config import settings
+from loguru import logger
+
+SCRAPE_SOURCE = "source"
+SCRAPE_HASHTAG = "hashtag"
+SCRAPE_FACEBOOK_TRENDS = "facebook_trends"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+ACTIVE_JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+# Serializes the coalescing check and insert within a process
+_submit_lock = threading.Lock()
+
+# Identifies this process in ScrapeLog.runner (the start time tells a restarted process with a reused pid apart)
+PROCESS_RUNNER = f"{socket.gethostname()}:{os.getpid()}:{int(time.time())}"
+
+
+def facebook_trend_pages(db: Session):
+    """Active Facebook Pages with a Page ID (the input of trend aggregation)."""
+    return db.query(Source).filter(
+        Source.platform == "Facebook",
+        Source.is_active == True,
+        Source.account_id.isnot(None)  # Must have Page ID
+    ).all()
+
+
+def expire_abandoned_jobs(db: Session, current_time: Optional[datetime] = None) -> int:
+    """
+    Mark jobs that stayed queued or running past the timeout as errors.
+    
+    Args:
+        db: Database session
+        current_time: Reference time (defaults to now, UTC)
+    
+    Returns:
+        Number of jobs marked
+    """
+    now = current_time or datetime.utcnow()
+    cutoff = now - timedelta(minutes=settings.scrape_job_timeout_minutes)
+    expired = db.execute(
+        update(ScrapeLog).where(
+            ScrapeLog.status.in_(ACTIVE_JOB_STATUSES),
+            ScrapeLog.started_at < cutoff
+        ).values(
+            status="error",
+            error_message=f"Job did not finish within {settings.scrape_job_timeout_minutes} minutes",
+            completed_at=now
+        )
+    ).rowcount
+    db.commit()
+    
+    if expired:
+        logger.warning(f"Marked {expired} abandoned scrape job(s) as failed")
+    return expired
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process with this pid exists on this host."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists, owned by another user
+    except OSError:
+        return False
+    return True
+
+
+def fail_orphaned_jobs(db: Session) -> int:
+    """
+    Mark active thread-backend jobs of API processes on this host that no longer exist as errors.
+    
+    Call once when an API process starts: jobs run on an API scrape pool die
+    with their process, and would otherwise block new submissions for their
+    target until scrape_job_timeout_minutes. Jobs of other live processes
+    (other API workers) and Celery jobs are left alone.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Number of jobs marked
+    """
+    host = socket.gethostname()
+    jobs = db.query(ScrapeLog).filter(
+        ScrapeLog.status.in_(ACTIVE_JOB_STATUSES),
+        ScrapeLog.runner.like(f"{host}:%")
+    ).all()
+    
+    orphaned = []
+    for job in jobs:
+        try:
+            pid = int(job.runner.split(":")[1])
+        except (IndexError, ValueError):
+            continue
+        # Our own pid under an older start time is a previous incarnation (e.g. a restarted container)
+        if job.runner != PROCESS_RUNNER and (pid == os.getpid() or not _process_alive(pid)):
+            orphaned.append(job)
+    
+    now = datetime.utcnow()
+    for job in orphaned:
+        job.status = "error"
+        job.error_message = "API process running the job exited before it finished"
+        job.completed_at = now
+    db.commit()
+    
+    if orphaned:
+        logger.warning(f"Marked {len(orphaned)} scrape job(s) orphaned by an API restart as failed")
+    return len(orphaned)
+
+
+def find_active_job(
+    db: Session,
+    scrape_type: str,
+    source_id: Optional[int] = None,
+    hashtag_id: Optional[int] = None
+) -> Optional[ScrapeLog]:
+    """Get the queued or running job for the same target, if any."""
+    return db.query(ScrapeLog).filter(
+        ScrapeLog.scrape_type == scrape_type,
+        ScrapeLog.source_id == source_id if source_id is not None else ScrapeLog.source_id.is_(None),
+        ScrapeLog.hashtag_id == hashtag_id if hashtag_id is not None else ScrapeLog.hashtag_id.is_(None),
+        ScrapeLog.status.in_(ACTIVE_JOB_STATUSES)
+    ).order_by(ScrapeLog.id.desc()).first()
+
+
+def submit_scrape_job(
+    db: Session,
+    scrape_type: str,
+    source_id: Optional[int] = None,
+    hashtag_id: Optional[int] = None
+) -> Tuple[ScrapeLog, bool]:
+    """
+    Queue a scrape job, or return the active job for the same target.
+    
+    Args:
+        db: Database session
+        scrape_type: SCRAPE_SOURCE, SCRAPE_HASHTAG or SCRAPE_FACEBOOK_TRENDS
+        source_id: Source to scrape (SCRAPE_SOURCE)
+        hashtag_id: Hashtag to scrape (SCRAPE_HASHTAG)
+    
+    Returns:
+        Tuple of (job, whether it was created by this call)
+    
+    Raises:
+        ValueError: If the target does not exist or is inactive
+    """
+    if scrape_type == SCRAPE_SOURCE:
+        source = db.get(Source, source_id)
+        if not source:
+            raise ValueError("Source not found")
+        if not source.is_active:
+            raise ValueError("Source is not active")
+    elif scrape_type == SCRAPE_HASHTAG:
+        hashtag = db.get(Hashtag, hashtag_id)
+        if not hashtag:
+            raise ValueError("Hashtag not found")
+        if not hashtag.is_active:
+            raise ValueError("Hashtag is not active")
+    elif scrape_type == SCRAPE_FACEBOOK_TRENDS:
+        if not facebook_trend_pages(db):
+            raise ValueError("No active Facebook Pages found. Add Pages using add_facebook_pages.py")
+    else:
+        raise ValueError(f"Unknown scrape type: {scrape_type}")
+    
+    expire_abandoned_jobs(db)
+    
+    with _submit_lock:
+        job = find_active_job(db, scrape_type, source_id, hashtag_id)
+        if job is not None:
+            return job, False
+        
+        job = ScrapeLog(
+            scrape_type=scrape_type,
+            source_id=source_id,
+            hashtag_id=hashtag_id,
+            status=JOB_QUEUED,
+            started_at=datetime.utcnow()
+        )
+        db.add(job)
+        db.commit()
+    
+    logger.info(f"Queued {scrape_type} scrape job {job.id}")
+    return job, True
+
+
+def _claim_job(db: Session, job_id: int) -> Optional[ScrapeLog]:
+    """Atomically move a queued job to running; None if another worker took it or it is gone."""
+    claimed = db.execute(
+        update(ScrapeLog).where(
+            ScrapeLog.id == job_id,
+            ScrapeLog.status == JOB_QUEUED
+        ).values(status=JOB_RUNNING, started_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    return db.get(ScrapeLog, job_id) if claimed else None
+
+
+def _scrape_facebook_trends(db: Session, params: Dict) -> Dict:
+    """Aggregate Facebook trends across the active Pages."""
+    from trend_aggregator import scrape_and_store_trends
+    
+    return scrape_and_store_trends(
+        db=db,
+        page_sources=facebook_trend_pages(db),
+        posts_per_page=params.get("posts_per_page", 10),
+        top_n=params.get("top_n", 50),
+        min_trend_score=params.get("min_trend_score", 10.0)
+    )
+
+
+def run_scrape_job(job_id: int, params: Optional[Dict] = None) -> Dict:
+    """
+    Run a queued scrape job and record its outcome in its scrape log.
+    
+    Scrapes that write their own log entry (sources) fill in the job's row
+    directly; for the others the result counts are copied into it.
+    
+    Args:
+        job_id: ScrapeLog ID returned by submit_scrape_job
+        params: Extra scrape parameters (Facebook trends: posts_per_page, top_n, min_trend_score)
+    
+    Returns:
+        The scrape result dictionary
+    """
+    db = SessionLocal()
+    try:
+        job = _claim_job(db, job_id)
+        if job is None:
+            logger.info(f"Scrape job {job_id} is no longer queued; skipping")
+            return {"error": "Job is not queued"}
+        
+        started_at = job.started_at
+        try:
+            if job.scrape_type == SCRAPE_SOURCE:
+                result = scrape_source(db, job.source_id, scrape_log_id=job.id)
+            elif job.scrape_type == SCRAPE_HASHTAG:
+                from hashtag_scraper import scrape_hashtag
+                result = scrape_hashtag(db, job.hashtag_id)
+            elif job.scrape_type == SCRAPE_FACEBOOK_TRENDS:
+                result = _scrape_facebook_trends(db, params or {})
+            else:
+                result = {"error": f"Unknown scrape type: {job.scrape_type}"}
+        except Exception as e:
+            logger.error(f"Error in scrape job {job_id}: {e}")
+            db.rollback()
+            result = {"error": str(e)}
+        
+        job = db.get(ScrapeLog, job_id, populate_existing=True)
+        if job is not None and job.status == JOB_RUNNING:
+            finished_at = datetime.utcnow()
+            job.status = "error" if "error" in result else "success"
+            job.error_message = result.get("error")
+            job.posts_fetched = result.get("posts_fetched", 0)
+            job.posts_processed = result.get("posts_processed", result.get("posts_saved", result.get("posts_stored", 0)))
+            job.stories_created = result.get("stories_created", 0)
+            job.completed_at = finished_at
+            job.duration_seconds = (finished_at - started_at).total_seconds()
+            db.commit()
+        
+        return result
+    except Exception as e:
+        logger.error(f"Error running scrape job {job_id}: {e}")
+        db.rollback()
+        return {"error": str(e)}
+    finally:
+        db.close()
+
+
+def dispatch_scrape_job(db: Session, job: ScrapeLog, params: Optional[Dict] = None) -> None:
+    """
+    Start a queued job on the configured backend (API scrape pool or Celery).
+    
+    If the job cannot be handed off (e.g. the Celery broker is down) it is
+    marked as failed instead of waiting for the timeout.
+    
+    Args:
+        db: Database session
+        job: Job returned by submit_scrape_job
+        params: Extra scrape parameters passed to run_scrape_job
+    """
+    try:
+        if settings.scrape_jobs_backend == "celery":
+            from celery_app import run_scrape_job_task
+            run_scrape_job_task.delay(job.id, params)
+        else:
+            from db_executor import submit_scrape
+            job.runner = PROCESS_RUNNER
+            db.commit()
+            submit_scrape(run_scrape_job, job.id, params)
+    except Exception as e:
+        logger.error(f"Could not start scrape job {job.id}: {e}")
+        job.status = "error"
+        job.error_message = f"Could not start job: {e}"
+        job.completed_at = datetime.utcnow()
+        db.commit()
+
+
+def job_to_dict(job: ScrapeLog) -> Dict:
+    """
+    Convert a scrape job to its API representation.
+    
+    Args:
+        job: Scrape log row
+    
+    Returns:
+        Dictionary with status, counts and timing
+    """
+    elapsed = None
+    if job.started_at:
+        end = job.completed_at or datetime.utcnow()
+        elapsed = round((end - job.started_at).total_seconds(), 1)
+    
+    return {
+        "job_id": job.id,
+        "scrape_type": job.scrape_type,
+        "source_id": job.source_id,
+        "hashtag_id": job.hashtag_id,
+        "status": job.status,
+        "done": job.status not in ACTIVE_JOB_STATUSES,
+        "posts_fetched": job.posts_fetched or 0,
+        "posts_processed": job.posts_processed or 0,
+        "stories_created": job.stories_created or 0,
+        "error": job.error_message,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "elapsed_seconds": elapsed,
+    }
@@ -1,29 +1,41 @@
 """Service layer for processing posts and creating stories."""
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from datetime import datetime, timedelta
-from typing import List, Optional
+from sqlalchemy import or_, func
+from sqlalchemy.engine import Row
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import base64
+import json
 import re
-from models import Source, RawPost, Story, ScrapeLog
+from models import Source, RawPost, Story, ScrapeLog, EngagementSnapshot
 from platforms import get_scraper
 from scoring import (
     calculate_engagement_velocity,
+    calculate_snapshot_velocity,
     calculate_credibility_score,
     calculate_topic_relevance_score,
     calculate_overall_score,
-    should_keep_post
+    should_keep_post,
+    ScoringEvaluator
 )
 from trend_aggregator import scrape_and_store_trends
+from scoring_profiles import get_active_evaluator
+from gazetteer import resolve_location_filter
+import rollups
+import hot_stories
+from snapshots import record_snapshot, refresh_post_metrics, load_recent_snapshot_series
+from config import settings
 from loguru import logger
 
 
-def scrape_source(db: Session, source_id: int) -> dict:
+def scrape_source(db: Session, source_id: int, scrape_log_id: Optional[int] = None) -> dict:
     """
     Scrape posts from a source and store them.
     
     Args:
         db: Database session
         source_id: ID of the source to scrape
+        scrape_log_id: Existing scrape log to record results in (a queued job, see scrape_jobs)
     
     Returns:
         Dictionary with scraping results
@@ -35,15 +47,19 @@ def scrape_source(db: Session, source_id: int) -> dict:
     if not source.is_active:
         return {"error": "Source is not active", "posts_fetched": 0}
     
-    # Create scrape log entry
-    scrape_start = datetime.utcnow()
-    scrape_log = ScrapeLog(
-        source_id=source.id,
-        status="running",
-        started_at=scrape_start
-    )
-    db.add(scrape_log)
-    db.flush()
+    # Create scrape log entry (or record into the job's)
+    scrape_log = db.get(ScrapeLog, scrape_log_id) if scrape_log_id is not None else None
+    if scrape_log is not None:
+        scrape_start = scrape_log.started_at or datetime.utcnow()
+    else:
+        scrape_start = datetime.utcnow()
+        scrape_log = ScrapeLog(
+            source_id=source.id,
+            status="running",
+            started_at=scrape_start
+        )
+        db.add(scrape_log)
+        db.flush()
     
     try:
         # Get appropriate scraper
@@ -55,18 +71,36 @@ def scrape_source(db: Session, source_id: int) -> dict:
         posts_fetched = 0
         posts_processed = 0
         stories_created = 0
+        observed_at = datetime.utcnow()
+        
+        # Look up posts we have already stored from this batch in one query
+        existing_posts = {
+            (post.platform, post.platform_post_id): post
+            for post in db.query(RawPost).filter(
+                RawPost.platform_post_id.in_([p['platform_post_id'] for p in raw_posts_data])
+            ).all()
+        } if raw_posts_data else {}
+        
+        posts_with_stories = {
+            raw_post_id for (raw_post_id,) in db.query(Story.raw_post_id).filter(
+                Story.raw_post_id.in_([post.id for post in existing_posts.values()])
+            ).all()
+        } if existing_posts else set()
+        
+        # Posts whose stories need (re)scoring: new posts, every re-seen post with a story
+        # (flat metrics must pull velocity down) and re-seen posts without one whose metrics changed
+        posts_to_score = []
         
         for post_data in raw_posts_data:
-            # Check if post already exists
-            existing = db.query(RawPost).filter(
-                and_(
-                    RawPost.platform == post_data['platform'],
-                    RawPost.platform_post_id == post_data['platform_post_id']
-                )
-            ).first()
+            key = (post_data['platform'], post_data['platform_post_id'])
+            existing = existing_posts.get(key)
             
             if existing:
-                continue  # Skip duplicates
+                # Re-seen post: snapshot the observation so velocity reflects recent growth (or none)
+                changed = refresh_post_metrics(db, existing, post_data, observed_at)
+                if changed or existing.id in posts_with_stories:
+                    posts_to_score.append(existing)
+                continue
             
             # Create raw post
             raw_post = RawPost(
@@ -89,16 +123,36 @@ def scrape_source(db: Session, source_id: int) -> dict:
             
             db.add(raw_post)
             db.flush()  # Get the ID
+            record_snapshot(db, raw_post, observed_at)
+            existing_posts[key] = raw_post
             
             posts_fetched += 1
-            
+            posts_to_score.append(raw_post)
+        
+        db.flush()
+        
+        # Score the whole batch with one compiled profile (hot-reloaded between batches)
+        evaluator = get_active_evaluator(db)
+        
+        # Load snapshot series and existing stories for the whole batch at once
+        post_ids = [raw_post.id for raw_post in posts_to_score]
+        snapshot_series = load_recent_snapshot_series(db, post_ids)
+        
+        for raw_post in posts_to_score:
             # Process and score the post
             try:
-                story = process_post_to_story(db, raw_post)
+                story = process_post_to_story(
+                    db,
+                    raw_post,
+                    snapshots=snapshot_series.get(raw_post.id),
+                    evaluator=evaluator
+                )
                 if story:
                     posts_processed += 1
+                    if raw_post.id in posts_with_stories:
+                        continue  # Rescored an existing story
                     # Use raw_post.is_kenyan for threshold check (story.is_kenyan is set from raw_post)
-                    if should_keep_post(story.score, story.engagement_velocity, raw_post.is_kenyan):
+                    if should_keep_post(story.score, story.engagement_velocity, raw_post.is_kenyan, evaluator):
                         stories_created += 1
                     else:
                         # Delete story if it doesn't meet threshold
@@ -129,7 +183,7 @@ def scrape_source(db: Session, source_id: int) -> dict:
             "stories_created": stories_created,
             "source": source.account_handle
         }
-        
+    
     except Exception as e:
         logger.error(f"Error scraping source {source.account_handle}: {e}")
         
@@ -152,26 +206,40 @@ def scrape_source(db: Session, source_id: int) -> dict:
         return {"error": str(e), "posts_fetched": 0}
 
 
-def process_post_to_story(db: Session, raw_post: RawPost) -> Optional[Story]:
+def process_post_to_story(
+    db: Session,
+    raw_post: RawPost,
+    snapshots: Optional[List[EngagementSnapshot]] = None,
+    evaluator: Optional[ScoringEvaluator] = None
+) -> Optional[Story]:
     """
     Process a raw post into a scored story.
     
     Args:
         db: Database session
         raw_post: Raw post to process
+        snapshots: Recent engagement snapshots for the post (ordered by ts);
+            with two or more, velocity is computed from their deltas
+        evaluator: Compiled scoring profile (defaults to the active profile)
     
     Returns:
         Story object if created, None otherwise
     """
     try:
+        if evaluator is None:
+            evaluator = get_active_evaluator(db)
+        
         # Calculate scores
-        engagement_velocity = calculate_engagement_velocity(
-            raw_post.likes,
-            raw_post.comments,
-            raw_post.shares,
-            raw_post.views,
-            raw_post.posted_at
-        )
+        # Prefer delta-based velocity; fall back to lifetime average for first sightings
+        engagement_velocity, engagement_acceleration = calculate_snapshot_velocity(snapshots or [])
+        if engagement_velocity is None:
+            engagement_velocity = calculate_engagement_velocity(
+                raw_post.likes,
+                raw_post.comments,
+                raw_post.shares,
+                raw_post.views,
+                raw_post.posted_at
+            )
         
         credibility_score = calculate_credibility_score(
             raw_post.author,
@@ -193,7 +261,8 @@ def process_post_to_story(db: Session, raw_post: RawPost) -> Optional[Story]:
             raw_post.shares,
             raw_post.views,
             is_kenyan=raw_post.is_kenyan,
-            location=raw_post.location
+            location=raw_post.location,
+            evaluator=evaluator
         )
         
         # For Facebook trends, use "High engagement velocity" as reason
@@ -256,10 +325,16 @@ def process_post_to_story(db: Session, raw_post: RawPost) -> Optional[Story]:
         existing_story = db.query(Story).filter(Story.raw_post_id == raw_post.id).first()
         if existing_story:
             # Update existing story
+            existing_story.likes = raw_post.likes
+            existing_story.comments = raw_post.comments
+            existing_story.shares = raw_post.shares
+            existing_story.views = raw_post.views
             existing_story.score = overall_score
             existing_story.engagement_velocity = engagement_velocity
+            existing_story.engagement_acceleration = engagement_acceleration
             existing_story.credibility_score = credibility_score
             existing_story.topic_relevance_score = topic_relevance_score
+            existing_story.scoring_profile = evaluator.label
             existing_story.headline = headline
             existing_story.reason_flagged = reason_flagged
             existing_story.topic = topic
@@ -279,8 +354,10 @@ def process_post_to_story(db: Session, raw_post: RawPost) -> Optional[Story]:
             views=raw_post.views,
             score=overall_score,
             engagement_velocity=engagement_velocity,
+            engagement_acceleration=engagement_acceleration,
             credibility_score=credibility_score,
             topic_relevance_score=topic_relevance_score,
+            scoring_profile=evaluator.label,
             headline=headline,
             reason_flagged=reason_flagged,
             location=raw_post.location,
@@ -291,15 +368,190 @@ def process_post_to_story(db: Session, raw_post: RawPost) -> Optional[Story]:
         db.add(story)
         db.flush()  # Flush to ensure story is persisted
         return story
-        
+    
     except Exception as e:
         logger.error(f"Error processing post {raw_post.id} to story: {e}")
         return None
 
 
-def get_trending_stories(
+def rescore_existing_stories(
     db: Session,
-    limit: int = 50,
+    raw_posts: List[RawPost],
+    evaluator: Optional[ScoringEvaluator] = None
+) -> int:
+    """
+    Rescore the stories of re-seen posts from their recent snapshots.
+    
+    Scrapers that only store raw posts (hashtags, Facebook trends) call this
+    after refresh_post_metrics so stories that stopped growing lose velocity.
+    Posts without a story are left to the story processing step.
+    
+    Args:
+        db: Database session
+        raw_posts: Re-seen raw posts (observations already recorded)
+        evaluator: Compiled scoring profile (defaults to the active profile)
+    
+    Returns:
+        Number of stories rescored
+    """
+    post_ids = [raw_post.id for raw_post in raw_posts if raw_post.id is not None]
+    if not post_ids:
+        return 0
+    
+    posts_with_stories = {
+        raw_post_id for (raw_post_id,) in db.query(Story.raw_post_id).filter(
+            Story.raw_post_id.in_(post_ids)
+        ).all()
+    }
+    posts = [raw_post for raw_post in raw_posts if raw_post.id in posts_with_stories]
+    if not posts:
+        return 0
+    
+    if evaluator is None:
+        evaluator = get_active_evaluator(db)
+    db.flush()
+    snapshot_series = load_recent_snapshot_series(db, [raw_post.id for raw_post in posts])
+    
+    rescored = 0
+    for raw_post in posts:
+        if process_post_to_story(db, raw_post, snapshots=snapshot_series.get(raw_post.id), evaluator=evaluator):
+            rescored += 1
+    return rescored
+
+
+# Columns story list responses need; content is truncated in SQL to the headline fallback length
+STORY_ROW_COLUMNS = (
+    Story.id,
+    Story.headline,
+    func.substr(Story.content, 1, 100).label("content_prefix"),
+    Story.author,
+    Story.platform,
+    Story.likes,
+    Story.comments,
+    Story.shares,
+    Story.engagement_velocity,
+    Story.reason_flagged,
+    Story.posted_at,
+    Story.credibility_score,
+    Story.url,
+    Story.topic,
+    Story.rank_key,  # Feed sort key, used for pagination cursors
+)
+
+
+def _feed_index(
+    is_kenyan: Optional[bool] = None,
+    platform: Optional[str] = None,
+    location_filter: Optional[tuple] = None
+) -> str:
+    """Pick the rank index whose equality prefix matches the feed filters."""
+    if location_filter:
+        return "idx_story_region_rank" if location_filter[0] == "region" else "idx_story_country_rank"
+    if is_kenyan is not None:
+        return "idx_story_kenyan_rank"
+    if platform:
+        return "idx_story_platform_rank"
+    return "idx_story_rank"
+
+
+def _order_by_rank(
+    query,
+    is_kenyan: Optional[bool] = None,
+    platform: Optional[str] = None,
+    location_filter: Optional[tuple] = None
+):
+    """
+    Apply feed ordering via the precomputed rank key.
+    
+    ``rank_key DESC`` is equivalent to (engagement_velocity, is_kenyan, score,
+    posted_at) DESC; ``id`` makes the order stable. On MySQL the matching rank
+    index is forced so the optimizer walks it in order instead of filesorting
+    the time window.
+    """
+    return query.with_hint(
+        Story, f"FORCE INDEX ({_feed_index(is_kenyan, platform, location_filter)})", dialect_name="mysql"
+    ).order_by(
+        Story.rank_key.desc(),
+        Story.id.desc()
+    )
+
+
+def encode_feed_cursor(rank_key: str, story_id: int) -> str:
+    """
+    Encode the sort key of the last story on a page as an opaque cursor.
+    
+    Args:
+        rank_key: Story.rank_key of the last row
+        story_id: Story.id of the last row
+    
+    Returns:
+        URL-safe cursor string
+    """
+    return base64.urlsafe_b64encode(json.dumps([rank_key, story_id]).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_feed_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by encode_feed_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank_key, story_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    
+    if not isinstance(rank_key, str) or not isinstance(story_id, int) or isinstance(story_id, bool):
+        raise ValueError("Invalid cursor")
+    return rank_key, story_id
+
+
+def encode_changes_token(updated_at: datetime, story_id: Optional[int] = None) -> str:
+    """
+    Encode a change feed position as an opaque token.
+    
+    Args:
+        updated_at: Changes up to this time have been delivered
+        story_id: With a page boundary inside one timestamp, the last delivered ID at updated_at
+    
+    Returns:
+        URL-safe token string
+    """
+    position = [updated_at.isoformat()] + ([story_id] if story_id is not None else [])
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_changes_token(token: str) -> Tuple[datetime, Optional[int]]:
+    """
+    Decode a token produced by encode_changes_token, or a plain ISO timestamp (UTC).
+    
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        updated_at = datetime.fromisoformat(position[0])
+        story_id = position[1] if len(position) > 1 else None
+        if story_id is not None and (not isinstance(story_id, int) or isinstance(story_id, bool)):
+            raise ValueError
+        return updated_at, story_id
+    except Exception:
+        pass
+    
+    try:
+        timestamp = datetime.fromisoformat(token.strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError("Invalid since token")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp, None
+
+
+def apply_feed_filters(
+    query,
     min_score: Optional[float] = None,
     platform: Optional[str] = None,
     hours_back: int = 24,
@@ -307,21 +559,20 @@ def get_trending_stories(
     location: Optional[str] = None,
     topic: Optional[str] = None,
     min_velocity: Optional[float] = None
-) -> List[Story]:
+):
     """
-    Get trending stories from the database.
+    Restrict a query over stories to the trending feed's filter set.
     
     Args:
-        db: Database session
-        limit: Maximum number of stories to return
+        query: Query selecting from stories
         min_score: Minimum score threshold
         platform: Filter by platform
-        hours_back: Only get stories from last N hours
+        hours_back: Only include stories from last N hours
     
     Returns:
-        List of Story objects
+        Tuple of (filtered query, resolved location filter or None)
     """
-    query = db.query(Story).filter(Story.is_active == True)
+    query = query.filter(Story.is_active == True)
     
     # Filter by time
     time_threshold = datetime.utcnow() - timedelta(hours=hours_back)
@@ -343,46 +594,391 @@ def get_trending_stories(
     if is_kenyan is not None:
         query = query.filter(Story.is_kenyan == is_kenyan)
     
-    # Filter by location (supports partial matches for "Africa", "Kenya", etc.)
-    if location:
-        # Case-insensitive location matching
-        from sqlalchemy import func, or_
-        location_lower = location.lower()
-        
-        # For "Africa" filter, match various African locations
-        if location_lower == "africa":
-            # Match stories with African locations or African countries
-            # Also include Kenyan content (is_kenyan=True) as part of Africa
-            african_locations = ['africa', 'kenya', 'nigeria', 'south africa', 'ghana', 
-                               'tanzania', 'uganda', 'nairobi', 'mombasa', 'lagos', 
-                               'johannesburg', 'cairo', 'accra', 'dar es salaam', 'kampala',
-                               'kisumu', 'nakuru', 'eldoret']
-            conditions = [
-                func.lower(Story.location).contains(loc) 
-                for loc in african_locations
-            ]
-            # Also include Kenyan stories even if location is not set
-            conditions.append(Story.is_kenyan == True)
-            query = query.filter(or_(*conditions))
+    # Filter by location: gazetteer names become equality lookups on normalized columns
+    location_filter = resolve_location_filter(location) if location else None
+    if location_filter:
+        column, value, is_city = location_filter
+        if column == "region":
+            # "Africa" includes Kenyan content even without a location (region set at write time)
+            query = query.filter(Story.region == value)
         else:
-            # Specific location match
-            query = query.filter(
-                func.lower(Story.location).contains(location_lower)
-            )
+            query = query.filter(Story.country_code == value)
+            if is_city:
+                # Narrow the indexed country range to the city itself
+                query = query.filter(func.lower(Story.location).contains(location.strip().lower()))
+    elif location:
+        # Unknown place name: fall back to a case-insensitive partial match
+        query = query.filter(
+            func.lower(Story.location).contains(location.lower())
+        )
     
     # Filter by topic
     if topic:
         query = query.filter(Story.topic == topic)
     
-    # Order by score descending (prioritize trending content)
-    # Prioritize high engagement velocity (trending content)
-    # Then prioritize Kenyan content
-    # Then by overall score
-    query = query.order_by(
-        Story.engagement_velocity.desc(),  # High engagement velocity first (trending)
-        Story.is_kenyan.desc(),  # Kenyan second
-        Story.score.desc(),  # Then by overall score
-        Story.posted_at.desc()  # Most recent last (but still important)
+    return query, location_filter
+
+
+def build_trending_query(
+    db: Session,
+    min_score: Optional[float] = None,
+    platform: Optional[str] = None,
+    hours_back: int = 24,
+    is_kenyan: Optional[bool] = None,
+    location: Optional[str] = None,
+    topic: Optional[str] = None,
+    min_velocity: Optional[float] = None,
+    after: Optional[Tuple[str, int]] = None
+):
+    """
+    Build the (unlimited) trending stories query.
+    
+    Args:
+        db: Database session
+        min_score: Minimum score threshold
+        platform: Filter by platform
+        hours_back: Only get stories from last N hours
+        after: (rank_key, id) of the last story on the previous page (keyset pagination)
+    
+    Returns:
+        Query of Story objects in feed order
+    """
+    query, location_filter = apply_feed_filters(
+        db.query(Story),
+        min_score=min_score,
+        platform=platform,
+        hours_back=hours_back,
+        is_kenyan=is_kenyan,
+        location=location,
+        topic=topic,
+        min_velocity=min_velocity
+    )
+    
+    # Continue after the previous page. MySQL does not use row constructor comparisons
+    # for index ranges, so spell out (rank_key, id) < (k, id): the leading rank_key <= k
+    # is a range seek on the rank index, so deep pages cost the same as the first
+    if after:
+        after_rank_key, after_id = after
+        query = query.filter(
+            Story.rank_key <= after_rank_key,
+            or_(Story.rank_key < after_rank_key, Story.id < after_id)
+        )
+    
+    # Order by engagement velocity, then Kenyan content, score and recency
+    return _order_by_rank(query, is_kenyan, platform, location_filter)
+
+
+def get_trending_stories(
+    db: Session,
+    limit: int = 50,
+    min_score: Optional[float] = None,
+    platform: Optional[str] = None,
+    hours_back: int = 24,
+    is_kenyan: Optional[bool] = None,
+    location: Optional[str] = None,
+    topic: Optional[str] = None,
+    min_velocity: Optional[float] = None
+) -> List[Story]:
+    """
+    Get trending stories from the database.
+    
+    Args:
+        db: Database session
+        limit: Maximum number of stories to return
+        min_score: Minimum score threshold
+        platform: Filter by platform
+        hours_back: Only get stories from last N hours
+    
+    Returns:
+        List of Story objects
+    """
+    query = build_trending_query(
+        db,
+        min_score=min_score,
+        platform=platform,
+        hours_back=hours_back,
+        is_kenyan=is_kenyan,
+        location=location,
+        topic=topic,
+        min_velocity=min_velocity
+    )
+    
+    return query.limit(limit).all()
+
+
+def get_trending_story_rows(
+    db: Session,
+    limit: int = 50,
+    min_score: Optional[float] = None,
+    platform: Optional[str] = None,
+    hours_back: int = 24,
+    is_kenyan: Optional[bool] = None,
+    location: Optional[str] = None,
+    topic: Optional[str] = None,
+    min_velocity: Optional[float] = None,
+    after: Optional[Tuple[str, int]] = None
+) -> List[Row]:
+    """
+    Get trending stories as lightweight rows of STORY_ROW_COLUMNS.
+    
+    Same filters and order as get_trending_stories, but only the response
+    columns are selected (content truncated in SQL) and no ORM entities are
+    built or tracked in the identity map.
+    
+    Args:
+        db: Database session
+        limit: Maximum number of stories to return
+        min_score: Minimum score threshold
+        platform: Filter by platform
+        hours_back: Only get stories from last N hours
+        after: (rank_key, id) of the last story on the previous page
+    
+    Returns:
+        List of rows with STORY_ROW_COLUMNS attributes
+    """
+    query = build_trending_query(
+        db,
+        min_score=min_score,
+        platform=platform,
+        hours_back=hours_back,
+        is_kenyan=is_kenyan,
+        location=location,
+        topic=topic,
+        min_velocity=min_velocity,
+        after=after
     )
     
+    return query.with_entities(*STORY_ROW_COLUMNS).limit(limit).all()
+
+
+# Facet name -> grouped expression; values match the insights rollup dimensions
+FEED_FACETS = {
+    rollups.DIMENSION_PLATFORM: func.coalesce(Story.platform, "Unknown"),
+    rollups.DIMENSION_TOPIC: func.coalesce(Story.topic, "General"),
+    rollups.DIMENSION_VELOCITY: rollups.velocity_bucket_expression(Story.engagement_velocity),
+}
+
+
+def get_feed_facets(
+    db: Session,
+    facets: List[str],
+    min_score: Optional[float] = None,
+    platform: Optional[str] = None,
+    hours_back: int = 24,
+    is_kenyan: Optional[bool] = None,
+    location: Optional[str] = None,
+    topic: Optional[str] = None,
+    min_velocity: Optional[float] = None
+) -> Dict[str, Dict[str, int]]:
+    """
+    Count stories per facet value for the trending feed's filter set.
+    
+    Unfiltered feeds are summed from the hourly insights rollups (window
+    rounded down to the hour, like /api/insights); filtered feeds run one
+    grouped COUNT per facet over the same index-served window as the feed,
+    without loading story rows.
+    
+    Args:
+        db: Database session
+        facets: Names from FEED_FACETS
+        min_score: Minimum score threshold
+        platform: Filter by platform
+        hours_back: Only count stories from last N hours
+    
+    Returns:
+        Dictionary mapping facet name to {value: count}, largest counts first
+    """
+    unfiltered = not any((min_score, platform, is_kenyan is not None, location, topic, min_velocity))
+    since = datetime.utcnow() - timedelta(hours=hours_back)
+    
+    result = {}
+    for facet in facets:
+        if unfiltered:
+            result[facet] = dict(rollups.query_rollups(db, since, facet))
+            continue
+        
+        value = FEED_FACETS[facet].label("value")
+        count = func.count(Story.id)
+        query, _ = apply_feed_filters(
+            db.query(value, count),
+            min_score=min_score,
+            platform=platform,
+            hours_back=hours_back,
+            is_kenyan=is_kenyan,
+            location=location,
+            topic=topic,
+            min_velocity=min_velocity
+        )
+        rows = query.group_by(value).order_by(count.desc(), value).all()
+        result[facet] = {row_value: int(row_count) for row_value, row_count in rows}
+    
+    return result
+
+
+def get_hot_story_rows(
+    db: Session,
+    limit: int = 30,
+    is_kenyan: Optional[bool] = None,
+    hours_back: int = 6
+) -> List[Row]:
+    """
+    Get hot stories as lightweight rows of STORY_ROW_COLUMNS (see get_trending_story_rows).
+    
+    Reads the materialized hot set, so cost depends on the number of hot
+    stories rather than on the stories table.
+    
+    Args:
+        db: Database session
+        limit: Maximum number of stories to return
+        is_kenyan: Filter Kenyan stories only
+        hours_back: Only get stories from last N hours
+    
+    Returns:
+        List of rows with STORY_ROW_COLUMNS attributes
+    """
+    query = hot_stories.join_hot_set(db.query(*STORY_ROW_COLUMNS), is_kenyan, hours_back)
     return query.limit(limit).all()
+
+
+def get_story_rows_after(
+    db: Session,
+    after_id: int,
+    limit: int = 100,
+    is_kenyan: Optional[bool] = None,
+    platform: Optional[str] = None,
+    min_velocity: Optional[float] = None
+) -> List[Row]:
+    """
+    Get active stories created after a story ID, oldest first (live stream catch-up).
+    
+    Args:
+        db: Database session
+        after_id: Last story ID the client received
+        limit: Maximum number of stories to return
+        is_kenyan: Filter Kenyan stories only
+        platform: Filter by platform
+        min_velocity: Minimum engagement velocity
+    
+    Returns:
+        List of rows with STORY_ROW_COLUMNS attributes
+    """
+    query = db.query(*STORY_ROW_COLUMNS).filter(Story.is_active == True, Story.id > after_id)
+    
+    if is_kenyan is not None:
+        query = query.filter(Story.is_kenyan == is_kenyan)
+    if platform:
+        query = query.filter(Story.platform == platform)
+    if min_velocity is not None:
+        query = query.filter(Story.engagement_velocity >= min_velocity)
+    
+    return query.order_by(Story.id).limit(limit).all()
+
+
+def get_story_rows_by_ids(db: Session, story_ids: List[int]) -> List[Row]:
+    """
+    Get stories by ID in one IN query, in the order the IDs were given.
+    
+    Args:
+        db: Database session
+        story_ids: Story IDs (unknown IDs are skipped)
+    
+    Returns:
+        List of rows with STORY_ROW_COLUMNS attributes
+    """
+    if not story_ids:
+        return []
+    
+    rows = {row.id: row for row in db.query(*STORY_ROW_COLUMNS).filter(Story.id.in_(story_ids)).all()}
+    return [rows[story_id] for story_id in story_ids if story_id in rows]
+
+
+# Change feed rows: feed columns plus what a client needs to apply the change
+STORY_CHANGE_COLUMNS = STORY_ROW_COLUMNS + (Story.is_active, Story.updated_at)
+
+
+def build_changes_query(
+    db: Session,
+    since: Tuple[datetime, Optional[int]],
+    cutoff: datetime,
+    is_kenyan: Optional[bool] = None,
+    platform: Optional[str] = None,
+    topic: Optional[str] = None
+):
+    """
+    Build the change feed query: stories changed after a position and up to a cutoff, in change order.
+    
+    Args:
+        db: Database session
+        since: (updated_at, id) position; id None means strictly after the time
+        cutoff: Latest updated_at to include
+        is_kenyan: Filter Kenyan stories only
+        platform: Filter by platform
+        topic: Filter by topic
+    
+    Returns:
+        Query of STORY_CHANGE_COLUMNS ordered by updated_at, id
+    """
+    since_time, since_id = since
+    query = db.query(*STORY_CHANGE_COLUMNS).filter(Story.updated_at <= cutoff)
+    if since_id is None:
+        query = query.filter(Story.updated_at > since_time)
+    else:
+        # (updated_at, id) > (t, id) spelled out so MySQL range-scans idx_story_updated
+        query = query.filter(
+            Story.updated_at >= since_time,
+            or_(Story.updated_at > since_time, Story.id > since_id)
+        )
+    
+    if is_kenyan is not None:
+        query = query.filter(Story.is_kenyan == is_kenyan)
+    if platform:
+        query = query.filter(Story.platform == platform)
+    if topic:
+        query = query.filter(Story.topic == topic)
+    
+    return query.order_by(Story.updated_at, Story.id)
+
+
+def get_story_changes(
+    db: Session,
+    since: Optional[Tuple[datetime, Optional[int]]],
+    limit: int = 200,
+    is_kenyan: Optional[bool] = None,
+    platform: Optional[str] = None,
+    topic: Optional[str] = None
+) -> Tuple[List[Row], str, bool]:
+    """
+    Get stories created, updated or deactivated since a change feed position.
+    
+    Only changes older than story_changes_settle_seconds are served, so a
+    transaction that commits after a client synced cannot slip in behind the
+    client's token. Stories written through the ORM are stamped with the
+    commit time (see story_changes.py), so the settle window only has to
+    cover the instant between stamping and commit plus clock skew, however
+    long the writing transaction ran. Stories never written since updated_at
+    was introduced have no updated_at and are not reported.
+    
+    Args:
+        db: Database session
+        since: Position from decode_changes_token (None starts a sync at the current position)
+        limit: Maximum number of stories to return
+        is_kenyan: Filter Kenyan stories only
+        platform: Filter by platform
+        topic: Filter by topic
+    
+    Returns:
+        Tuple of (rows of STORY_CHANGE_COLUMNS in change order, token for the next call, whether more changes are ready)
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.story_changes_settle_seconds)
+    if since is None:
+        return [], encode_changes_token(cutoff), False
+    
+    since_time = since[0]
+    query = build_changes_query(db, since, cutoff, is_kenyan=is_kenyan, platform=platform, topic=topic)
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_changes_token(rows[-1].updated_at, rows[-1].id), True
+    
+    # Everything up to the cutoff has been delivered
+    return rows, encode_changes_token(max(since_time, cutoff)), False
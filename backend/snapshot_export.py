@@ -0,0 +1,171 @@
+"""Static JSON snapshots of the dashboard feeds and insights for public screens.
+
+After each scheduler cycle the main feeds (every precomputed feed, the hot
+lists) and the insights are written to ``snapshot_export_dir`` as plain
+files, so newsroom TVs and embeds can be served by nginx or any static file
+server without touching Python or the database.
+
+Layout::
+
+    manifest.json                   name -> current file, hash, size, time
+    feed-kenya.3f9c2a41d07b5e18.json
+    feed-kenya.3f9c2a41d07b5e18.json.gz
+    ...
+
+Snapshot files are named by a hash of their content, so they never change
+once written and can be cached forever (an unchanged snapshot keeps its file
+and is not rewritten). Clients read the short-lived manifest.json to find
+the current files. Every file is written to a temporary name in the same
+directory and renamed into place, so readers never see a partial file.
+Files referenced by neither the current nor the previous manifest are
+deleted.
+
+The gzip variant next to each snapshot is for nginx ``gzip_static on``.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, Optional, Set
+from sqlalchemy.orm import Session
+from precomputed_feeds import FEEDS, load_feed
+from services import get_hot_story_rows
+from payloads import story_row_to_dict, story_event_to_dict, build_insights
+from response_cache import encode_json
+from compression import GZIP, compress
+from config import settings
+from loguru import logger
+
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 16  # Hex digits of the SHA-256 content hash kept in file names
+
+_SNAPSHOT_FILE = re.compile(r"^[\w-]+\.[0-9a-f]{%d}\.json(\.gz)?$" % HASH_LENGTH)
+
+
+def _feed_builder(name: str) -> Callable[[Session], object]:
+    """Snapshot builder for a precomputed feed."""
+    def build(db: Session):
+        stories, _ = load_feed(db, name)
+        return [story_event_to_dict(story) for story in stories]
+    return build
+
+
+def snapshot_builders() -> Dict[str, Callable[[Session], object]]:
+    """
+    Snapshots to export, by name.
+    
+    Returns:
+        Dictionary of snapshot name -> function building its JSON data from a session
+    """
+    builders = {f"feed-{name}": _feed_builder(name) for name in FEEDS}
+    builders["hot"] = lambda db: [story_row_to_dict(row) for row in get_hot_story_rows(db, limit=30)]
+    builders["hot-kenya"] = lambda db: [
+        story_row_to_dict(row) for row in get_hot_story_rows(db, limit=30, is_kenyan=True)
+    ]
+    builders["insights"] = lambda db: build_insights(db, 24)
+    return builders
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write a file under a temporary name in the same directory, then rename it into place."""
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)  # mkstemp creates 0600; the static server must read it
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _read_manifest(directory: str) -> Dict:
+    """Current manifest, or an empty one if missing or unreadable."""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), "rb") as f:
+            return json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def _manifest_files(manifest: Dict) -> Set[str]:
+    """Snapshot file names (and their gzip variants) a manifest references."""
+    files = set()
+    for entry in manifest.get("snapshots", {}).values():
+        files.add(entry["file"])
+        files.add(entry["file"] + ".gz")
+    return files
+
+
+def export_snapshots(db: Session, current_time: Optional[datetime] = None, directory: Optional[str] = None) -> int:
+    """
+    Write the current snapshots and manifest.
+    
+    Args:
+        db: Database session
+        current_time: Reference time recorded in the manifest (defaults to now, UTC)
+        directory: Target directory (defaults to snapshot_export_dir; nothing is written if unset)
+    
+    Returns:
+        Number of snapshot files written (unchanged snapshots are not rewritten)
+    """
+    directory = directory or settings.snapshot_export_dir
+    if not directory:
+        return 0
+    
+    now = current_time or datetime.utcnow()
+    os.makedirs(directory, exist_ok=True)
+    previous = _read_manifest(directory)
+    
+    snapshots = {}
+    written = 0
+    for name, build in snapshot_builders().items():
+        try:
+            body = encode_json(build(db))
+        except Exception as e:
+            # Keep serving the last good snapshot of this name
+            logger.error(f"Error building snapshot {name}: {e}")
+            if name in previous.get("snapshots", {}):
+                snapshots[name] = previous["snapshots"][name]
+            continue
+        
+        digest = hashlib.sha256(body).hexdigest()
+        file_name = f"{name}.{digest[:HASH_LENGTH]}.json"
+        path = os.path.join(directory, file_name)
+        if not os.path.exists(path):
+            _write_atomic(path + ".gz", compress(body, GZIP, cached=True))
+            _write_atomic(path, body)
+            written += 1
+        
+        previous_entry = previous.get("snapshots", {}).get(name, {})
+        snapshots[name] = {
+            "file": file_name,
+            "sha256": digest,
+            "bytes": len(body),
+            # When this content was first exported (unchanged snapshots keep their time)
+            "generated_at": previous_entry["generated_at"] if previous_entry.get("file") == file_name else now.isoformat(),
+        }
+    
+    manifest = {"generated_at": now.isoformat(), "snapshots": snapshots}
+    _write_atomic(os.path.join(directory, MANIFEST_NAME), encode_json(manifest))
+    
+    # Clients may still hold the previous manifest; keep its files one more cycle
+    keep = _manifest_files(manifest) | _manifest_files(previous)
+    for file_name in os.listdir(directory):
+        if _SNAPSHOT_FILE.match(file_name) and file_name not in keep:
+            try:
+                os.unlink(os.path.join(directory, file_name))
+            except OSError as e:
+                logger.warning(f"Could not delete old snapshot {file_name}: {e}")
+    
+    if written:
+        logger.info(f"Exported {written} changed snapshot(s) to {directory}")
+    return written
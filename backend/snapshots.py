@@ -0,0 +1,166 @@
+"""Engagement snapshot time series for raw posts.
+
+Every time a post is seen we append a row to ``engagement_snapshots`` (also
+when its metrics did not change: a flat observation is what brings the
+velocity of a post that stopped growing down to zero). Velocity and acceleration are then computed from the
+deltas between recent snapshots instead of lifetime totals divided by age.
+"""
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from models import RawPost, EngagementSnapshot
+from config import settings
+from loguru import logger
+
+METRIC_FIELDS = ("likes", "comments", "shares", "views")
+
+# Keep IN (...) lists comfortably below driver/packet limits
+_BATCH_SIZE = 500
+
+
+def record_snapshot(db: Session, raw_post: RawPost, ts: Optional[datetime] = None) -> EngagementSnapshot:
+    """
+    Append a snapshot of the raw post's current metrics.
+    
+    Args:
+        db: Database session
+        raw_post: Raw post (may still be pending)
+        ts: Observation time (defaults to now, UTC)
+    
+    Returns:
+        The new EngagementSnapshot
+    """
+    snapshot = EngagementSnapshot(
+        raw_post=raw_post,
+        ts=ts or datetime.utcnow(),
+        likes=raw_post.likes or 0,
+        comments=raw_post.comments or 0,
+        shares=raw_post.shares or 0,
+        views=raw_post.views or 0
+    )
+    db.add(snapshot)
+    return snapshot
+
+
+def refresh_post_metrics(db: Session, raw_post: RawPost, post_data: Dict, ts: Optional[datetime] = None) -> bool:
+    """
+    Update a re-seen post's metrics and snapshot the observation.
+    
+    A snapshot is written even when nothing changed, so the delta over the
+    elapsed time drives velocity towards zero for posts that have gone flat.
+    
+    Args:
+        db: Database session
+        raw_post: Existing raw post
+        post_data: Freshly scraped post dictionary
+        ts: Observation time (defaults to now, UTC)
+    
+    Returns:
+        True if the metrics changed, False otherwise
+    """
+    changed = False
+    for field in METRIC_FIELDS:
+        new_value = post_data.get(field)
+        if new_value is None:
+            continue
+        if (getattr(raw_post, field) or 0) != new_value:
+            setattr(raw_post, field, new_value)
+            changed = True
+    
+    record_snapshot(db, raw_post, ts)
+    
+    return changed
+
+
+def load_snapshot_series(
+    db: Session,
+    raw_post_ids: Iterable[int],
+    since: Optional[datetime] = None
+) -> Dict[int, List[EngagementSnapshot]]:
+    """
+    Load snapshot series for many posts with one query per batch of IDs.
+    
+    Args:
+        db: Database session
+        raw_post_ids: Raw post IDs to load
+        since: Only load snapshots observed at or after this time
+    
+    Returns:
+        Dictionary mapping raw_post_id to its snapshots ordered by ts ascending
+        (posts without snapshots map to an empty list)
+    """
+    ids = list(dict.fromkeys(raw_post_ids))
+    series: Dict[int, List[EngagementSnapshot]] = {post_id: [] for post_id in ids}
+    
+    for start in range(0, len(ids), _BATCH_SIZE):
+        batch = ids[start:start + _BATCH_SIZE]
+        query = db.query(EngagementSnapshot).filter(EngagementSnapshot.raw_post_id.in_(batch))
+        if since is not None:
+            query = query.filter(EngagementSnapshot.ts >= since)
+        
+        for snapshot in query.order_by(EngagementSnapshot.raw_post_id, EngagementSnapshot.ts):
+            series[snapshot.raw_post_id].append(snapshot)
+    
+    return series
+
+
+def load_recent_snapshot_series(db: Session, raw_post_ids: Iterable[int]) -> Dict[int, List[EngagementSnapshot]]:
+    """Load snapshot series limited to the configured velocity window."""
+    since = datetime.utcnow() - timedelta(hours=settings.snapshot_velocity_window_hours)
+    return load_snapshot_series(db, raw_post_ids, since=since)
+
+
+def prune_snapshots(db: Session, current_time: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Apply the snapshot retention policy.
+    
+    - Younger than ``snapshot_full_resolution_hours``: kept as-is
+    - Up to ``snapshot_retention_days``: downsampled to the last snapshot per post per hour
+    - Older: deleted
+    
+    Args:
+        db: Database session
+        current_time: Reference time (defaults to now, UTC)
+    
+    Returns:
+        Dictionary with counts of deleted and downsampled snapshots
+    """
+    now = current_time or datetime.utcnow()
+    full_resolution_cutoff = now - timedelta(hours=settings.snapshot_full_resolution_hours)
+    retention_cutoff = now - timedelta(days=settings.snapshot_retention_days)
+    
+    deleted = db.query(EngagementSnapshot).filter(
+        EngagementSnapshot.ts < retention_cutoff
+    ).delete(synchronize_session=False)
+    
+    # Downsample the middle band: keep the latest snapshot in each (post, hour) bucket
+    rows = db.query(
+        EngagementSnapshot.id,
+        EngagementSnapshot.raw_post_id,
+        EngagementSnapshot.ts
+    ).filter(
+        EngagementSnapshot.ts >= retention_cutoff,
+        EngagementSnapshot.ts < full_resolution_cutoff
+    ).order_by(EngagementSnapshot.raw_post_id, EngagementSnapshot.ts.desc()).all()
+    
+    seen_buckets = set()
+    redundant_ids = []
+    for snapshot_id, raw_post_id, ts in rows:
+        bucket = (raw_post_id, ts.replace(minute=0, second=0, microsecond=0))
+        if bucket in seen_buckets:
+            redundant_ids.append(snapshot_id)
+        else:
+            seen_buckets.add(bucket)
+    
+    for start in range(0, len(redundant_ids), _BATCH_SIZE):
+        batch = redundant_ids[start:start + _BATCH_SIZE]
+        db.query(EngagementSnapshot).filter(
+            EngagementSnapshot.id.in_(batch)
+        ).delete(synchronize_session=False)
+    
+    db.commit()
+    
+    if deleted or redundant_ids:
+        logger.info(f"Pruned engagement snapshots: {deleted} expired, {len(redundant_ids)} downsampled")
+    
+    return {"deleted": deleted, "downsampled": len(redundant_ids)}
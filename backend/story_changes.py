@@ -0,0 +1,64 @@
+"""Stamp stories' updated_at with their commit time for the change feed.
+
+/api/stories/changes hands out positions on (updated_at, id) and only serves
+changes older than ``story_changes_settle_seconds``. If updated_at were the
+flush time, a scrape transaction that flushed a story and committed it more
+than that window later would land behind positions clients already synced
+past, and the change would never be delivered.
+
+Stories inserted or modified by a flush are remembered in ``session.info``;
+just before the transaction commits they are re-stamped with the current
+time in one UPDATE per chunk of ids. Stories flushed by commit() itself are
+stamped by the column's onupdate at that moment. Either way updated_at is at
+most milliseconds before the commit, so the settle window only has to cover
+that and clock skew between hosts, however long the transaction ran.
+
+Bulk ``query.update()`` statements are stamped by the column onupdate when
+they execute; they are short maintenance transactions (expiry, backfills).
+"""
+from datetime import datetime
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from models import Story
+
+# session.info key for ids of stories written in the current transaction
+_WRITTEN_KEY = "story_changes_written"
+_CHUNK_SIZE = 500  # Ids per re-stamping UPDATE
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_stories(session: Session, flush_context) -> None:
+    """Remember stories this flush inserted or modified; forget stories it deleted."""
+    written = session.info.get(_WRITTEN_KEY)
+    if written:
+        for obj in session.deleted:
+            if isinstance(obj, Story):
+                written.discard(obj.id)
+    
+    for obj in session.new:
+        if isinstance(obj, Story):
+            session.info.setdefault(_WRITTEN_KEY, set()).add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Story) and session.is_modified(obj, include_collections=False):
+            session.info.setdefault(_WRITTEN_KEY, set()).add(obj.id)
+
+
+@event.listens_for(Session, "before_commit")
+def _stamp_commit_time(session: Session) -> None:
+    """Re-stamp stories written earlier in the transaction with the commit time."""
+    written = session.info.pop(_WRITTEN_KEY, None)
+    if not written:
+        return
+    
+    now = datetime.utcnow()
+    story_ids = sorted(written)
+    connection = session.connection()
+    for start in range(0, len(story_ids), _CHUNK_SIZE):
+        chunk = story_ids[start:start + _CHUNK_SIZE]
+        connection.execute(update(Story.__table__).where(Story.__table__.c.id.in_(chunk)).values(updated_at=now))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_stories(session: Session) -> None:
+    """Rolled-back writes never became visible; nothing to stamp."""
+    session.info.pop(_WRITTEN_KEY, None)
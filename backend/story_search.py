@@ -0,0 +1,244 @@
+"""Full-text search over story headlines and content.
+
+Substring filters (``LIKE '%q%'``) scan every Story.content TEXT value, so
+search goes through an inverted index instead:
+
+- MySQL: the ``idx_story_fulltext`` FULLTEXT index on (headline, content),
+  queried with MATCH ... AGAINST in boolean mode (every term required, the
+  last one as a prefix so partially typed words match). InnoDB does not
+  index stopwords or words shorter than ``innodb_ft_min_token_size``, so
+  those terms are sent as optional rather than required ("ruto in nairobi"
+  finds stories mentioning Ruto and Nairobi).
+- SQLite: an external-content FTS5 table (``stories_fts``) kept in sync by
+  triggers, created and filled on first use and ranked with bm25, headline
+  matches weighted above content matches.
+- Other dialects: per-term case-insensitive substring match without ranking
+  (logged once; fine for small development databases only).
+
+Results use the same filters as the story feeds (active, time window,
+score, platform, Kenyan, topic) and are ordered by text relevance weighted
+by story score, by recency, or by score.
+"""
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import Float, Integer, and_, func, literal, or_, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from models import Story
+from services import STORY_ROW_COLUMNS
+from loguru import logger
+
+SEARCH_SORTS = ("relevance", "recent", "score")
+MAX_SEARCH_TERMS = 8  # Further terms are ignored (each one narrows the match set anyway)
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# InnoDB's default full-text stopword list (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD)
+INNODB_STOPWORDS = frozenset("""
+a about an are as at be by com de en for from how i in is it la of on or that the this to was what when
+where who will with und www
+""".split())
+DEFAULT_FT_MIN_TOKEN_SIZE = 3  # innodb_ft_min_token_size default, used if the server cannot be asked
+
+# External-content FTS5 index over stories; triggers mirror every write
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5("
+    "headline, content, content='stories', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS stories_fts_insert AFTER INSERT ON stories BEGIN "
+    "INSERT INTO stories_fts(rowid, headline, content) VALUES (new.id, new.headline, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS stories_fts_delete AFTER DELETE ON stories BEGIN "
+    "INSERT INTO stories_fts(stories_fts, rowid, headline, content) VALUES ('delete', old.id, old.headline, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS stories_fts_update AFTER UPDATE OF headline, content ON stories BEGIN "
+    "INSERT INTO stories_fts(stories_fts, rowid, headline, content) VALUES ('delete', old.id, old.headline, old.content); "
+    "INSERT INTO stories_fts(rowid, headline, content) VALUES (new.id, new.headline, new.content); END",
+)
+SQLITE_HEADLINE_WEIGHT = 5.0  # bm25 column weight of headline relative to content
+
+_sqlite_index_ready = False
+_sqlite_index_lock = threading.Lock()
+_substring_fallback_logged = False
+_mysql_min_token_size: Optional[int] = None
+
+
+def search_terms(q: str) -> List[str]:
+    """
+    Split a search string into index terms (words; operators and punctuation dropped).
+    
+    Args:
+        q: User search string
+    
+    Returns:
+        Up to MAX_SEARCH_TERMS lowercase terms
+    """
+    return [term.lower() for term in _TERM_PATTERN.findall(q or "")][:MAX_SEARCH_TERMS]
+
+
+def ensure_sqlite_search_index(db: Session) -> None:
+    """
+    Create the SQLite FTS5 index and its triggers if missing, indexing existing stories.
+    
+    Args:
+        db: Database session (committed if the index is created)
+    """
+    global _sqlite_index_ready
+    if _sqlite_index_ready:
+        return
+    
+    with _sqlite_index_lock:
+        if _sqlite_index_ready:
+            return
+        
+        exists = db.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stories_fts'"
+        )).first() is not None
+        for statement in SQLITE_FTS_DDL:
+            db.execute(text(statement))
+        if not exists:
+            db.execute(text("INSERT INTO stories_fts(stories_fts) VALUES ('rebuild')"))
+            logger.info("Built SQLite full-text index for stories")
+        db.commit()
+        _sqlite_index_ready = True
+
+
+def mysql_min_token_size(db: Session) -> int:
+    """Shortest word InnoDB full-text indexes (innodb_ft_min_token_size), read once per process."""
+    global _mysql_min_token_size
+    if _mysql_min_token_size is None:
+        try:
+            _mysql_min_token_size = int(db.execute(text("SELECT @@innodb_ft_min_token_size")).scalar())
+        except Exception as e:
+            logger.warning(f"Could not read innodb_ft_min_token_size, assuming {DEFAULT_FT_MIN_TOKEN_SIZE}: {e}")
+            _mysql_min_token_size = DEFAULT_FT_MIN_TOKEN_SIZE
+    return _mysql_min_token_size
+
+
+def mysql_boolean_query(terms: List[str], min_token_size: int = DEFAULT_FT_MIN_TOKEN_SIZE) -> str:
+    """
+    Build a boolean-mode AGAINST string: indexed terms required, the last one also as a prefix.
+    
+    Stopwords and words shorter than min_token_size are not in the InnoDB
+    index, so requiring them would match nothing; they are sent without ``+``
+    (optional, ignored by InnoDB). The last term keeps its ``+`` and prefix
+    operator, since a prefix search is not stripped.
+    
+    Args:
+        terms: Terms from search_terms (at least one)
+        min_token_size: innodb_ft_min_token_size of the server
+    
+    Returns:
+        AGAINST string, e.g. "+ruto in +nairobi*"
+    """
+    parts = [
+        f"+{term}" if len(term) >= min_token_size and term not in INNODB_STOPWORDS else term
+        for term in terms[:-1]
+    ]
+    parts.append(f"+{terms[-1]}*")
+    return " ".join(parts)
+
+
+def _fts5_query(terms: List[str]) -> str:
+    """Implicit AND of quoted terms; the last one also matches as a prefix."""
+    return " ".join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+
+
+def _match_stories(db: Session, terms: List[str]):
+    """
+    Build the text-match part of a search for the session's database.
+    
+    Returns:
+        Tuple of (Story query restricted to matches, relevance expression; higher is better)
+    """
+    global _substring_fallback_logged
+    dialect = db.get_bind().dialect.name
+    
+    if dialect == "mysql":
+        against = mysql_boolean_query(terms, mysql_min_token_size(db))
+        relevance = match(Story.headline, Story.content, against=against).in_boolean_mode()
+        return db.query(Story).filter(relevance), relevance
+    
+    if dialect == "sqlite":
+        ensure_sqlite_search_index(db)
+        hits = text(
+            "SELECT rowid AS story_id, -bm25(stories_fts, :headline_weight, 1.0) AS relevance "
+            "FROM stories_fts WHERE stories_fts MATCH :fts_query"
+        ).bindparams(
+            headline_weight=SQLITE_HEADLINE_WEIGHT, fts_query=_fts5_query(terms)
+        ).columns(story_id=Integer, relevance=Float).subquery("hits")
+        return db.query(Story).join(hits, hits.c.story_id == Story.id), hits.c.relevance
+    
+    if not _substring_fallback_logged:
+        logger.warning(f"No full-text index for dialect '{dialect}'; story search uses substring matching")
+        _substring_fallback_logged = True
+    conditions = [
+        or_(func.lower(Story.headline).contains(term), func.lower(Story.content).contains(term))
+        for term in terms
+    ]
+    return db.query(Story).filter(and_(*conditions)), literal(1.0)
+
+
+def search_story_rows(
+    db: Session,
+    q: str,
+    limit: int = 50,
+    offset: int = 0,
+    sort: str = "relevance",
+    min_score: Optional[float] = None,
+    platform: Optional[str] = None,
+    hours_back: int = 168,
+    is_kenyan: Optional[bool] = None,
+    topic: Optional[str] = None
+) -> List[Row]:
+    """
+    Search active stories by text.
+    
+    With ``sort="relevance"`` results are ordered by text relevance times
+    (1 + score / 100), so among equally relevant matches higher-scoring
+    stories come first and a score-100 story counts double.
+    
+    Args:
+        db: Database session
+        q: Search string (every word must match; the last word may be a prefix)
+        limit: Maximum number of stories to return
+        offset: Number of matches to skip (pagination)
+        sort: "relevance", "recent" (posted_at) or "score"
+        min_score: Minimum score threshold
+        platform: Filter by platform
+        hours_back: Only search stories from last N hours
+        is_kenyan: Filter Kenyan stories only
+        topic: Filter by topic
+    
+    Returns:
+        List of rows with STORY_ROW_COLUMNS attributes plus relevance
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+    
+    query, relevance = _match_stories(db, terms)
+    query = query.filter(
+        Story.is_active == True,
+        Story.posted_at >= datetime.utcnow() - timedelta(hours=hours_back)
+    )
+    
+    if platform:
+        query = query.filter(Story.platform == platform)
+    if min_score:
+        query = query.filter(Story.score >= min_score)
+    if is_kenyan is not None:
+        query = query.filter(Story.is_kenyan == is_kenyan)
+    if topic:
+        query = query.filter(Story.topic == topic)
+    
+    if sort == "recent":
+        query = query.order_by(Story.posted_at.desc(), Story.id.desc())
+    elif sort == "score":
+        query = query.order_by(Story.score.desc(), Story.id.desc())
+    else:
+        query = query.order_by((relevance * (1 + func.coalesce(Story.score, 0) / 100.0)).desc(), Story.id.desc())
+    
+    return query.with_entities(
+        *STORY_ROW_COLUMNS, relevance.label("relevance")
+    ).offset(offset).limit(limit).all()
@@ -0,0 +1,280 @@
+"""Live feed of newly committed stories for server-push clients (SSE / WebSocket).
+
+Session events collect a compact delta for every story a flush inserts and
+publish the deltas once the transaction commits. In the API process the
+deltas go to an in-process Broadcaster that fans each event out to every
+subscriber's bounded asyncio queue. Subscribers are plain queues, so
+thousands of idle clients cost one waiting coroutine each. A subscriber
+whose queue fills up (slow or stalled consumer) is dropped rather than
+allowed to hold back the others or grow memory.
+
+With ``stream_redis`` enabled, deltas are published to a Redis channel
+instead and every API worker relays that channel into its own broadcaster,
+so stories committed by the scheduler, a Celery worker or another API
+worker reach all connected clients. Without it only stories committed
+inside the API process (its background scheduler and scrape endpoints)
+are streamed.
+"""
+import asyncio
+import json
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import Story
+from response_cache import encode_json
+from config import settings
+from loguru import logger
+
+STREAM_CHANNEL = "story-stream"
+
+_EVENTS_KEY = "stream_events"
+
+
+class StreamMessage(NamedTuple):
+    """One encoded event, shared by every subscriber it is delivered to."""
+    id: int
+    data: str
+
+
+class Subscription:
+    """A client's bounded queue of pending messages (None marks the end of the stream)."""
+    
+    __slots__ = ("queue", "matches", "dropped")
+    
+    def __init__(self, buffer_size: int, matches: Optional[Callable[[Dict], bool]] = None):
+        self.queue: "asyncio.Queue[Optional[StreamMessage]]" = asyncio.Queue(maxsize=buffer_size)
+        self.matches = matches
+        self.dropped = False
+
+
+class Broadcaster:
+    """Fans published events out to subscriber queues on one event loop."""
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, format_event: Callable[[Dict], Any], buffer_size: int):
+        self._loop = loop
+        self._format_event = format_event
+        self._buffer_size = buffer_size
+        self._subscribers: Set[Subscription] = set()
+    
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected subscribers."""
+        return len(self._subscribers)
+    
+    def subscribe(self, matches: Optional[Callable[[Dict], bool]] = None) -> Subscription:
+        """
+        Register a subscriber (call on the broadcaster's loop).
+        
+        Args:
+            matches: Predicate on the raw story delta; only matching events are queued
+        
+        Returns:
+            Subscription whose queue receives StreamMessage items
+        """
+        subscription = Subscription(self._buffer_size, matches)
+        self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber (call on the broadcaster's loop)."""
+        self._subscribers.discard(subscription)
+    
+    def publish(self, event: Dict) -> None:
+        """Deliver an event to all matching subscribers; safe to call from any thread."""
+        try:
+            self._loop.call_soon_threadsafe(self._fan_out, event)
+        except RuntimeError:
+            pass  # Loop already closed (process shutting down)
+    
+    def close(self) -> None:
+        """End every subscriber's stream (call on the broadcaster's loop)."""
+        for subscription in list(self._subscribers):
+            self._end(subscription)
+    
+    def _fan_out(self, event: Dict) -> None:
+        """Encode an event once and queue it for each matching subscriber."""
+        if not self._subscribers:
+            return
+        
+        message = StreamMessage(event["id"], encode_json(self._format_event(event)).decode("utf-8"))
+        dropped = 0
+        for subscription in list(self._subscribers):
+            if subscription.matches is not None and not subscription.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscription.dropped = True
+                self._end(subscription)
+                dropped += 1
+        
+        if dropped:
+            logger.warning(f"Dropped {dropped} slow story stream subscriber(s)")
+    
+    def _end(self, subscription: Subscription) -> None:
+        """Unsubscribe and replace whatever is still queued with the end marker."""
+        self._subscribers.discard(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+
+_broadcaster: Optional[Broadcaster] = None
+_relay_stop = threading.Event()
+_redis = None
+
+
+def get_broadcaster() -> Optional[Broadcaster]:
+    """Get the process broadcaster (None until start_stream is called)."""
+    return _broadcaster
+
+
+def story_event(story: Story) -> Dict:
+    """
+    Compact delta of a new story: the feed row columns plus filter fields.
+    
+    Args:
+        story: Flushed story (id assigned)
+    
+    Returns:
+        JSON-serializable dictionary
+    """
+    return {
+        "id": story.id,
+        "headline": story.headline,
+        "content_prefix": (story.content or "")[:100],
+        "author": story.author,
+        "platform": story.platform,
+        "likes": story.likes or 0,
+        "comments": story.comments or 0,
+        "shares": story.shares or 0,
+        "engagement_velocity": story.engagement_velocity or 0.0,
+        "reason_flagged": story.reason_flagged,
+        "posted_at": story.posted_at.isoformat() if story.posted_at else None,
+        "credibility_score": story.credibility_score or 0.0,
+        "url": story.url,
+        "topic": story.topic,
+        "is_kenyan": bool(story.is_kenyan),
+    }
+
+
+def _publishing_enabled() -> bool:
+    """Whether committed stories have anywhere to go in this process."""
+    return settings.stream_enabled and (settings.stream_redis or _broadcaster is not None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_stories(session: Session, flush_context) -> None:
+    """Remember deltas of active stories inserted by this flush; forget stories it deleted."""
+    if not _publishing_enabled():
+        return
+    events = session.info.get(_EVENTS_KEY)
+    if events:
+        # Stories below the keep threshold are deleted again before commit
+        deleted = {obj.id for obj in session.deleted if isinstance(obj, Story)}
+        if deleted:
+            events[:] = [story for story in events if story["id"] not in deleted]
+    
+    new_events = [
+        story_event(obj) for obj in session.new
+        if isinstance(obj, Story) and obj.is_active is not False
+    ]
+    if new_events:
+        session.info.setdefault(_EVENTS_KEY, []).extend(new_events)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    """Publish deltas once their stories are visible to readers."""
+    events = session.info.pop(_EVENTS_KEY, None)
+    if events:
+        publish_events(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    """Rolled-back stories were never committed; nothing to publish."""
+    session.info.pop(_EVENTS_KEY, None)
+
+
+def _get_redis():
+    """Lazily connect to Redis for stream publishing."""
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(settings.redis_url, socket_timeout=0.5)
+    return _redis
+
+
+def publish_events(events: List[Dict]) -> None:
+    """
+    Publish story deltas to Redis (if enabled) or the local broadcaster.
+    
+    Errors are logged and ignored; clients catch up through Last-Event-ID
+    or their next feed refresh.
+    
+    Args:
+        events: Story deltas from story_event()
+    """
+    if settings.stream_redis:
+        try:
+            client = _get_redis()
+            for story in events:
+                client.publish(STREAM_CHANNEL, json.dumps(story))
+        except Exception as e:
+            logger.warning(f"Story stream publish to Redis failed: {e}")
+        return
+    
+    broadcaster = _broadcaster
+    if broadcaster is not None:
+        for story in events:
+            broadcaster.publish(story)
+
+
+def _relay_from_redis() -> None:
+    """Forward the Redis channel into the local broadcaster until stopped, reconnecting on errors."""
+    import redis
+    
+    while not _relay_stop.is_set():
+        try:
+            pubsub = redis.Redis.from_url(settings.redis_url).pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(STREAM_CHANNEL)
+            logger.info(f"Relaying story stream from Redis channel '{STREAM_CHANNEL}'")
+            while not _relay_stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message is not None and _broadcaster is not None:
+                    _broadcaster.publish(json.loads(message["data"]))
+            pubsub.close()
+        except Exception as e:
+            logger.error(f"Story stream Redis relay error: {e}")
+            _relay_stop.wait(5)
+
+
+def start_stream(format_event: Callable[[Dict], Any]) -> Broadcaster:
+    """
+    Create the process broadcaster on the running event loop.
+    
+    Args:
+        format_event: Converts a story delta to the payload sent to clients
+    
+    Returns:
+        The broadcaster
+    """
+    global _broadcaster
+    _broadcaster = Broadcaster(asyncio.get_running_loop(), format_event, settings.stream_client_buffer)
+    
+    if settings.stream_redis:
+        _relay_stop.clear()
+        threading.Thread(target=_relay_from_redis, name="story-stream-relay", daemon=True).start()
+    
+    return _broadcaster
+
+
+def stop_stream() -> None:
+    """End all client streams and stop the Redis relay (call on the event loop)."""
+    global _broadcaster
+    _relay_stop.set()
+    if _broadcaster is not None:
+        _broadcaster.close()
+        _broadcaster = None
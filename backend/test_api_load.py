@@ -0,0 +1,126 @@
+"""Load test: latency percentiles for the API under concurrent mixed traffic.
+
+Start the API first (python main.py), then run:
+
+    python test_api_load.py [base_url] [scrape_source_id]
+
+Read requests (stories, hot stories, insights, sources) are sent by
+CONCURRENCY clients for DURATION_SECONDS. If a source id is given, one
+extra client keeps triggering POST /api/scrape/{id} so the read latencies
+show whether scrapes still block the event loop.
+"""
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+import httpx
+from config import settings
+
+CONCURRENCY = 32
+DURATION_SECONDS = 30
+MAX_P99_MS = 500.0  # Fail the run if read p99 exceeds this
+
+READ_REQUESTS = [
+    # (name, path, params, weight)
+    ("stories", "/api/stories", {"limit": 50}, 4),
+    ("stories_kenyan", "/api/stories", {"limit": 50, "is_kenyan": "true"}, 2),
+    ("stories_africa", "/api/stories", {"limit": 50, "location": "africa", "hours_back": 168}, 1),
+    ("hot", "/api/stories/hot", {"limit": 30}, 3),
+    ("insights", "/api/insights", {"hours_back": 24}, 1),
+    ("sources", "/api/sources", {}, 1),
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def read_client(client: httpx.AsyncClient, deadline: float, latencies: Dict[str, List[float]], errors: Dict[str, int]):
+    """Send weighted random read requests until the deadline."""
+    weights = [weight for _, _, _, weight in READ_REQUESTS]
+    while time.monotonic() < deadline:
+        name, path, params, _ = random.choices(READ_REQUESTS, weights=weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, params=params)
+            if response.status_code >= 400:
+                errors[name] = errors.get(name, 0) + 1
+        except httpx.HTTPError:
+            errors[name] = errors.get(name, 0) + 1
+        latencies.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+
+
+async def scrape_client(client: httpx.AsyncClient, deadline: float, source_id: int, latencies: Dict[str, List[float]]):
+    """Trigger scrapes back to back until the deadline."""
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            await client.post(f"/api/scrape/{source_id}", timeout=300)
+        except httpx.HTTPError:
+            pass
+        latencies.setdefault("scrape", []).append((time.perf_counter() - started) * 1000)
+
+
+async def run_load(base_url: str, scrape_source_id: Optional[int]) -> Dict[str, List[float]]:
+    """Run the mixed workload and return latencies (ms) per request name."""
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    deadline = time.monotonic() + DURATION_SECONDS
+    limits = httpx.Limits(max_connections=CONCURRENCY + 1, max_keepalive_connections=CONCURRENCY + 1)
+    
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        tasks = [read_client(client, deadline, latencies, errors) for _ in range(CONCURRENCY)]
+        if scrape_source_id is not None:
+            tasks.append(scrape_client(client, deadline, scrape_source_id, latencies))
+        await asyncio.gather(*tasks)
+    
+    for name, count in errors.items():
+        print(f"  [WARNING] {name}: {count} failed request(s)")
+    
+    return latencies
+
+
+def main():
+    """Run the load test and print p50/p95/p99 per endpoint."""
+    base_url = sys.argv[1] if len(sys.argv) > 1 else f"http://localhost:{settings.api_port}"
+    scrape_source_id = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    
+    print("=" * 60)
+    print("API Load Test")
+    print("=" * 60)
+    print(f"Target: {base_url}")
+    print(f"Clients: {CONCURRENCY} readers" + (f" + 1 scraper (source {scrape_source_id})" if scrape_source_id else ""))
+    print(f"Duration: {DURATION_SECONDS}s")
+    print()
+    
+    latencies = asyncio.run(run_load(base_url, scrape_source_id))
+    
+    print(f"{'endpoint':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, samples in sorted(latencies.items()):
+        print(f"{name:<16}{len(samples):>8}{percentile(samples, 50):>10.1f}"
+              f"{percentile(samples, 95):>10.1f}{percentile(samples, 99):>10.1f}")
+    
+    reads = [ms for name, samples in latencies.items() if name != "scrape" for ms in samples]
+    if not reads:
+        print("\n[ERROR] No requests completed - is the API running?")
+        return 1
+    
+    read_p99 = percentile(reads, 99)
+    print(f"\nAll reads: {len(reads)} requests, {len(reads) / DURATION_SECONDS:.0f} req/s, p99 {read_p99:.1f} ms")
+    
+    if read_p99 > MAX_P99_MS:
+        print(f"[ERROR] Read p99 {read_p99:.1f} ms exceeds {MAX_P99_MS:.0f} ms")
+        return 1
+    
+    print(f"[OK] Read p99 within {MAX_P99_MS:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Verify with EXPLAIN that story feed and change feed queries are served by their indexes (no filesort)."""
+from database import SessionLocal, engine, test_connection
+from services import STORY_ROW_COLUMNS, build_trending_query, build_changes_query
+from hot_stories import join_hot_set
+from sqlalchemy import text
+from datetime import datetime, timedelta
+import sys
+
+# Variants whose keyset predicate must seek into an index (name fragment -> index name fragment)
+RANGE_INDEXES = {
+    "cursor page": "rank",
+    "changes": "idx_story_updated",
+}
+
+# Variants that must be driven by a given index (name fragment -> index name fragment)
+DRIVING_INDEXES = {
+    "hot": "idx_hot",
+}
+
+
+def explain(db, query, limit: int = 50):
+    """Run EXPLAIN on a feed query and return rows as dictionaries."""
+    statement = query.limit(limit).statement.compile(
+        dialect=engine.dialect,
+        compile_kwargs={"literal_binds": True}
+    )
+    result = db.execute(text(f"EXPLAIN {statement}"))
+    return [dict(row._mapping) for row in result]
+
+
+def cursor_page_query(db, **filters):
+    """Trending query for the second page, continuing after the first page's last story."""
+    last = build_trending_query(db, **filters).offset(49).first()
+    # Empty table: any cursor exercises the same plan
+    after = (last.rank_key, last.id) if last is not None else ("9" * 34, 2 ** 31)
+    return build_trending_query(db, after=after, **filters)
+
+
+def changes_page_query(db, **filters):
+    """Change feed query for a page boundary (a time and id position) an hour back."""
+    now = datetime.utcnow()
+    return build_changes_query(db, (now - timedelta(hours=1), 1), now, **filters)
+
+
+def main():
+    """EXPLAIN every feed variant and fail if MySQL would filesort."""
+    print("=" * 60)
+    print("Feed Query EXPLAIN Check")
+    print("=" * 60)
+    print()
+    
+    if engine.dialect.name != "mysql":
+        print(f"[SKIP] EXPLAIN check targets MySQL (current dialect: {engine.dialect.name})")
+        return 0
+    
+    if not test_connection():
+        print("[ERROR] Database connection failed")
+        return 1
+    
+    db = SessionLocal()
+    try:
+        variants = {
+            "stories (default)": build_trending_query(db),
+            "stories (is_kenyan)": build_trending_query(db, is_kenyan=True),
+            "stories (platform)": build_trending_query(db, platform="X"),
+            "stories (min_score + topic)": build_trending_query(db, min_score=40, topic="Politics", hours_back=168),
+            "stories (location=africa)": build_trending_query(db, location="africa"),
+            "stories (location=kenya)": build_trending_query(db, location="kenya"),
+            "stories (cursor page)": cursor_page_query(db),
+            "stories (cursor page, is_kenyan)": cursor_page_query(db, is_kenyan=True),
+            "changes (page boundary)": changes_page_query(db),
+            "changes (page boundary, platform)": changes_page_query(db, platform="X"),
+            # The hot endpoints and snapshot export read the materialized hot set
+            "hot (default)": join_hot_set(db.query(*STORY_ROW_COLUMNS)),
+            "hot (is_kenyan)": join_hot_set(db.query(*STORY_ROW_COLUMNS), is_kenyan=True, hours_back=24),
+        }
+        
+        failures = 0
+        for name, query in variants.items():
+            rows = explain(db, query)
+            extras = " | ".join(str(row.get("Extra") or "") for row in rows)
+            keys = ", ".join(str(row.get("key")) for row in rows)
+            required = next((index for marker, index in RANGE_INDEXES.items() if marker in name), None)
+            driving = next((index for marker, index in DRIVING_INDEXES.items() if marker in name), None)
+            
+            if "Using filesort" in extras:
+                failures += 1
+                print(f"  [FAIL] {name}: key={keys} extra={extras}")
+            elif required and not any(
+                row.get("type") == "range" and required in str(row.get("key")) for row in rows
+            ):
+                # The keyset predicate must seek into the index, not scan from its start
+                failures += 1
+                types = ", ".join(str(row.get("type")) for row in rows)
+                print(f"  [FAIL] {name}: no range access on {required} (key={keys} type={types})")
+            elif driving and driving not in str(rows[0].get("key")):
+                # The hot set is read in rank order from its own index, then joined to stories by id
+                failures += 1
+                print(f"  [FAIL] {name}: not driven by {driving} (key={keys})")
+            else:
+                print(f"  [OK] {name}: key={keys}")
+        
+        print()
+        if failures:
+            print(f"[ERROR] {failures} feed query(ies) use filesort or miss their index")
+            return 1
+        
+        print("[OK] All feed queries are index range scans + LIMIT")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
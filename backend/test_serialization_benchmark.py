@@ -0,0 +1,106 @@
+"""Benchmark: story list serialization, StoryResponse models vs direct JSON encoding.
+
+Serves the same 200 story rows from two routes of a throwaway app (no
+database needed) and reports requests/sec for each:
+
+- models: StoryResponse per row, validated again by response_model (old path)
+- fast: dict per row, encoded straight to JSON bytes (response_cache.encode_json)
+
+    python test_serialization_benchmark.py [requests]
+"""
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import List
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+from api import StoryResponse, story_row_to_dict, story_row_to_response
+from response_cache import encode_json, orjson
+
+ROWS = 200
+
+StoryRow = namedtuple("StoryRow", [
+    "id", "headline", "content_prefix", "author", "platform", "likes", "comments", "shares",
+    "engagement_velocity", "reason_flagged", "posted_at", "credibility_score", "url", "topic",
+])
+
+
+def make_rows(count: int) -> List[StoryRow]:
+    """Build story rows shaped like services.STORY_ROW_COLUMNS."""
+    now = datetime.utcnow()
+    return [
+        StoryRow(
+            id=i,
+            headline=f"Breaking: Nairobi county assembly passes budget amendment number {i}",
+            content_prefix=f"Breaking: Nairobi county assembly passes budget amendment number {i}",
+            author="@NationAfrica",
+            platform="X",
+            likes=1200 + i,
+            comments=340,
+            shares=95,
+            engagement_velocity=float(i % 150),
+            reason_flagged="High engagement velocity (Kenyan content)",
+            posted_at=now - timedelta(minutes=i),
+            credibility_score=85.0,
+            url=f"https://x.com/NationAfrica/status/{1700000000000 + i}",
+            topic="Politics",
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(rows: List[StoryRow]) -> FastAPI:
+    """App with the old and the fast serialization path over the same rows."""
+    app = FastAPI()
+    
+    @app.get("/models", response_model=List[StoryResponse])
+    async def models_path():
+        return [story_row_to_response(row) for row in rows]
+    
+    @app.get("/fast", response_model=List[StoryResponse])
+    async def fast_path():
+        return Response(encode_json([story_row_to_dict(row) for row in rows]), media_type="application/json")
+    
+    return app
+
+
+def requests_per_second(client: TestClient, path: str, requests: int) -> float:
+    """Issue sequential requests and return the achieved rate."""
+    client.get(path)  # Warm-up
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(path)
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    """Compare both paths and check they return the same JSON."""
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    
+    print("=" * 60)
+    print(f"Story List Serialization Benchmark ({ROWS} rows, {requests} requests)")
+    print("=" * 60)
+    print(f"Encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print()
+    
+    client = TestClient(build_app(make_rows(ROWS)))
+    
+    if client.get("/models").json() != client.get("/fast").json():
+        print("[ERROR] Fast path output differs from the model path")
+        return 1
+    
+    models_rps = requests_per_second(client, "/models", requests)
+    fast_rps = requests_per_second(client, "/fast", requests)
+    
+    print(f"{'path':<10}{'req/s':>10}")
+    print(f"{'models':<10}{models_rps:>10.0f}")
+    print(f"{'fast':<10}{fast_rps:>10.0f}")
+    print(f"\nFast path: {fast_rps / models_rps:.1f}x requests/sec")
+    print("[OK] Outputs identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
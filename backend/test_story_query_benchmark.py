@@ -0,0 +1,100 @@
+"""Benchmark: full Story entity load vs projected story rows for the stories feed.
+
+Runs the /api/stories query for limit=200 over the largest window (168 hours)
+both ways, including conversion to StoryResponse, and reports latency and
+peak Python memory.
+
+    python test_story_query_benchmark.py [runs]
+"""
+import statistics
+import sys
+import time
+import tracemalloc
+from database import SessionLocal, test_connection
+from services import get_trending_stories, get_trending_story_rows
+from api import story_to_response, story_row_to_response
+
+LIMIT = 200
+HOURS_BACK = 168
+
+
+def entity_path(db):
+    """Current path: load Story entities, convert each to a response model."""
+    return [story_to_response(story) for story in get_trending_stories(db, limit=LIMIT, hours_back=HOURS_BACK)]
+
+
+def projected_path(db):
+    """Projected path: select response columns only, convert rows."""
+    return [story_row_to_response(row) for row in get_trending_story_rows(db, limit=LIMIT, hours_back=HOURS_BACK)]
+
+
+def measure(path, runs: int):
+    """Return (median ms, p95 ms, peak KiB, result count) for a query path, each run in a fresh session."""
+    timings = []
+    peak = 0
+    count = 0
+    for run in range(runs + 1):
+        db = SessionLocal()
+        try:
+            tracemalloc.start()
+            started = time.perf_counter()
+            responses = path(db)
+            elapsed = (time.perf_counter() - started) * 1000
+            _, run_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            db.close()
+        
+        if run == 0:
+            continue  # Warm-up (connection, statement compilation)
+        timings.append(elapsed)
+        peak = max(peak, run_peak)
+        count = len(responses)
+    
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95, peak / 1024, count
+
+
+def main():
+    """Compare both paths and check they return identical responses."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    
+    print("=" * 60)
+    print(f"Story List Query Benchmark (limit={LIMIT}, hours_back={HOURS_BACK}, {runs} runs)")
+    print("=" * 60)
+    print()
+    
+    if not test_connection():
+        print("[ERROR] Database connection failed")
+        return 1
+    
+    db = SessionLocal()
+    try:
+        if entity_path(db) != projected_path(db):
+            print("[ERROR] Projected responses differ from entity responses")
+            return 1
+    finally:
+        db.close()
+    
+    results = {
+        "entities": measure(entity_path, runs),
+        "projected rows": measure(projected_path, runs),
+    }
+    
+    print(f"{'path':<16}{'rows':>6}{'median ms':>12}{'p95 ms':>10}{'peak KiB':>12}")
+    for name, (median, p95, peak_kib, count) in results.items():
+        print(f"{name:<16}{count:>6}{median:>12.2f}{p95:>10.2f}{peak_kib:>12.1f}")
+    
+    if results["entities"][3] < LIMIT:
+        print(f"\n[WARNING] Only {results['entities'][3]} stories in the window; results are more telling with {LIMIT}+")
+    
+    entity_median, projected_median = results["entities"][0], results["projected rows"][0]
+    entity_peak, projected_peak = results["entities"][2], results["projected rows"][2]
+    print(f"\nLatency: {entity_median / projected_median:.1f}x faster, memory: {entity_peak / max(projected_peak, 1):.1f}x smaller")
+    print("[OK] Responses identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Check story search query building and, if a database is reachable, a stopword query round trip.
+
+InnoDB does not index stopwords or short words, so a query such as
+"ruto in nairobi" must not require "in" on MySQL; the same query must still
+find the story on SQLite FTS5.
+
+    python test_story_search.py
+"""
+import re
+import sys
+from datetime import datetime, timedelta
+from database import SessionLocal, test_connection
+from models import Story
+from story_search import search_terms, mysql_boolean_query, search_story_rows
+
+# (search string, innodb_ft_min_token_size, expected AGAINST string)
+BOOLEAN_QUERY_CASES = [
+    ("ruto in nairobi", 3, "+ruto in +nairobi*"),
+    ("The president of Kenya", 3, "the +president of +kenya*"),
+    ("mp for kisumu", 3, "mp for +kisumu*"),
+    ("mp for kisumu", 2, "+mp for +kisumu*"),
+    ("bei ya unga", 4, "bei ya +unga*"),
+    ("nairobi in", 3, "+nairobi +in*"),
+]
+
+_STOPWORD_HEADLINE = re.compile(r"\b([^\W\d_]{4,}) (?:in|of|the|for|on) ([^\W\d_]{4,})\b")
+
+
+def check_boolean_queries() -> int:
+    """Compare built AGAINST strings with the expected ones; return the number of failures."""
+    failures = 0
+    for q, min_token_size, expected in BOOLEAN_QUERY_CASES:
+        against = mysql_boolean_query(search_terms(q), min_token_size)
+        if against == expected:
+            print(f"  [OK] {q!r} -> {against!r}")
+        else:
+            failures += 1
+            print(f"  [FAIL] {q!r} -> {against!r} (expected {expected!r})")
+    return failures
+
+
+def check_stopword_search() -> int:
+    """Search for a stored headline's words around a stopword; return 1 if the story is not found."""
+    if not test_connection():
+        print("  [SKIP] Database connection failed")
+        return 0
+    
+    db = SessionLocal()
+    try:
+        stories = db.query(Story.id, Story.headline).filter(
+            Story.is_active == True,
+            Story.posted_at >= datetime.utcnow() - timedelta(hours=168)
+        ).order_by(Story.id.desc()).limit(500).all()
+        for story_id, headline in stories:
+            found = _STOPWORD_HEADLINE.search(headline or "")
+            if found:
+                break
+        else:
+            print("  [SKIP] No recent headline with two words around a stopword")
+            return 0
+        
+        q = found.group(0)
+        ids = [row.id for row in search_story_rows(db, q, limit=200)]
+        if story_id in ids:
+            print(f"  [OK] {q!r} found story {story_id} ({len(ids)} result(s))")
+            return 0
+        print(f"  [FAIL] {q!r} did not find story {story_id} ({len(ids)} result(s))")
+        return 1
+    finally:
+        db.close()
+
+
+def main():
+    """Run the search checks."""
+    print("=" * 60)
+    print("Story Search Check")
+    print("=" * 60)
+    print()
+    
+    print("Boolean-mode queries:")
+    failures = check_boolean_queries()
+    print()
+    print("Multi-word query with a stopword:")
+    failures += check_stopword_search()
+    
+    print()
+    if failures:
+        print(f"[ERROR] {failures} search check(s) failed")
+        return 1
+    print("[OK] Search checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
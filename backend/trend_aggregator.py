@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from models import Source, RawPost
 from platforms.facebook import FacebookScraper
+from snapshots import refresh_post_metrics, record_snapshot
 from loguru import logger
 
 
@@ -102,7 +103,7 @@ def aggregate_facebook_trends(
                 all_posts.append(post)
             
             logger.info(f"Fetched {len(posts)} posts from {source.account_handle}")
-            
+        
         except Exception as e:
             logger.error(f"Error fetching posts from {source.account_handle}: {e}")
             continue
@@ -186,6 +187,7 @@ def scrape_and_store_trends(
     
     # Store in database
     posts_stored = 0
+    reseen_posts = []
     for post_data in trending_posts:
         try:
             # Check if post already exists
@@ -195,7 +197,10 @@ def scrape_and_store_trends(
             ).first()
             
             if existing:
-                continue  # Skip duplicates
+                # Re-seen post: snapshot the observation for delta-based velocity
+                refresh_post_metrics(db, existing, post_data)
+                reseen_posts.append(existing)
+                continue
             
             # Get source
             source = db.query(Source).filter(Source.id == post_data.get('source_id')).first()
@@ -219,12 +224,23 @@ def scrape_and_store_trends(
             )
             
             db.add(raw_post)
+            record_snapshot(db, raw_post)
             posts_stored += 1
-            
+        
         except Exception as e:
             logger.error(f"Error storing post {post_data.get('platform_post_id')}: {e}")
             continue
     
+    # Rescore stories of re-seen posts (growing or gone flat) in a savepoint, so a failure
+    # keeps the stored posts; services imports this module
+    from services import rescore_existing_stories
+    stories_rescored = 0
+    try:
+        with db.begin_nested():
+            stories_rescored = rescore_existing_stories(db, reseen_posts)
+    except Exception as e:
+        logger.error(f"Error rescoring re-seen trending posts: {e}")
+    
     try:
         db.commit()
         logger.info(f"Stored {posts_stored} trending posts in database")
@@ -237,6 +253,7 @@ def scrape_and_store_trends(
         "success": True,
         "posts_fetched": len(trending_posts),
         "posts_stored": posts_stored,
+        "stories_rescored": stories_rescored,
         "top_trending": len(trending_posts),
         "pages_scraped": len(page_sources)
     }
@@ -1,11 +1,69 @@
 """Update database schema to include new Kenyan content fields."""
-from database import engine, Base, test_connection
-from models import Source, RawPost, Story, Hashtag, ScrapeLog
+from database import engine, Base, test_connection, SessionLocal
+from models import Source, RawPost, Story, Hashtag, ScrapeLog, EngagementSnapshot, ScoringProfile, DataVersion, StoryHourlyRollup, KeywordSketch, HotStory, PrecomputedFeed, MaintenanceCursor, compute_rank_key
+from rollups import rebuild_rollups
+from keyword_sketches import rebuild_sketches
+from hot_stories import rebuild_hot_stories
+from gazetteer import normalize_story_location
 from sqlalchemy import text
+from sqlalchemy.orm import load_only
 from loguru import logger
 import sys
 
 
+def backfill_rank_keys(batch_size: int = 1000) -> int:
+    """Compute rank_key for stories written before the column existed."""
+    db = SessionLocal()
+    updated = 0
+    try:
+        while True:
+            stories = db.query(Story).filter(Story.rank_key.is_(None)).limit(batch_size).all()
+            if not stories:
+                break
+            
+            for story in stories:
+                story.rank_key = compute_rank_key(
+                    story.engagement_velocity,
+                    story.is_kenyan,
+                    story.score,
+                    story.posted_at
+                )
+            
+            db.commit()
+            updated += len(stories)
+        
+        return updated
+    finally:
+        db.close()
+
+
+def backfill_story_locations(batch_size: int = 1000) -> int:
+    """Normalize location into country_code/region for stories written before the columns existed."""
+    db = SessionLocal()
+    updated = 0
+    last_id = 0
+    try:
+        while True:
+            stories = db.query(Story).options(
+                load_only(Story.id, Story.location, Story.is_kenyan, Story.country_code, Story.region)
+            ).filter(Story.id > last_id).order_by(Story.id).limit(batch_size).all()
+            if not stories:
+                break
+            
+            last_id = stories[-1].id
+            for story in stories:
+                country_code, region = normalize_story_location(story.location, story.is_kenyan)
+                if (story.country_code, story.region) != (country_code, region):
+                    story.country_code, story.region = country_code, region
+                    updated += 1
+            
+            db.commit()
+        
+        return updated
+    finally:
+        db.close()
+
+
 def update_schema():
     """Update database schema with new fields."""
     print("=" * 60)
@@ -93,12 +151,223 @@ def update_schema():
             else:
                 print("[OK] scrape_logs table already has new columns")
             
+            # Owner process of thread-backend scrape jobs (orphaned jobs are failed on API startup)
+            result = conn.execute(text("SHOW COLUMNS FROM scrape_logs LIKE 'runner'"))
+            if result.fetchone() is None:
+                print("\nAdding runner to scrape_logs...")
+                conn.execute(text("ALTER TABLE scrape_logs ADD COLUMN runner VARCHAR(120)"))
+                print("[OK] Added runner to scrape_logs table")
+            else:
+                print("[OK] scrape_logs table already has runner")
+            
+            # Engagement snapshots (delta-based velocity)
+            result = conn.execute(text("SHOW TABLES LIKE 'engagement_snapshots'"))
+            has_snapshots_table = result.fetchone() is not None
+            
+            if not has_snapshots_table:
+                print("\nCreating engagement_snapshots table...")
+                Base.metadata.create_all(bind=engine, tables=[EngagementSnapshot.__table__])
+                print("[OK] Created engagement_snapshots table")
+            else:
+                print("[OK] engagement_snapshots table already exists")
+            
+            result = conn.execute(text("SHOW COLUMNS FROM stories LIKE 'engagement_acceleration'"))
+            has_acceleration = result.fetchone() is not None
+            
+            if not has_acceleration:
+                print("\nAdding engagement_acceleration to stories...")
+                conn.execute(text("ALTER TABLE stories ADD COLUMN engagement_acceleration FLOAT"))
+                print("[OK] Added engagement_acceleration to stories table")
+            else:
+                print("[OK] stories table already has engagement_acceleration")
+            
+            # Scoring profiles
+            result = conn.execute(text("SHOW TABLES LIKE 'scoring_profiles'"))
+            has_profiles_table = result.fetchone() is not None
+            
+            if not has_profiles_table:
+                print("\nCreating scoring_profiles table...")
+                Base.metadata.create_all(bind=engine, tables=[ScoringProfile.__table__])
+                print("[OK] Created scoring_profiles table")
+            else:
+                print("[OK] scoring_profiles table already exists")
+            
+            # Change counters for the API response cache
+            result = conn.execute(text("SHOW TABLES LIKE 'data_versions'"))
+            has_versions_table = result.fetchone() is not None
+            
+            if not has_versions_table:
+                print("\nCreating data_versions table...")
+                Base.metadata.create_all(bind=engine, tables=[DataVersion.__table__])
+                print("[OK] Created data_versions table")
+            else:
+                print("[OK] data_versions table already exists")
+            
+            # Hourly story rollups behind /api/insights
+            result = conn.execute(text("SHOW TABLES LIKE 'story_hourly_rollups'"))
+            has_rollups_table = result.fetchone() is not None
+            
+            if not has_rollups_table:
+                print("\nCreating story_hourly_rollups table...")
+                Base.metadata.create_all(bind=engine, tables=[StoryHourlyRollup.__table__])
+                print("[OK] Created story_hourly_rollups table")
+            else:
+                print("[OK] story_hourly_rollups table already exists")
+            
+            # Hourly keyword sketches (replace the keyword rollup dimension)
+            result = conn.execute(text("SHOW TABLES LIKE 'keyword_sketches'"))
+            has_sketches_table = result.fetchone() is not None
+            
+            if not has_sketches_table:
+                print("\nCreating keyword_sketches table...")
+                Base.metadata.create_all(bind=engine, tables=[KeywordSketch.__table__])
+                conn.execute(text("DELETE FROM story_hourly_rollups WHERE dimension = 'keyword'"))
+                print("[OK] Created keyword_sketches table")
+            else:
+                print("[OK] keyword_sketches table already exists")
+            
+            # Materialized hot story set (read by /api/stories/hot)
+            result = conn.execute(text("SHOW TABLES LIKE 'hot_stories'"))
+            has_hot_table = result.fetchone() is not None
+            
+            if not has_hot_table:
+                print("\nCreating hot_stories table...")
+                Base.metadata.create_all(bind=engine, tables=[HotStory.__table__])
+                print("[OK] Created hot_stories table")
+            else:
+                print("[OK] hot_stories table already exists")
+            
+            # Precomputed dashboard feeds (/api/feeds/{name}); filled by the scheduler
+            result = conn.execute(text("SHOW TABLES LIKE 'precomputed_feeds'"))
+            if result.fetchone() is None:
+                print("\nCreating precomputed_feeds table...")
+                Base.metadata.create_all(bind=engine, tables=[PrecomputedFeed.__table__])
+                print("[OK] Created precomputed_feeds table")
+            else:
+                print("[OK] precomputed_feeds table already exists")
+            
+            # Resume positions of story expiry's decayed-score scan
+            result = conn.execute(text("SHOW TABLES LIKE 'maintenance_cursors'"))
+            if result.fetchone() is None:
+                print("\nCreating maintenance_cursors table...")
+                Base.metadata.create_all(bind=engine, tables=[MaintenanceCursor.__table__])
+                print("[OK] Created maintenance_cursors table")
+            else:
+                print("[OK] maintenance_cursors table already exists")
+            
+            result = conn.execute(text("SHOW COLUMNS FROM stories LIKE 'scoring_profile'"))
+            has_story_profile = result.fetchone() is not None
+            
+            if not has_story_profile:
+                print("\nAdding scoring_profile to stories...")
+                conn.execute(text("ALTER TABLE stories ADD COLUMN scoring_profile VARCHAR(120)"))
+                print("[OK] Added scoring_profile to stories table")
+            else:
+                print("[OK] stories table already has scoring_profile")
+            
+            # Active-window index used by feeds and story expiry
+            result = conn.execute(text("SHOW INDEX FROM stories WHERE Key_name = 'idx_story_active_posted'"))
+            has_active_posted_index = result.fetchone() is not None
+            
+            if not has_active_posted_index:
+                print("\nAdding idx_story_active_posted to stories...")
+                conn.execute(text("CREATE INDEX idx_story_active_posted ON stories(is_active, posted_at)"))
+                print("[OK] Added idx_story_active_posted")
+            else:
+                print("[OK] stories table already has idx_story_active_posted")
+            
+            # Precomputed feed rank key and its indexes
+            result = conn.execute(text("SHOW COLUMNS FROM stories LIKE 'rank_key'"))
+            has_rank_key = result.fetchone() is not None
+            
+            if not has_rank_key:
+                print("\nAdding rank_key to stories...")
+                conn.execute(text("ALTER TABLE stories ADD COLUMN rank_key VARCHAR(40)"))
+                conn.execute(text("CREATE INDEX idx_story_rank ON stories(is_active, rank_key)"))
+                conn.execute(text("CREATE INDEX idx_story_kenyan_rank ON stories(is_active, is_kenyan, rank_key)"))
+                conn.execute(text("CREATE INDEX idx_story_platform_rank ON stories(is_active, platform, rank_key)"))
+                print("[OK] Added rank_key and feed indexes to stories table")
+            else:
+                print("[OK] stories table already has rank_key")
+            
+            # Normalized location columns used by the location feed filter
+            result = conn.execute(text("SHOW COLUMNS FROM stories LIKE 'country_code'"))
+            has_country_code = result.fetchone() is not None
+            
+            if not has_country_code:
+                print("\nAdding country_code and region to stories...")
+                conn.execute(text("ALTER TABLE stories ADD COLUMN country_code CHAR(2)"))
+                conn.execute(text("ALTER TABLE stories ADD COLUMN region VARCHAR(32)"))
+                conn.execute(text("CREATE INDEX idx_story_country_rank ON stories(is_active, country_code, rank_key)"))
+                conn.execute(text("CREATE INDEX idx_story_region_rank ON stories(is_active, region, rank_key)"))
+                print("[OK] Added country_code, region and location feed indexes to stories table")
+            else:
+                print("[OK] stories table already has country_code and region")
+            
+            # Change feed: updated_at is now written by the application in UTC
+            result = conn.execute(text("SHOW INDEX FROM stories WHERE Key_name = 'idx_story_updated'"))
+            has_updated_index = result.fetchone() is not None
+            
+            if not has_updated_index:
+                print("\nConverting stories.updated_at to UTC and indexing it...")
+                conn.execute(text("ALTER TABLE stories MODIFY COLUMN updated_at DATETIME NULL"))  # Drops ON UPDATE CURRENT_TIMESTAMP
+                conn.execute(text(
+                    "UPDATE stories SET updated_at = updated_at - INTERVAL TIMESTAMPDIFF(SECOND, UTC_TIMESTAMP(), NOW()) SECOND "
+                    "WHERE updated_at IS NOT NULL"
+                ))
+                conn.execute(text("CREATE INDEX idx_story_updated ON stories(updated_at, id)"))
+                print("[OK] Added idx_story_updated to stories table")
+            else:
+                print("[OK] stories table already has idx_story_updated")
+            
+            # Full-text story search (/api/stories/search)
+            result = conn.execute(text("SHOW INDEX FROM stories WHERE Key_name = 'idx_story_fulltext'"))
+            if result.fetchone() is None:
+                print("\nAdding full-text index to stories (may take a while on large tables)...")
+                conn.execute(text("ALTER TABLE stories ADD FULLTEXT INDEX idx_story_fulltext (headline, content)"))
+                print("[OK] Added idx_story_fulltext to stories table")
+            else:
+                print("[OK] stories table already has idx_story_fulltext")
+            
             conn.commit()
+            
+            backfilled = backfill_rank_keys()
+            if backfilled:
+                print(f"[OK] Computed rank_key for {backfilled} existing stories")
+            
+            normalized = backfill_story_locations()
+            if normalized:
+                print(f"[OK] Normalized location for {normalized} existing stories")
+            
+            if not has_rollups_table:
+                db = SessionLocal()
+                try:
+                    rows = rebuild_rollups(db)
+                    print(f"[OK] Built {rows} story rollup rows from existing stories")
+                finally:
+                    db.close()
+            
+            if not has_sketches_table:
+                db = SessionLocal()
+                try:
+                    hours = rebuild_sketches(db)
+                    print(f"[OK] Built keyword sketches for {hours} hour(s) from existing stories")
+                finally:
+                    db.close()
+            
+            if not has_hot_table:
+                db = SessionLocal()
+                try:
+                    hot = rebuild_hot_stories(db)
+                    print(f"[OK] Built hot story set with {hot} stories")
+                finally:
+                    db.close()
+            
             print("\n" + "=" * 60)
             print("[OK] Database schema updated successfully!")
             print("=" * 60)
             return True
-            
+    
     except Exception as e:
         logger.error(f"Error updating schema: {e}")
         print(f"\n[ERROR] {e}")
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { AnimatePresence } from "motion/react";
 import { Filter } from "lucide-react";
 import { Sidebar } from "./components/Sidebar";
@@ -10,7 +10,18 @@ import { InsightsPanel } from "./components/InsightsPanel";
 import { FilterPanel } from "./components/FilterPanel";
 import { Story } from "./components/StoryCard";
 import { Button } from "./components/ui/button";
-import { fetchStories, fetchHotStories, getHealth, fetchInsights, type Insights } from "../services/api";
+import {
+  fetchStoriesPage,
+  fetchHotStories,
+  fetchStoryChanges,
+  getHealth,
+  fetchInsights,
+  fetchSources,
+  subscribeToStories,
+  type Insights,
+  type StoryChangesParams,
+  type StoryStreamParams,
+} from "../services/api";
 
 export default function App() {
   const [theme, setTheme] = useState<"light" | "dark">("dark");
@@ -23,6 +34,8 @@ export default function App() {
   const [apiConnected, setApiConnected] = useState(false);
   const [loadError, setLoadError] = useState<string | null>(null);
   const [quickStats, setQuickStats] = useState<Insights | null>(null);
+  const [activeSources, setActiveSources] = useState<number | undefined>(undefined);
+  const syncToken = useRef<string | null>(null);  // Change feed position of the loaded stories
   const [filters, setFilters] = useState({
     platform: "all",
     velocity: "all",
@@ -46,6 +59,15 @@ export default function App() {
     document.documentElement.classList.toggle("dark", theme === "dark");
   }, []);
 
+  // Change feed filters matching the story feed
+  const changesParams = (): StoryChangesParams => {
+    const params: StoryChangesParams = {};
+    if (filters.platform !== "all") params.platform = filters.platform;
+    if (filters.kenyanOnly) params.is_kenyan = true;
+    if (filters.topic !== "all") params.topic = filters.topic;
+    return params;
+  };
+
   // Fetch stories from API
   useEffect(() => {
     const loadStories = async () => {
@@ -64,18 +86,30 @@ export default function App() {
         }
 
         if (filters.showHot) {
+          syncToken.current = null;
           const fetchedStories = await fetchHotStories(filters.kenyanOnly, 6);
           setStories(fetchedStories);
+          const insights = await fetchInsights(24);
+          setQuickStats(insights ?? null);
         } else {
           const params: any = { limit: 50, hours_back: 24 };
           if (filters.platform !== "all") params.platform = filters.platform;
           if (filters.kenyanOnly) params.is_kenyan = true;
           if (filters.topic !== "all") params.topic = filters.topic;
-          const fetchedStories = await fetchStories(params);
-          setStories(fetchedStories);
+          const start = await fetchStoryChanges(undefined, changesParams());
+          // Quick stats come with the stories (counts for the same filters) instead of a separate insights call
+          const page = await fetchStoriesPage({ ...params, facets: ["platform", "velocity"] });
+          setStories(page.stories);
+          syncToken.current = start.next_since;
+          const velocity = page.facets?.velocity ?? {};
+          const total = Object.values(page.facets?.platform ?? {}).reduce((sum, count) => sum + count, 0);
+          setQuickStats({
+            total_stories: total,
+            high_velocity: velocity.high ?? 0,
+            medium_velocity: velocity.medium ?? 0,
+            low_velocity: velocity.low ?? 0,
+          });
         }
-        const insights = await fetchInsights(24);
-        setQuickStats(insights ?? null);
       } catch (error) {
         const message = error instanceof Error ? error.message : "Failed to load stories.";
         setLoadError(message);
@@ -95,6 +129,53 @@ export default function App() {
     return () => clearInterval(interval);
   }, [filters.platform, filters.showHot, filters.kenyanOnly, filters.topic]);
 
+  // Active source count for the quick stats (sources rarely change, so once per visit)
+  useEffect(() => {
+    fetchSources()
+      .then((sources) => setActiveSources(sources.length))
+      .catch(() => {});
+  }, []);
+
+  // After the tab wakes up, catch up with a small change feed instead of refetching everything
+  useEffect(() => {
+    const catchUp = async () => {
+      if (document.visibilityState !== "visible" || !syncToken.current) return;
+      try {
+        let hasMore = true;
+        while (hasMore && syncToken.current) {
+          const changes = await fetchStoryChanges(syncToken.current, changesParams());
+          setStories((current) => {
+            const removed = new Set(changes.removed);
+            const updated = new Map(changes.stories.map((story) => [story.id, story]));
+            const kept = current.filter((story) => !removed.has(story.id)).map((story) => updated.get(story.id) ?? story);
+            const known = new Set(kept.map((story) => story.id));
+            return [...changes.stories.filter((story) => !known.has(story.id)), ...kept];
+          });
+          syncToken.current = changes.next_since;
+          hasMore = changes.has_more;
+        }
+      } catch {
+        // The next scheduled refresh reloads the full feed
+      }
+    };
+
+    document.addEventListener("visibilitychange", catchUp);
+    return () => document.removeEventListener("visibilitychange", catchUp);
+  }, [filters.platform, filters.kenyanOnly, filters.topic]);
+
+  // Add new stories as soon as the backend pushes them (polling above still refreshes engagement)
+  useEffect(() => {
+    const streamParams: StoryStreamParams = {};
+    if (filters.platform !== "all") streamParams.platform = filters.platform;
+    if (filters.kenyanOnly) streamParams.is_kenyan = true;
+    if (filters.showHot) streamParams.min_velocity = 20;
+
+    return subscribeToStories(streamParams, (story) => {
+      if (!filters.showHot && filters.topic !== "all" && story.topic !== filters.topic) return;
+      setStories((current) => (current.some((s) => s.id === story.id) ? current : [story, ...current]));
+    });
+  }, [filters.platform, filters.showHot, filters.kenyanOnly, filters.topic]);
+
   // Apply filters to stories
   useEffect(() => {
     let filtered = [...stories];
@@ -164,7 +245,7 @@ export default function App() {
               onClose={() => {}}
               filters={filters}
               onFiltersChange={setFilters}
-              quickStats={quickStats}
+              quickStats={quickStats && { ...quickStats, active_sources: quickStats.active_sources ?? activeSources }}
             />
           </div>
         )}
@@ -194,7 +275,7 @@ export default function App() {
                 topic: newFilters.topic ?? "all",
               });
             }}
-            quickStats={quickStats}
+            quickStats={quickStats && { ...quickStats, active_sources: quickStats.active_sources ?? activeSources }}
           />
         )}
       </AnimatePresence>
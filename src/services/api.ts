@@ -22,12 +22,32 @@ export interface StoriesQueryParams {
   hours_back?: number;
   topic?: string;  // Content category filter
   is_kenyan?: boolean;
+  cursor?: string;  // nextCursor from the previous page
+  facets?: StoryFacetName[];  // Count stories per value for these facets (same filters)
+}
+
+export type StoryFacetName = 'platform' | 'topic' | 'velocity';
+
+export type StoryFacets = Partial<Record<StoryFacetName, Record<string, number>>>;
+
+export interface StoriesPage {
+  stories: Story[];
+  nextCursor: string | null;  // null when there are no more stories
+  facets?: StoryFacets;  // Only when requested via params.facets
 }
 
 /**
  * Fetch trending stories from the backend API
  */
 export async function fetchStories(params: StoriesQueryParams = {}): Promise<Story[]> {
+  const page = await fetchStoriesPage(params);
+  return page.stories;
+}
+
+/**
+ * Fetch one page of trending stories; pass nextCursor back as `cursor` to load the next page
+ */
+export async function fetchStoriesPage(params: StoriesQueryParams = {}): Promise<StoriesPage> {
   const queryParams = new URLSearchParams();
   
   if (params.limit) queryParams.append('limit', params.limit.toString());
@@ -36,6 +56,8 @@ export async function fetchStories(params: StoriesQueryParams = {}): Promise<Sto
   if (params.hours_back) queryParams.append('hours_back', params.hours_back.toString());
   if (params.topic) queryParams.append('topic', params.topic);
   if (params.is_kenyan !== undefined) queryParams.append('is_kenyan', params.is_kenyan.toString());
+  if (params.cursor) queryParams.append('cursor', params.cursor);
+  if (params.facets?.length) queryParams.append('facets', params.facets.join(','));
 
   const url = `${API_BASE_URL}/api/stories${queryParams.toString() ? `?${queryParams.toString()}` : ''}`;
   
@@ -47,13 +69,117 @@ export async function fetchStories(params: StoriesQueryParams = {}): Promise<Sto
       throw new Error(typeof message === 'string' ? message : message.join?.(' ') || String(message));
     }
     const data = await response.json();
-    return data;
+    const nextCursor = response.headers.get('X-Next-Cursor');
+    if (params.facets?.length) {
+      return { stories: data.stories, nextCursor, facets: data.facets };
+    }
+    return { stories: data, nextCursor };
   } catch (error) {
     console.error('Error fetching stories:', error);
     throw error;
   }
 }
 
+export interface StorySearchParams {
+  limit?: number;
+  offset?: number;  // nextOffset from the previous page
+  sort?: 'relevance' | 'recent' | 'score';
+  min_score?: number;
+  platform?: string;
+  hours_back?: number;
+  topic?: string;
+  is_kenyan?: boolean;
+}
+
+export interface StorySearchPage {
+  stories: Story[];
+  nextOffset: number | null;  // null when there are no more matches
+}
+
+/**
+ * Search stories by headline and content (every word must match; the last word may be partial)
+ */
+export async function searchStories(q: string, params: StorySearchParams = {}): Promise<StorySearchPage> {
+  const queryParams = new URLSearchParams({ q });
+  
+  if (params.limit) queryParams.append('limit', params.limit.toString());
+  if (params.offset) queryParams.append('offset', params.offset.toString());
+  if (params.sort) queryParams.append('sort', params.sort);
+  if (params.min_score) queryParams.append('min_score', params.min_score.toString());
+  if (params.platform) queryParams.append('platform', params.platform);
+  if (params.hours_back) queryParams.append('hours_back', params.hours_back.toString());
+  if (params.topic) queryParams.append('topic', params.topic);
+  if (params.is_kenyan !== undefined) queryParams.append('is_kenyan', params.is_kenyan.toString());
+
+  const url = `${API_BASE_URL}/api/stories/search?${queryParams.toString()}`;
+  
+  try {
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const data = await response.json();
+    const nextOffset = response.headers.get('X-Next-Offset');
+    return { stories: data, nextOffset: nextOffset ? Number(nextOffset) : null };
+  } catch (error) {
+    console.error('Error searching stories:', error);
+    throw error;
+  }
+}
+
+/**
+ * Fetch a precomputed dashboard feed (e.g. 'kenya', 'africa', 'global').
+ * Feeds are ranked server-side after each scoring batch, so this is the cheapest story list.
+ */
+export async function fetchFeed(name: string, limit?: number): Promise<Story[]> {
+  const params = new URLSearchParams();
+  if (limit) params.append('limit', limit.toString());
+  const query = params.toString();
+  const url = `${API_BASE_URL}/api/feeds/${encodeURIComponent(name)}${query ? `?${query}` : ''}`;
+  
+  try {
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const data = await response.json();
+    return data;
+  } catch (error) {
+    console.error(`Error fetching ${name} feed:`, error);
+    throw error;
+  }
+}
+
+/**
+ * Fetch several stories by ID in one request (order preserved, unknown IDs skipped).
+ * Short lists use GET (cacheable, revalidated by ETag); long lists are POSTed.
+ */
+export async function fetchStoriesByIds(ids: string[]): Promise<Story[]> {
+  if (ids.length === 0) return [];
+  const useGet = ids.length <= 100;
+  const url = useGet
+    ? `${API_BASE_URL}/api/stories?ids=${ids.map(encodeURIComponent).join(',')}`
+    : `${API_BASE_URL}/api/stories/batch`;
+  
+  try {
+    const response = useGet
+      ? await fetch(url)
+      : await fetch(url, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ ids: ids.map(Number) }),
+        });
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const data = await response.json();
+    return data;
+  } catch (error) {
+    console.error('Error fetching stories by ID:', error);
+    throw error;
+  }
+}
+
 /**
  * Fetch a single story by ID
  */
@@ -73,10 +199,50 @@ export async function fetchStory(storyId: string): Promise<Story> {
   }
 }
 
+export interface ScrapeJob {
+  job_id: number;
+  scrape_type: string;
+  source_id: number | null;
+  hashtag_id: number | null;
+  status: 'queued' | 'running' | 'success' | 'error';
+  done: boolean;
+  posts_fetched: number;
+  posts_processed: number;
+  stories_created: number;
+  error: string | null;
+  started_at: string | null;
+  completed_at: string | null;
+  elapsed_seconds: number | null;
+  status_url?: string;
+  coalesced?: boolean;
+}
+
+const SCRAPE_JOB_POLL_MS = 2000;
+
 /**
- * Trigger scraping for a specific source
+ * Fetch the status of a scrape job
  */
-export async function triggerScrape(sourceId: number): Promise<any> {
+export async function fetchScrapeJob(jobId: number): Promise<ScrapeJob> {
+  const url = `${API_BASE_URL}/api/jobs/${jobId}`;
+  
+  try {
+    const response = await fetch(url);
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const data = await response.json();
+    return data;
+  } catch (error) {
+    console.error('Error fetching scrape job:', error);
+    throw error;
+  }
+}
+
+/**
+ * Trigger scraping for a specific source and wait for the job to finish
+ * (the API answers 202 with a job ID; the job is polled until done)
+ */
+export async function triggerScrape(sourceId: number): Promise<ScrapeJob> {
   const url = `${API_BASE_URL}/api/scrape/${sourceId}`;
   
   try {
@@ -86,8 +252,15 @@ export async function triggerScrape(sourceId: number): Promise<any> {
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
-    const data = await response.json();
-    return data;
+    let job: ScrapeJob = await response.json();
+    while (!job.done) {
+      await new Promise((resolve) => setTimeout(resolve, SCRAPE_JOB_POLL_MS));
+      job = await fetchScrapeJob(job.job_id);
+    }
+    if (job.status === 'error') {
+      throw new Error(job.error || 'Scrape failed');
+    }
+    return job;
   } catch (error) {
     console.error('Error triggering scrape:', error);
     throw error;
@@ -142,6 +315,72 @@ export async function fetchHotStories(isKenyan?: boolean, hoursBack: number = 6)
   }
 }
 
+export interface StoryChanges {
+  stories: Story[];  // New or updated stories (replace by id)
+  removed: string[];  // IDs of stories that are no longer active
+  next_since: string;  // Pass back as `since` on the next call
+  has_more: boolean;  // More changes are ready; call again right away
+}
+
+export interface StoryChangesParams {
+  is_kenyan?: boolean;
+  platform?: string;
+  topic?: string;
+}
+
+/**
+ * Fetch stories changed since a sync token (omit `since` to get a starting token after a full load)
+ */
+export async function fetchStoryChanges(since?: string, params: StoryChangesParams = {}): Promise<StoryChanges> {
+  const queryParams = new URLSearchParams();
+
+  if (since) queryParams.append('since', since);
+  if (params.is_kenyan !== undefined) queryParams.append('is_kenyan', params.is_kenyan.toString());
+  if (params.platform) queryParams.append('platform', params.platform);
+  if (params.topic) queryParams.append('topic', params.topic);
+
+  const url = `${API_BASE_URL}/api/stories/changes${queryParams.toString() ? `?${queryParams.toString()}` : ''}`;
+
+  try {
+    const response = await fetch(url);
+    if (!response.ok) {
+      const errBody = await response.json().catch(() => ({}));
+      const message = errBody.detail || `HTTP error! status: ${response.status}`;
+      throw new Error(typeof message === 'string' ? message : message.join?.(' ') || String(message));
+    }
+    return await response.json();
+  } catch (error) {
+    console.error('Error fetching story changes:', error);
+    throw error;
+  }
+}
+
+export interface StoryStreamParams {
+  is_kenyan?: boolean;
+  platform?: string;
+  min_velocity?: number;  // 20 matches the hot stories feed
+}
+
+/**
+ * Subscribe to new stories pushed by the backend as soon as they are stored (Server-Sent Events).
+ * EventSource reconnects by itself and the backend replays stories missed in between.
+ * Returns a function that closes the stream.
+ */
+export function subscribeToStories(params: StoryStreamParams, onStory: (story: Story) => void): () => void {
+  const queryParams = new URLSearchParams();
+
+  if (params.is_kenyan !== undefined) queryParams.append('is_kenyan', params.is_kenyan.toString());
+  if (params.platform) queryParams.append('platform', params.platform);
+  if (params.min_velocity !== undefined) queryParams.append('min_velocity', params.min_velocity.toString());
+
+  const url = `${API_BASE_URL}/api/stream/stories${queryParams.toString() ? `?${queryParams.toString()}` : ''}`;
+  const source = new EventSource(url);
+  source.addEventListener('story', (event) => {
+    onStory(JSON.parse((event as MessageEvent).data));
+  });
+  return () => source.close();
+}
+
 export interface HealthStatus {
   ok: boolean;
   databaseConnected: boolean;